@@ -1,6 +1,12 @@
 # app/ai_analyst.py
 import os
+import re
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import google.generativeai as genai
+from app import providers, resilience
 from dotenv import load_dotenv
 
 # 환경변수 로드
@@ -10,22 +16,59 @@ load_dotenv()
 GOOGLE_API_KEY = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=GOOGLE_API_KEY)
 
-def analyze_market_data(ticker, price_info, news_list):
+# AI 호출 실패 시 사용자에게 보여줄 안내 문구 (이 문구는 캐시에 저장하지 않음)
+AI_ERROR_MESSAGE = "죄송합니다. 현재 AI 분석 서버 연결이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+
+def make_input_hash(price_info, news_list):
     """
-    종목(ticker), 가격 정보(price_info), 뉴스(news_list)를 받아
-    Gemini에게 등락 원인 분석을 요청합니다.
+    브리핑 입력의 지문(해시)을 만듭니다.
+    가격은 유효숫자 4자리, 등락률은 소수 1자리로 반올림해서
+    자잘한 호가 변화로는 새 브리핑을 만들지 않도록 합니다.
     """
-    try:
-        # 1. 사용할 모델 선택 (Gemini Pro 또는 1.5 Flash)
-        model = genai.GenerativeModel('gemini-flash-latest')
+    price = price_info.get('price') or 0
+    key = {
+        "price": float(f"{price:.4g}"),
+        "change": round(price_info.get('change_percent') or 0, 1),
+        "links": sorted({news.get('link') or news.get('title') for news in news_list}),
+    }
+    raw = json.dumps(key, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+GEMINI_MODEL_NAME = 'gemini-flash-latest'
+
+# 묶음 브리핑: 요청 1번의 프롬프트 토큰 예산 / 종목 수 상한 / 헤드라인 최대 길이
+BRIEFING_BATCH_TOKEN_BUDGET = int(os.getenv("BRIEFING_BATCH_TOKEN_BUDGET", "3000"))
+BRIEFING_BATCH_MAX_TICKERS = int(os.getenv("BRIEFING_BATCH_MAX_TICKERS", "6"))
+BRIEFING_HEADLINE_MAX_CHARS = int(os.getenv("BRIEFING_HEADLINE_MAX_CHARS", "120"))
+# 묶음 브리핑이 gemini 동시 호출 자리가 빌 때까지 기다리는 최대 시간 (초)
+BRIEFING_SLOT_WAIT = float(os.getenv("BRIEFING_SLOT_WAIT", "15"))
 
-        # 2. 뉴스 리스트를 텍스트로 변환
-        news_text = ""
-        for idx, news in enumerate(news_list, 1):
-            news_text += f"{idx}. {news['title']} ({news['source']})\n"
+# 동시 생성 요청 수 상한은 resilience의 gemini 공급자(GEMINI_MAX_IN_FLIGHT) 하나만 적용
+# (단건 요청은 꽉 차면 바로 UpstreamUnavailable, 묶음은 BRIEFING_SLOT_WAIT까지 기다림) - 묶음 실행 스레드 수도 같은 값으로 맞춤
+_batch_executor = ThreadPoolExecutor(max_workers=resilience.get_provider("gemini").max_concurrency,
+                                     thread_name_prefix="gemini-batch")
+_model = None
+_model_lock = threading.Lock()
 
-        # 3. 프롬프트(명령어) 작성 - 여기가 핵심!
-        prompt = f"""
+def _get_model():
+    """모델 클라이언트는 프로세스에서 한 번만 만들어 재사용"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    return _model
+
+def build_prompt(ticker, price_info, news_list):
+    """브리핑 요청 프롬프트를 만듭니다. (일반/스트리밍 공용)"""
+    # 1. 뉴스 리스트를 텍스트로 변환
+    news_text = ""
+    for idx, news in enumerate(news_list, 1):
+        coverage = f", {news['source_count']}건 보도" if news.get('source_count', 1) > 1 else ""
+        news_text += f"{idx}. {news['title']} ({news['source']}{coverage})\n"
+
+    # 2. 프롬프트(명령어) 작성 - 여기가 핵심!
+    return f"""
         당신은 월가에서 20년 경력을 가진 유능한 '금융 애널리스트'입니다.
         아래 데이터를 바탕으로 '{ticker}' 종목의 현재 상황과 등락 원인을 분석해서 브리핑해주세요.
 
@@ -45,10 +88,179 @@ def analyze_market_data(ticker, price_info, news_list):
         6. 글의 시작을 "현재 {ticker}의 주가는..." 으로 시작하지 마세요. 바로 핵심 분석으로 들어가세요.
         """
 
-        # 4. AI에게 질문 던지기
-        response = model.generate_content(prompt)
-        return response.text
+def analyze_market_data(ticker, price_info, news_list, model=None, wait: float = 0):
+    """
+    종목(ticker), 가격 정보(price_info), 뉴스(news_list)를 받아
+    Gemini에게 등락 원인 분석을 요청합니다.
+    model: generate_content()를 가진 객체 (테스트용 가짜 모델 주입 가능)
+    wait: 동시 호출 자리가 빌 때까지 기다리는 최대 시간 (초)
+    """
+    try:
+        # 1. 사용할 모델 선택 (재사용 클라이언트)
+        if model is None:
+            model = _get_model()
+
+        # 2. 프롬프트 작성
+        prompt = build_prompt(ticker, price_info, news_list)
+
+        # 3. AI에게 질문 던지기
+        return resilience.get_provider("gemini").call(providers.current().generate, model, prompt, wait=wait)
 
     except Exception as e:
         print(f"🚨 AI Analysis Error: {e}")
-        return "죄송합니다. 현재 AI 분석 서버 연결이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
\ No newline at end of file
+        return AI_ERROR_MESSAGE
+
+def stream_market_analysis(ticker, price_info, news_list, model=None):
+    """
+    analyze_market_data의 스트리밍 버전.
+    모델이 생성하는 대로 텍스트 조각(chunk)을 하나씩 yield 합니다.
+    오류는 잡지 않고 그대로 올려보냅니다. (호출부에서 이미 보낸 조각과 함께 처리)
+    """
+    if model is None:
+        model = _get_model()
+
+    prompt = build_prompt(ticker, price_info, news_list)
+    with resilience.get_provider("gemini").guard():
+        yield from providers.current().generate_stream(model, prompt)
+
+# ---------------------------------------------------------
+# 묶음 브리핑 (여러 종목을 요청 1번으로)
+# ---------------------------------------------------------
+_BATCH_INSTRUCTIONS = """
+당신은 월가에서 20년 경력을 가진 유능한 '금융 애널리스트'입니다.
+아래 각 종목의 시장 데이터와 뉴스 헤드라인을 바탕으로 종목별 등락 원인 브리핑을 작성해주세요.
+
+[작성 원칙]
+1. 종목마다 **등락의 핵심 원인**을 해당 종목의 뉴스에 기반하여 논리적으로 설명하세요.
+2. 상승/하락 여부에 따라 긍정적/부정적 요인을 명확히 짚고, 투자자가 이해하기 쉬운 **'인사이트'**를 제공하세요.
+3. 말투는 "~했습니다.", "~보입니다."와 같은 **전문적이고 정중한 '해요체'**를 사용하세요.
+4. 종목별 분량은 **공백 포함 한글 350자 이상, 500자 이하**로 작성하세요.
+5. 응답은 반드시 {"티커": "브리핑 본문", ...} 형식의 JSON 객체 하나로만 작성하세요. 아래 모든 티커를 키로 포함하세요.
+"""
+
+def estimate_tokens(text: str):
+    """대략적인 토큰 수 (영문/숫자 약 4글자, 한글 약 1.5글자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
+
+def _headline_line(news):
+    title = news['title'].strip()
+    if len(title) > BRIEFING_HEADLINE_MAX_CHARS:
+        title = title[:BRIEFING_HEADLINE_MAX_CHARS - 1] + "…"
+    coverage = f", {news['source_count']}건 보도" if news.get('source_count', 1) > 1 else ""
+    return f"  - {title}{coverage}"
+
+def _prioritized_headlines(news_list):
+    """여러 매체가 보도한 기사 먼저 (같으면 원래 순서)"""
+    ranked = sorted(enumerate(news_list), key=lambda pair: (-pair[1].get('source_count', 1), pair[0]))
+    return [_headline_line(news) for _, news in ranked if news.get('title')]
+
+def plan_batches(items, token_budget: int = BRIEFING_BATCH_TOKEN_BUDGET,
+                 max_tickers: int = BRIEFING_BATCH_MAX_TICKERS):
+    """
+    items: [(ticker, price_info, news_list), ...]
+    -> [[(ticker, 헤더 줄, [헤드라인 줄...]), ...], ...] 묶음 목록
+    종목 헤더(가격)는 항상 넣고, 헤드라인은 묶음 안의 모든 종목에 1순위, 2순위... 순서로
+    돌아가며 예산이 남는 만큼만 채웁니다. (한 종목이 예산을 독차지하지 않도록)
+    """
+    base_cost = estimate_tokens(_BATCH_INSTRUCTIONS)
+
+    # 1. 헤더(가격)만으로 종목을 묶음에 나누기
+    batches, current, used = [], [], base_cost
+    for ticker, price_info, news_list in items:
+        header = f"[{ticker}] 현재가 {price_info.get('price')}, 등락률 {price_info.get('change_percent')}%"
+        cost = estimate_tokens(header)
+        if current and (len(current) >= max_tickers or used + cost > token_budget):
+            batches.append((current, used))
+            current, used = [], base_cost
+        current.append((ticker, header, _prioritized_headlines(news_list)))
+        used += cost
+    if current:
+        batches.append((current, used))
+
+    # 2. 남은 예산만큼 헤드라인을 순위별로 돌아가며 채우기
+    planned = []
+    for batch, used in batches:
+        chosen = {ticker: [] for ticker, _, _ in batch}
+        depth = 0
+        added = True
+        while added:
+            added = False
+            for ticker, _, headlines in batch:
+                if depth < len(headlines):
+                    cost = estimate_tokens(headlines[depth])
+                    if used + cost <= token_budget:
+                        chosen[ticker].append(headlines[depth])
+                        used += cost
+                        added = True
+            depth += 1
+        planned.append([(ticker, header, chosen[ticker]) for ticker, header, _ in batch])
+    return planned
+
+def build_batch_prompt(batch):
+    blocks = []
+    for ticker, header, headlines in batch:
+        blocks.append(header + ("\n" + "\n".join(headlines) if headlines else "\n  - (관련 뉴스 없음)"))
+    tickers = ", ".join(ticker for ticker, _, _ in batch)
+    return f"{_BATCH_INSTRUCTIONS}\n[대상 티커] {tickers}\n\n" + "\n\n".join(blocks)
+
+def parse_batch_response(text: str, tickers):
+    """JSON 응답 -> {티커: 본문}. 코드블록(```json)으로 감싼 응답도 허용, 빠진 티커는 결과에 없음"""
+    cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", (text or "").strip())
+    try:
+        data = json.loads(cleaned)
+    except ValueError:
+        match = re.search(r"\{.*\}", cleaned, re.S)
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return {}
+    if not isinstance(data, dict):
+        return {}
+    by_upper = {str(key).strip().upper(): value for key, value in data.items()}
+    return {ticker: by_upper[ticker.upper()].strip() for ticker in tickers
+            if isinstance(by_upper.get(ticker.upper()), str) and by_upper[ticker.upper()].strip()}
+
+def _run_batch(batch, model, by_ticker):
+    """
+    묶음 1개 실행 (묶음 스레드에서). 응답에서 빠진 종목만 같은 스레드에서 종목별 요청으로 다시 만듭니다.
+    묶음 요청 자체가 실패하면 종목별로 다시 보내지 않고 AI_ERROR_MESSAGE (호출부에서 저장된 브리핑으로 대체)
+    """
+    tickers = [ticker for ticker, _, _ in batch]
+    try:
+        text = resilience.get_provider("gemini").call(
+            providers.current().generate, model, build_batch_prompt(batch), wait=BRIEFING_SLOT_WAIT,
+            generation_config={"response_mime_type": "application/json"})
+    except Exception as e:
+        print(f"🚨 AI Batch Analysis Error ({', '.join(tickers)}): {e}")
+        return {ticker: AI_ERROR_MESSAGE for ticker in tickers}
+    results = parse_batch_response(text, tickers)
+    for ticker in tickers:
+        if ticker not in results:
+            results[ticker] = analyze_market_data(ticker, *by_ticker[ticker], model=model, wait=BRIEFING_SLOT_WAIT)
+    return results
+
+def iter_market_batches(items, model=None, token_budget: int = BRIEFING_BATCH_TOKEN_BUDGET,
+                        max_tickers: int = BRIEFING_BATCH_MAX_TICKERS):
+    """
+    여러 종목 브리핑을 묶음 요청으로 생성하고, 묶음이 끝나는 대로 {티커: 본문}을 yield 합니다.
+    응답에서 빠진 종목은 묶음 스레드에서 종목별 요청으로 다시 만듭니다.
+    """
+    if not items:
+        return
+    model = model or _get_model()
+    by_ticker = {ticker: (price_info, news_list) for ticker, price_info, news_list in items}
+    futures = [resilience.submit(_batch_executor, _run_batch, batch, model, by_ticker)
+               for batch in plan_batches(items, token_budget, max_tickers)]
+    for future in as_completed(futures):
+        yield future.result()
+
+def analyze_market_batch(items, model=None, token_budget: int = BRIEFING_BATCH_TOKEN_BUDGET,
+                         max_tickers: int = BRIEFING_BATCH_MAX_TICKERS):
+    """{티커: 브리핑 본문} (실패한 종목은 AI_ERROR_MESSAGE)"""
+    results = {}
+    for batch_results in iter_market_batches(items, model, token_budget, max_tickers):
+        results.update(batch_results)
+    return results
@@ -0,0 +1,84 @@
+# app/auth_cache.py
+# 검증된 토큰 캐시 (인증 요청마다 jwt.decode + DB 유저 조회를 반복하지 않도록)
+import os
+import threading
+import time
+from sqlalchemy import event, inspect
+from app import models
+from app.cache import TTLCache
+
+# 토큰 만료(exp)보다 먼저 끝나는 상한 (다른 워커에서 바뀐 유저 정보가 늦어도 이 시간 안에 반영)
+AUTH_CACHE_MAX_TTL = float(os.getenv("AUTH_CACHE_MAX_TTL", "300"))   # 초
+AUTH_CACHE_MAXSIZE = int(os.getenv("AUTH_CACHE_MAXSIZE", "10000"))
+
+
+class UserSnapshot:
+    """
+    요청 처리에 필요한 최소한의 유저 정보. (세션에 묶이지 않아 캐시에 넣어도 안전)
+    schemas.UserResponse(from_attributes)로 그대로 변환됩니다.
+    """
+    __slots__ = ("id", "email", "nickname", "created_at")
+
+    def __init__(self, id, email, nickname, created_at):
+        self.id = id
+        self.email = email
+        self.nickname = nickname
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.email, user.nickname, user.created_at)
+
+
+class TokenCache:
+    def __init__(self, maxsize: int = AUTH_CACHE_MAXSIZE, max_ttl: float = AUTH_CACHE_MAX_TTL):
+        self.max_ttl = max_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=max_ttl)
+        self._tokens_by_email = {}   # email -> {token, ...} (무효화용 역색인)
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        return self._cache.get(token)
+
+    def put(self, token: str, user, exp: float = None):
+        """exp(유닉스 시각)까지만 유효하도록 저장하고 스냅샷을 반환합니다. (exp 없는 토큰은 상한까지)"""
+        snapshot = UserSnapshot.from_user(user)
+        ttl = self.max_ttl if exp is None else min(self.max_ttl, exp - time.time())
+        if ttl <= 0:
+            return snapshot
+        self._cache.set(token, snapshot, ttl=ttl)
+        with self._lock:
+            tokens = self._tokens_by_email.setdefault(snapshot.email, set())
+            # 만료로 이미 빠진 토큰은 역색인에서도 정리
+            tokens.intersection_update({t for t in tokens if self._cache.get(t, count_miss=False) is not None})
+            tokens.add(token)
+        return snapshot
+
+    def invalidate_user(self, email: str):
+        """유저가 삭제/변경되면 그 유저로 발급된 캐시 토큰을 모두 버립니다."""
+        with self._lock:
+            tokens = self._tokens_by_email.pop(email, set())
+        for token in tokens:
+            self._cache.delete(token)
+
+    def clear(self):
+        with self._lock:
+            self._tokens_by_email.clear()
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+token_cache = TokenCache()
+
+
+# ORM으로 유저가 수정/삭제되면 자동으로 캐시 무효화
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target):
+    token_cache.invalidate_user(target.email)
+    # 이메일 자체가 바뀐 경우 예전 이메일로 묶인 토큰도 버림
+    history = inspect(target).attrs.email.history
+    for old_email in history.deleted or ():
+        token_cache.invalidate_user(old_email)
@@ -0,0 +1,116 @@
+# app/briefings.py
+# AI 브리핑 조회 (DB에 저장된 브리핑 재사용 -> 없을 때만 Gemini 호출)
+import os
+from sqlalchemy.orm import Session
+from app import crud, ai_analyst
+from app.database import SessionLocal
+
+# 입력이 같아도 이 시간이 지나면 새로 생성 (분)
+BRIEFING_MAX_AGE_MINUTES = float(os.getenv("BRIEFING_MAX_AGE_MINUTES", "60"))
+# AI 호출이 실패했을 때 대신 보여줄 이전 브리핑의 최대 나이 (분) - 입력이 달라졌어도 안내 문구보다 나음
+BRIEFING_FALLBACK_MAX_AGE_MINUTES = float(os.getenv("BRIEFING_FALLBACK_MAX_AGE_MINUTES", "1440"))
+
+_cache_enabled = True
+
+def disable_cache(reason: str):
+    """저장된 브리핑 재사용을 끔 (스키마가 맞지 않을 때 요청마다 오류를 내지 않도록 시작 시 한 번 호출)"""
+    global _cache_enabled
+    _cache_enabled = False
+    print(f"⚠️ Briefing cache disabled: {reason}")
+
+def find_cached_briefing(db: Session, ticker: str, input_hash: str):
+    """저장된 브리핑 본문을 찾습니다. (없거나 조회 실패 시 None)"""
+    if not _cache_enabled:
+        return None
+    try:
+        cached = crud.get_cached_briefing(db, ticker, input_hash, BRIEFING_MAX_AGE_MINUTES)
+        return cached.summary_text if cached else None
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Briefing Cache Read Error ({ticker}): {e}")
+        return None
+
+def fallback_briefing(db: Session, ticker: str, briefing_text: str):
+    """AI 오류 안내 문구면 그 종목의 최근 저장 브리핑으로 대체 (없으면 안내 문구 그대로)"""
+    if briefing_text != ai_analyst.AI_ERROR_MESSAGE or not _cache_enabled:
+        return briefing_text
+    try:
+        latest = crud.get_latest_briefing(db, ticker, BRIEFING_FALLBACK_MAX_AGE_MINUTES)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Briefing Fallback Read Error ({ticker}): {e}")
+        return briefing_text
+    return latest.summary_text if latest else briefing_text
+
+def store_briefing(db: Session, ticker: str, input_hash: str, briefing_text: str, news_list):
+    """새로 만든 브리핑을 저장합니다. (AI 오류 안내 문구는 저장하지 않음)"""
+    if not _cache_enabled or not briefing_text or briefing_text == ai_analyst.AI_ERROR_MESSAGE:
+        return
+    try:
+        links = [news.get('link') for news in news_list if news.get('link')]
+        crud.save_briefing(db, ticker, input_hash, briefing_text, links)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Briefing Cache Write Error ({ticker}): {e}")
+
+def get_briefing(db: Session, ticker: str, price_info, news_list):
+    """입력이 크게 바뀌지 않았으면 저장된 브리핑을, 아니면 새로 생성해서 반환합니다."""
+    input_hash = ai_analyst.make_input_hash(price_info, news_list)
+
+    cached = find_cached_briefing(db, ticker, input_hash)
+    if cached:
+        return cached
+
+    # AI에게 분석 요청 (시간이 2~3초 걸림)
+    briefing_text = ai_analyst.analyze_market_data(ticker, price_info, news_list)
+    store_briefing(db, ticker, input_hash, briefing_text, news_list)
+    return fallback_briefing(db, ticker, briefing_text)
+
+def iter_briefings(db: Session, items, model=None):
+    """
+    여러 종목 브리핑을 (티커, 본문)으로 yield 합니다. items: [(ticker, price_info, news_list), ...]
+    저장된 브리핑은 바로 내보내고, 나머지는 묶음 요청(ai_analyst.iter_market_batches)으로 만들어
+    묶음이 끝나는 대로 저장 후 내보냅니다. 생성에 실패한 종목은 최근 저장 브리핑으로 대체합니다.
+    """
+    missing = []
+    hashes = {}
+    for ticker, price_info, news_list in items:
+        hashes[ticker] = ai_analyst.make_input_hash(price_info, news_list)
+        cached = find_cached_briefing(db, ticker, hashes[ticker])
+        if cached:
+            yield ticker, cached
+        else:
+            missing.append((ticker, price_info, news_list))
+
+    news_by_ticker = {ticker: news_list for ticker, _, news_list in missing}
+    for results in ai_analyst.iter_market_batches(missing, model=model):
+        for ticker, briefing_text in results.items():
+            store_briefing(db, ticker, hashes[ticker], briefing_text, news_by_ticker[ticker])
+            yield ticker, fallback_briefing(db, ticker, briefing_text)
+
+def get_briefings(db: Session, items, model=None):
+    """{티커: 브리핑 본문} - iter_briefings 결과를 모아서 반환"""
+    return dict(iter_briefings(db, items, model=model))
+
+def stream_briefing(ticker: str, price_info, news_list, model=None):
+    """
+    브리핑을 조각 단위로 yield 하는 제너레이터. (SSE 응답용)
+    저장된 브리핑이 있으면 한 번에 내보내고, 없으면 Gemini 스트리밍 결과를 그대로 흘려보낸 뒤
+    다 받은 전체 본문을 저장합니다.
+    응답 스트리밍 중에는 요청용 DB 세션이 이미 닫혔을 수 있으므로 자체 세션을 씁니다.
+    """
+    input_hash = ai_analyst.make_input_hash(price_info, news_list)
+
+    with SessionLocal() as db:
+        cached = find_cached_briefing(db, ticker, input_hash)
+    if cached:
+        yield cached
+        return
+
+    parts = []
+    for text in ai_analyst.stream_market_analysis(ticker, price_info, news_list, model=model):
+        parts.append(text)
+        yield text
+
+    with SessionLocal() as db:
+        store_briefing(db, ticker, input_hash, "".join(parts), news_list)
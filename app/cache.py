@@ -0,0 +1,126 @@
+# app/cache.py
+# 프로세스 내부 공용 캐시 (TTL + LRU + 동시 요청 합치기)
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """같은 키에 대해 진행 중인 원본 조회 1건 (대기자들은 이 결과를 같이 받음)"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    항목별 만료시간(TTL)과 LRU 축출을 지원하는 스레드 안전 캐시.
+    get_or_load()는 같은 키로 동시에 캐시 미스가 나면
+    첫 번째 요청만 원본(야후 등)을 조회하고 나머지는 그 결과를 기다립니다.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (만료시각, 값)
+        self._flights = {}           # key -> _Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0           # 다른 요청의 조회를 기다려서 받은 횟수
+        self.evictions = 0
+
+    # 1. 조회 (없거나 만료됐으면 None)
+    # count_miss=False: 바로 뒤에 get_or_load()를 부를 예정이라 미스를 두 번 세지 않을 때
+    def get(self, key, count_miss: bool = True):
+        with self._lock:
+            return self._get_locked(key, count_miss)
+
+    def _get_locked(self, key, count_miss=True):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += count_miss
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += count_miss
+            return None
+        self._data.move_to_end(key)  # 최근 사용 -> 맨 뒤로
+        self.hits += 1
+        return value
+
+    # 2. 저장 (ttl을 주면 이 항목만 다른 만료시간 사용)
+    def set(self, key, value, ttl: float = None):
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def _set_locked(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)  # 가장 오래 안 쓴 항목 제거
+            self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # 3. 캐시 조회 + 미스 시 loader 1번만 실행 (single-flight)
+    def get_or_load(self, key, loader, ttl: float = None):
+        """
+        loader()가 None을 반환하면 캐시에 저장하지 않습니다. (일시적 실패를 고정시키지 않기 위해)
+        loader에서 난 예외는 기다리던 요청들에게도 그대로 전달됩니다.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                return value
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                is_leader = True
+            else:
+                self.coalesced += 1
+                is_leader = False
+
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+            flight.value = value
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    # 4. 튜닝용 통계
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,214 @@
+# app/calendar_events.py
+# 경제 캘린더 (경제지표 발표일 + 관심/보유 종목 실적 발표일)
+# - 적재: 소스에서 받은 일정을 source_key 기준 일괄 upsert (수천 건도 INSERT 몇 번)
+# - 조회: 공통 일정(ticker NULL) + 내 관심/보유 종목 일정을 쿼리 1번으로
+# - 캐시: (사용자, 기간, 적재 세대, 사용자 세대) 단위. 세대 번호는 calendar_generations 테이블에 있고
+#   적재 / 관심·보유 종목 변경 시 같은 트랜잭션에서 +1 -> 매 요청 PK 조회 1번으로 다른 워커의 변경도 바로 반영
+#
+# 실행: python -m app.calendar_events --fixture     (로컬 CSV 적재)
+#       python -m app.calendar_events --earnings    (등록된 종목의 실적 발표일을 야후에서 적재)
+import argparse
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import yfinance as yf
+from sqlalchemy import select, union, func, or_
+from app import models
+from app.cache import TTLCache
+from app.database import SessionLocal, engine
+
+CALENDAR_FIXTURE_PATH = os.getenv("CALENDAR_FIXTURE_PATH",
+                                  os.path.join(os.path.dirname(__file__), "data", "calendar_fixture.csv"))
+CALENDAR_CACHE_TTL = float(os.getenv("CALENDAR_CACHE_TTL", "600"))   # 초
+CALENDAR_MAX_DAYS = 370                                              # 한 번에 조회 가능한 최대 기간
+UPSERT_CHUNK_SIZE = 500
+
+_range_cache = TTLCache(maxsize=4096, ttl=CALENDAR_CACHE_TTL)
+
+_UPDATE_COLUMNS = ("event_date", "event_time", "ticker", "event_type", "country", "title", "importance")
+INGEST_SCOPE = "ingest"
+
+
+# 1. 소스: fetch() -> [{"source_key", "event_date", "event_time", "ticker", "event_type", "country", "title", "importance"}]
+class CsvCalendarSource:
+    """date,time,ticker,type,country,title,importance 형식의 로컬 CSV"""
+    def __init__(self, path: str = CALENDAR_FIXTURE_PATH):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return [make_event(date.fromisoformat(row["date"]), row["type"], row["title"],
+                               ticker=row.get("ticker"), country=row.get("country"),
+                               event_time=row.get("time"), importance=int(row.get("importance") or 1))
+                    for row in csv.DictReader(f)]
+
+
+class YahooEarningsSource:
+    """종목별 다음 실적 발표일 (yfinance Ticker.calendar)"""
+    def __init__(self, tickers, workers: int = 8):
+        self.tickers = sorted({t.strip().upper() for t in tickers if t})
+        self.workers = workers
+
+    def fetch(self):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="calendar") as executor:
+            return [event for events in executor.map(self._fetch_one, self.tickers) for event in events]
+
+    def _fetch_one(self, ticker):
+        try:
+            earnings_dates = (yf.Ticker(ticker).calendar or {}).get("Earnings Date") or []
+        except Exception as e:
+            print(f"⚠️ Earnings Calendar Error ({ticker}): {e}")
+            return []
+        country = "KR" if ticker.endswith((".KS", ".KQ")) else "US"
+        return [make_event(d, "earnings", f"{ticker} 실적 발표", ticker=ticker, country=country, importance=2)
+                for d in earnings_dates[:1] if isinstance(d, date)]
+
+
+def make_event(event_date: date, event_type: str, title: str, ticker: str = None, country: str = None,
+               event_time: str = None, importance: int = 1):
+    ticker = ticker.strip().upper() if ticker else None
+    country = country.strip().upper() if country else None
+    if ticker:
+        source_key = f"{event_type}:{ticker}:{event_date}"
+    else:
+        source_key = f"{event_type}:{country or '-'}:{event_date}:{title}"
+    return {"source_key": source_key, "event_date": event_date, "event_time": event_time or None,
+            "ticker": ticker, "event_type": event_type, "country": country,
+            "title": title, "importance": importance}
+
+
+# 2. 적재 (일괄 upsert)
+def ingest(events, session_factory=SessionLocal):
+    events = list({event["source_key"]: event for event in events}.values())   # 같은 키는 마지막 값
+    if not events:
+        return 0
+    with session_factory() as db:
+        dialect = db.get_bind().dialect.name
+        for i in range(0, len(events), UPSERT_CHUNK_SIZE):
+            _upsert_chunk(db, dialect, events[i:i + UPSERT_CHUNK_SIZE])
+        db.execute(bump_generation(dialect, INGEST_SCOPE))
+        db.commit()
+    invalidate_all()
+    print(f"🗓️ Calendar: {len(events)} events upserted")
+    return len(events)
+
+
+def _insert_for(dialect):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _upsert_chunk(db, dialect, rows):
+    if dialect in ("postgresql", "sqlite"):
+        stmt = _insert_for(dialect)(models.CalendarEvent).values(rows)
+        update = {name: stmt.excluded[name] for name in _UPDATE_COLUMNS}
+        update["updated_at"] = func.now()
+        db.execute(stmt.on_conflict_do_update(index_elements=["source_key"], set_=update))
+        return
+
+    # 그 외 DB: 기존 키를 한 번에 조회해서 insert / update 나누기
+    existing = dict(db.execute(
+        select(models.CalendarEvent.source_key, models.CalendarEvent.id)
+        .where(models.CalendarEvent.source_key.in_([row["source_key"] for row in rows]))
+    ).all())
+    inserts = [row for row in rows if row["source_key"] not in existing]
+    updates = [{**row, "id": existing[row["source_key"]]} for row in rows if row["source_key"] in existing]
+    if inserts:
+        db.execute(models.CalendarEvent.__table__.insert(), inserts)
+    if updates:
+        db.bulk_update_mappings(models.CalendarEvent, updates)
+
+
+# 3. 캐시 세대 번호
+def bump_generation(dialect: str, scope: str):
+    """scope 세대 +1 (없으면 1로 생성, PostgreSQL/SQLite upsert). 변경과 같은 트랜잭션에서 실행"""
+    generation = models.CalendarGeneration
+    stmt = _insert_for(dialect)(generation).values(scope=scope, generation=1)
+    return stmt.on_conflict_do_update(index_elements=["scope"],
+                                      set_={"generation": generation.generation + 1})
+
+
+def user_scope(user_id: int):
+    return f"user:{user_id}"
+
+
+def generations_query(user_id: int):
+    """(scope, generation) - 적재 세대 + 이 사용자 세대 (PK 조회)"""
+    generation = models.CalendarGeneration
+    return select(generation.scope, generation.generation).where(
+        generation.scope.in_([INGEST_SCOPE, user_scope(user_id)]))
+
+
+# 4. 조회 (쿼리 1번 + 캐시)
+def user_tickers_query(user_id: int):
+    """관심종목 ∪ 보유종목 (대문자)"""
+    return union(
+        select(func.upper(models.UserInterest.ticker)).where(models.UserInterest.user_id == user_id),
+        select(func.upper(models.Portfolio.ticker)).where(models.Portfolio.owner_id == user_id),
+    )
+
+
+def range_query(user_id: int, start: date, end: date):
+    """기간 내 공통 일정 + 내 관심/보유 종목 일정 (종목 집합은 서브쿼리)"""
+    event = models.CalendarEvent
+    return (
+        select(event)
+        .where(event.event_date >= start, event.event_date <= end,
+               or_(event.ticker.is_(None), event.ticker.in_(user_tickers_query(user_id))))
+        .order_by(event.event_date, event.event_time, event.importance.desc(), event.id)
+    )
+
+
+def cache_key(user_id: int, start: date, end: date, generations):
+    generations = dict(generations)
+    return (user_id, start, end, generations.get(INGEST_SCOPE, 0), generations.get(user_scope(user_id), 0))
+
+
+def get_cached(key):
+    return _range_cache.get(key)
+
+
+def set_cached(key, events):
+    _range_cache.set(key, events)
+
+
+def invalidate_all():
+    """이 프로세스의 캐시 비우기 (세대가 바뀌면 어차피 새 키를 쓰므로 메모리 정리용)"""
+    _range_cache.clear()
+
+
+def to_dict(event):
+    return {"id": event.id, "date": event.event_date.isoformat(), "time": event.event_time,
+            "ticker": event.ticker, "type": event.event_type, "country": event.country,
+            "title": event.title, "importance": event.importance}
+
+
+def get_cache_stats():
+    return _range_cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경제 캘린더 적재")
+    parser.add_argument("--fixture", nargs="?", const=CALENDAR_FIXTURE_PATH, help="로컬 CSV 적재")
+    parser.add_argument("--earnings", action="store_true", help="등록된 관심/보유 종목의 실적 발표일 적재")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    events = []
+    if args.fixture:
+        events += CsvCalendarSource(args.fixture).fetch()
+    if args.earnings:
+        with SessionLocal() as db:
+            tickers = db.execute(union(select(models.UserInterest.ticker), select(models.Portfolio.ticker))).scalars().all()
+        events += YahooEarningsSource(tickers).fetch()
+    if not events:
+        parser.error("--fixture 또는 --earnings 중 하나 이상 지정하세요.")
+    ingest(events)
+
+
+if __name__ == "__main__":
+    main()
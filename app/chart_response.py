@@ -0,0 +1,103 @@
+# app/chart_response.py
+# 차트(과거 시세) 응답 만들기
+# - format=compact: 시작일 + 날짜 간격/가격 차분 배열 (정수) -> 기간이 길어도 본문이 작음
+# - ETag / Last-Modified 헤더로 안 바뀐 차트는 304 (본문 없음)
+# - indicators=... 를 주면 기술적 지표를 같이 붙여서 반환
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+import numpy as np
+from fastapi import Request, Response
+from app import indicators
+from app.cache import TTLCache
+
+# 가격을 정수로 바꿀 때 곱하는 값 (소수 둘째 자리까지 보존)
+COMPACT_PRICE_SCALE = 100
+
+# 같은 ETag(포맷 포함)면 직렬화 결과를 재사용
+_body_cache = TTLCache(maxsize=512, ttl=300)
+
+
+def _clean(dates, closes):
+    """값이 비어있는(NaN) 봉은 빼고 반환"""
+    mask = ~np.isnan(closes)
+    return dates[mask], closes[mask]
+
+
+def make_etag(ticker: str, period: str, dates, closes, indicator_specs=(), format: str = "full"):
+    """포맷(full/compact)마다 본문이 다르므로 ETag도 달라야 함"""
+    digest = hashlib.sha1()
+    digest.update(f"{ticker}|{period}|{format}|{indicator_specs!r}|".encode("utf-8"))
+    digest.update(dates.astype("datetime64[D]").astype("int64").tobytes())
+    digest.update(closes.astype("float64").tobytes())
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+def compact_payload(ticker: str, dates, closes):
+    """
+    {"ticker", "start", "scale", "day_deltas", "price_deltas"} 형식.
+    복원: 날짜 = start + cumsum(day_deltas)일, 가격 = cumsum(price_deltas) / scale
+    (두 배열의 첫 값은 각각 0, 첫 가격 정수값)
+    """
+    if len(dates) == 0:
+        return {"ticker": ticker, "start": None, "scale": COMPACT_PRICE_SCALE, "day_deltas": [], "price_deltas": []}
+    days = dates.astype("datetime64[D]").astype("int64")
+    prices = np.rint(closes * COMPACT_PRICE_SCALE).astype("int64")
+    return {
+        "ticker": ticker,
+        "start": str(dates[0]),
+        "scale": COMPACT_PRICE_SCALE,
+        "day_deltas": np.diff(days, prepend=days[0]).tolist(),
+        "price_deltas": np.diff(prices, prepend=0).tolist(),
+    }
+
+
+def full_payload(ticker: str, dates, closes):
+    """기존 형식 {"ticker", "history": [{"date", "price"}, ...]} (pydantic 검증 없이 바로 생성)"""
+    date_strs = np.datetime_as_string(dates, unit="D").tolist()
+    return {"ticker": ticker,
+            "history": [{"date": d, "price": p} for d, p in zip(date_strs, closes.tolist())]}
+
+
+def _not_modified(request: Request, etag: str, last_modified: float):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # ETag가 있으면 If-Modified-Since보다 우선
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return etag in candidates or f"W/{etag}" in candidates or "*" in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def history_response(request: Request, ticker: str, period: str, arrays,
+                     last_modified: float = None, format: str = "full", indicator_specs=()):
+    """
+    (dates, closes) 배열로 차트 응답을 만듭니다. 클라이언트가 같은 ETag를 보내면 304.
+    indicator_specs: indicators.parse_spec() 결과 - 있으면 "indicators" 항목 추가 (날짜 배열과 같은 길이)
+    """
+    dates, closes = _clean(*arrays)
+    indicator_specs = tuple(indicator_specs or ())
+    etag = make_etag(ticker, period, dates, closes, indicator_specs, format)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}  # 매번 재검증 (바뀌었을 때만 본문)
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    body = _body_cache.get(etag)
+    if body is None:
+        payload = compact_payload(ticker, dates, closes) if format == "compact" else full_payload(ticker, dates, closes)
+        if indicator_specs:
+            payload["indicators"] = indicators.compute(ticker, period, dates, closes, indicator_specs)
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        _body_cache.set(etag, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,4 +1,8 @@
 # app/crud.py
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app import models, schemas, utils
 
@@ -6,6 +10,11 @@ from app import models, schemas, utils
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
+# 1-1. 이메일로 유저 찾기 (비동기 세션용)
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
 # 2. 유저 생성하기 (회원가입)
 def create_user(db: Session, user: schemas.UserCreate):
     # (1) 비밀번호 암호화 ("1234" -> "xkdl@#...")
@@ -23,4 +32,44 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.commit()      # 확정!
     db.refresh(db_user) # 저장된 정보를 다시 받아옴 (ID 등을 알기 위해)
     
-    return db_user
\ No newline at end of file
+    return db_user
+
+# 3. 자산 마스터 찾기 (없으면 티커 이름으로 생성)
+def get_or_create_asset(db: Session, code: str, type: str = "stock"):
+    asset = db.query(models.Asset).filter(models.Asset.code == code).first()
+    if asset is None:
+        asset = models.Asset(code=code, name=code, type=type)
+        db.add(asset)
+        db.flush()  # 브리핑 FK가 참조할 수 있도록 먼저 반영
+    return asset
+
+# 4. 저장된 AI 브리핑 찾기 (같은 입력 해시 + 최대 보관시간 이내)
+def get_cached_briefing(db: Session, ticker: str, input_hash: str, max_age_minutes: float):
+    since = datetime.now(timezone.utc) - timedelta(minutes=max_age_minutes)
+    return db.query(models.DailyBriefing).filter(
+        models.DailyBriefing.asset_code == ticker,
+        models.DailyBriefing.input_hash == input_hash,
+        models.DailyBriefing.created_at >= since
+    ).order_by(models.DailyBriefing.created_at.desc()).first()
+
+# 4-1. 종목의 가장 최근 브리핑 (입력 해시 무관 - AI 호출 실패 시 대체용)
+def get_latest_briefing(db: Session, ticker: str, max_age_minutes: float):
+    since = datetime.now(timezone.utc) - timedelta(minutes=max_age_minutes)
+    return db.query(models.DailyBriefing).filter(
+        models.DailyBriefing.asset_code == ticker,
+        models.DailyBriefing.created_at >= since
+    ).order_by(models.DailyBriefing.created_at.desc()).first()
+
+# 5. AI 브리핑 저장
+def save_briefing(db: Session, ticker: str, input_hash: str, summary_text: str, news_links: list):
+    get_or_create_asset(db, ticker)
+    db_briefing = models.DailyBriefing(
+        asset_code=ticker,
+        summary_text=summary_text,
+        news_links=json.dumps(news_links, ensure_ascii=False),
+        input_hash=input_hash
+    )
+    db.add(db_briefing)
+    db.commit()
+    db.refresh(db_briefing)
+    return db_briefing
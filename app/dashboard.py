@@ -0,0 +1,96 @@
+# app/dashboard.py
+# 대시보드 한 번에 불러오기 (관심종목 전체의 가격/뉴스/차트/AI 브리핑)
+# 종목별 섹션을 병렬로 만들고, 시세는 한 번의 일괄 조회 결과를 같이 씁니다.
+# AI 브리핑은 종목마다 따로 요청하지 않고 여러 종목을 묶어서 요청합니다.
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app import finance, briefings, resilience
+from app.database import SessionLocal
+from app.resilience import UpstreamUnavailable
+
+DASHBOARD_SNAPSHOT_WORKERS = int(os.getenv("DASHBOARD_SNAPSHOT_WORKERS", "16"))
+
+_snapshot_executor = ThreadPoolExecutor(max_workers=DASHBOARD_SNAPSHOT_WORKERS, thread_name_prefix="dashboard")
+
+
+def build_section(interest: dict, quote, index: int = 0):
+    """
+    종목 1개 섹션 (가격/뉴스/차트). 뉴스는 한 번만 받아서 화면용 목록과 AI 브리핑 입력에 같이 씁니다.
+    index는 관심종목 목록에서의 위치 (스트리밍은 준비된 순서로 오므로 화면에서 자리 맞춤용)
+    한 부분이 실패해도 나머지는 채워서 돌려주고, 실패한 부분은 errors에 남깁니다.
+    """
+    ticker = interest["ticker"]
+    section = {
+        "index": index,
+        "ticker": ticker,
+        "category": interest.get("category"),
+        "price": quote,
+        "news": [],
+        "history": None,
+        "briefing": None,
+        "errors": [],
+    }
+    if quote is None:
+        section["errors"].append("price")
+
+    try:
+        section["news"] = finance.get_integrated_news(ticker)
+    except Exception as e:
+        print(f"⚠️ Dashboard News Error ({ticker}): {e}")
+        section["errors"].append("news")
+
+    try:
+        history = finance.get_price_history(ticker)
+    except UpstreamUnavailable as e:
+        print(f"⚠️ Dashboard History Error ({ticker}): {e}")
+        history = None
+    if history:
+        section["history"] = history["history"]
+    else:
+        section["errors"].append("history")
+
+    return section
+
+
+def iter_sections(interests, include_briefing: bool = True):
+    """
+    준비되는 순서대로 섹션을 yield 합니다. (스트리밍 응답용)
+    브리핑이 필요하면 섹션들의 뉴스가 모인 뒤 여러 종목을 묶음 요청으로 한 번에 생성하고,
+    묶음이 끝나는 대로 해당 섹션을 내보냅니다.
+    """
+    if not interests:
+        return
+    quotes = finance.get_current_prices([item["ticker"] for item in interests])
+    futures = [
+        resilience.submit(_snapshot_executor, build_section, item, quotes.get(item["ticker"].strip().upper()), index)
+        for index, item in enumerate(interests)
+    ]
+
+    pending = {}
+    for future in as_completed(futures):
+        section = future.result()
+        if include_briefing and section["price"]:
+            pending[section["ticker"]] = section
+        else:
+            yield section
+    if not pending:
+        return
+
+    items = [(ticker, section["price"], section["news"]) for ticker, section in pending.items()]
+    try:
+        with SessionLocal() as db:
+            for ticker, briefing_text in briefings.iter_briefings(db, items):
+                section = pending.pop(ticker, None)
+                if section is not None:
+                    section["briefing"] = briefing_text
+                    yield section
+    except Exception as e:
+        print(f"⚠️ Dashboard Briefing Error: {e}")
+    for section in pending.values():
+        section["errors"].append("briefing")
+        yield section
+
+
+def build_snapshot(interests, include_briefing: bool = True):
+    """모든 섹션을 모아서 관심종목 순서대로 반환합니다."""
+    return sorted(iter_sections(interests, include_briefing), key=lambda section: section["index"])
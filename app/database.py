@@ -2,6 +2,8 @@
 # .env 를 읽어서 DB에 접속하는 역할
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -12,11 +14,53 @@ load_dotenv()
 # 2. DB 주소 가져오기
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
+# 커넥션 풀 설정 (워커 1개 기준)
+# 동기/비동기 엔진이 풀을 따로 가지므로, 워커당 최대 연결 수 = 두 엔진의 (pool_size + max_overflow) 합
+# 기본값은 예전 단일 풀 예산(10 + 20)을 절반씩 나눈 것 -> 워커당 최대 30
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))               # 동기 엔진: 항상 유지할 연결 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))        # 동기 엔진: 몰릴 때 추가로 열 수 있는 연결 수
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))           # 비동기 엔진
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))       # 빈 연결을 기다리는 최대 시간 (초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # 오래된 연결 교체 주기 (초)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"     # 끊긴 연결을 쓰기 전에 확인
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1000"))                  # SQL 컴파일 캐시
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))           # asyncpg prepared statement 캐시
+
+def _engine_options(url, pool_size, max_overflow):
+    options = {"query_cache_size": DB_QUERY_CACHE_SIZE, "pool_pre_ping": DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite":
+        # SQLite는 파일 1개라 풀 크기 조절 의미가 없고, 스레드 간 연결 공유만 허용
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(pool_size=pool_size, max_overflow=max_overflow,
+                       pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE)
+    return options
+
+def _async_url(url):
+    """동기 URL을 asyncio 드라이버 URL로 바꿈 (postgresql -> asyncpg, sqlite -> aiosqlite)"""
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        return url.update_query_dict({"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)})
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+_sync_url = make_url(SQLALCHEMY_DATABASE_URL)
+_async_db_url = make_url(os.getenv("ASYNC_DATABASE_URL")) if os.getenv("ASYNC_DATABASE_URL") else _async_url(_sync_url)
+
 # 3. 엔진 생성 (DB와의 연결 통로)
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(_sync_url, **_engine_options(_sync_url, DB_POOL_SIZE, DB_MAX_OVERFLOW))
+
+# 3-1. 비동기 엔진 (async def 엔드포인트용 - DB를 기다리는 동안 스레드를 붙잡지 않음)
+async_engine = create_async_engine(_async_db_url,
+                                   **_engine_options(_async_db_url, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW))
 
 # 4. 세션 생성기 (실제 작업할 때 쓰는 도구)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
 
 # 5. 모델의 기본 클래스 (나중에 테이블 모델 만들 때 씀)
 # model.py 의 User, Asset class에서 이 Base를 상속받아야 인식 가능
@@ -28,4 +72,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# 6-1. 비동기 DB 세션 가져오기
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,189 +1,286 @@
 # app/finance.py
-import yfinance as yf
-import requests
+import numpy as np
 import os
 from dotenv import load_dotenv
 import re
 import xml.etree.ElementTree as ET  # 구글 뉴스 RSS 해석용
+from concurrent.futures import ThreadPoolExecutor
+from app.cache import TTLCache
+from app import news_dedup, providers, resilience
+from app.resilience import UpstreamUnavailable
+from app.history_store import history_store
 
 load_dotenv()
 
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
 
-# 1. 가격 정보 가져오기 (기존 로직 유지 + 안전장치)
+# 시세 캐시 설정 (같은 종목을 여러 사용자가 봐도 야후 호출은 TTL당 1번)
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "30"))        # 초
+QUOTE_CACHE_MAXSIZE = int(os.getenv("QUOTE_CACHE_MAXSIZE", "2048"))
+
+_quote_cache = TTLCache(maxsize=QUOTE_CACHE_MAXSIZE, ttl=QUOTE_CACHE_TTL)
+
+# 여러 종목 동시 조회용 스레드 풀 (프로세스 전체에서 야후 동시 호출 수 상한)
+QUOTE_FANOUT_WORKERS = int(os.getenv("QUOTE_FANOUT_WORKERS", "16"))
+_quote_executor = ThreadPoolExecutor(max_workers=QUOTE_FANOUT_WORKERS, thread_name_prefix="quote")
+
+# 1. 가격 정보 가져오기 (캐시 경유)
 def get_current_price(ticker_symbol: str):
+    """
+    가격정보 dict 또는 None(없는 종목).
+    야후 장애 시 마지막 정상값을 stale 표시와 함께 반환하고, 그것도 없으면 UpstreamUnavailable.
+    """
+    ticker_symbol = ticker_symbol.strip().upper()
+    data = _quote_cache.get_or_load(ticker_symbol, lambda: _fetch_current_price(ticker_symbol))
+    if data and data.get("stale"):
+        _quote_cache.delete(ticker_symbol)   # 오래된 값은 캐시에 두지 않음 (다음 요청에서 다시 시도)
+    # 캐시에 든 dict를 호출부에서 수정해도(예: name 추가) 다른 요청에 번지지 않도록 복사본 반환
+    return dict(data) if data else None
+
+# 1-2. 여러 종목 가격 한번에 가져오기 (캐시 적중은 바로, 미스만 병렬로 조회)
+def get_current_prices(ticker_symbols):
+    """
+    {티커: 가격정보 또는 None} 딕셔너리를 반환합니다.
+    종목 수가 늘어도 지연시간은 가장 느린 1건 수준으로 유지됩니다.
+    """
+    symbols = list(dict.fromkeys(t.strip().upper() for t in ticker_symbols if t))  # 순서 유지 + 중복 제거
+    results = {}
+    missing = []
+    for symbol in symbols:
+        data = _quote_cache.get(symbol, count_miss=False)
+        if data is not None:
+            results[symbol] = dict(data)
+        else:
+            missing.append(symbol)
+
+    if len(missing) == 1:
+        results[missing[0]] = _price_or_none(missing[0])
+    elif missing:
+        futures = {symbol: resilience.submit(_quote_executor, _price_or_none, symbol) for symbol in missing}
+        for symbol, future in futures.items():
+            results[symbol] = future.result()
+
+    return results
+
+def _price_or_none(ticker_symbol: str):
+    """일괄 조회용: 장애로 못 받은 종목은 None (나머지 종목은 그대로 반환)"""
     try:
-        ticker_symbol = ticker_symbol.strip().upper()
-        # 환율 티커 처리 (KRW=X 등)
-        is_forex = "=X" in ticker_symbol or "-" in ticker_symbol
-        
-        ticker = yf.Ticker(ticker_symbol)
-        
-        # fast_info 사용 시도
-        try:
-            price = ticker.fast_info.last_price
-            previous_close = ticker.fast_info.previous_close
-            currency = ticker.fast_info.currency
-        except:
-            # 실패시 history 사용
-            hist = ticker.history(period="5d")
-            if hist.empty: return None
-            price = hist['Close'].iloc[-1]
-            previous_close = hist['Close'].iloc[-2] if len(hist) > 1 else price
-            # 통화 정보가 없으면 대충 추정
-            currency = "KRW" if ".KS" in ticker_symbol or ticker_symbol == "KRW=X" else "USD"
-
-        # 변동률 계산
-        change_rate = 0.0
-        if previous_close and previous_close > 0:
-            change_rate = ((price - previous_close) / previous_close) * 100
-
-        return {
-            "code": ticker_symbol,
-            "price": round(price, 2),
-            "change_percent": round(change_rate, 2),
-            "currency": currency
-        }
-    except Exception as e:
-        print(f"🚨 Price Error ({ticker_symbol}): {e}")
+        return get_current_price(ticker_symbol)
+    except UpstreamUnavailable:
         return None
 
+def get_quote_cache_stats():
+    """시세 캐시 적중/미스 통계 (TTL 튜닝용)"""
+    return _quote_cache.stats()
+
+# 1-1. 야후에서 실제로 가격 정보 가져오기 (데드라인 + 서킷 브레이커 + 마지막 정상값)
+def _fetch_current_price(ticker_symbol: str):
+    return resilience.call_with_stale("yahoo", ("quote", ticker_symbol), _yahoo_quote, ticker_symbol)
+
+def _yahoo_quote(ticker_symbol: str):
+    raw = providers.current().quote(ticker_symbol)
+    if raw is None: return None
+    price = raw["price"]
+    previous_close = raw["previous_close"]
+    # 통화 정보가 없으면 대충 추정
+    currency = raw["currency"] or ("KRW" if ".KS" in ticker_symbol or ticker_symbol == "KRW=X" else "USD")
+
+    # 변동률 계산
+    change_rate = 0.0
+    if previous_close and previous_close > 0:
+        change_rate = ((price - previous_close) / previous_close) * 100
+
+    return {
+        "code": ticker_symbol,
+        "price": round(price, 2),
+        "change_percent": round(change_rate, 2),
+        "currency": currency,
+        "previous_close": round(previous_close, 4) if previous_close else None
+    }
+
 # 2. 통합 뉴스 가져오기 (네이버 5 + 구글 RSS 5)
-# RSS -> XML을 가져와서 읽기
+# 두 출처를 동시에 호출하고, 출처별 데드라인을 넘기면 그 출처는 빼고 반환
+NAVER_NEWS_TIMEOUT = float(os.getenv("NAVER_NEWS_TIMEOUT", "3"))    # 초
+GOOGLE_RSS_TIMEOUT = float(os.getenv("GOOGLE_RSS_TIMEOUT", "5"))    # 초
+
+_news_executor = ThreadPoolExecutor(max_workers=int(os.getenv("NEWS_FANOUT_WORKERS", "16")),
+                                    thread_name_prefix="news")
+
 def get_integrated_news(ticker_symbol: str):
+    sources = [
+        ("naver", _fetch_naver_news, NAVER_NEWS_TIMEOUT),
+        ("google_rss", _fetch_google_news, GOOGLE_RSS_TIMEOUT),
+    ]
+    # 두 출처를 동시에 출발 -> 출처별 데드라인은 resilience 계층이 적용
+    futures = [(name, resilience.submit(_news_executor, _news_from, name, fetch, ticker_symbol, timeout))
+               for name, fetch, timeout in sources]
+
     news_list = []
-    
-    # (A) 네이버 뉴스 (국내 5개) - 기존 유지
-    try:
-        search_query = ticker_symbol
-        url = "https://openapi.naver.com/v1/search/news.json"
-        headers = {
-            "X-Naver-Client-Id": NAVER_CLIENT_ID,
-            "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
-        }
-        params = {"query": search_query, "display": 5, "sort": "sim"}
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            items = response.json().get("items", [])
-            for item in items:
-                clean_title = re.sub('<[^<]+?>', '', item['title'])
-                clean_title = clean_title.replace("&quot;", '"').replace("&amp;", "&")
-                
-                news_list.append({
-                    "title": clean_title,
-                    "link": item['originallink'] if item['originallink'] else item['link'],
-                    "source": "Domestic (Naver)",
-                    "pubDate": item['pubDate']
-                })
-    except Exception as e:
-        print(f"⚠️ Naver News Error: {e}")
-
-    # (B) 구글 뉴스 RSS (해외 5개) - [신규] 야후 대체 🚀
+    for name, future in futures:
+        news_list.extend(future.result())
+
+    # 여러 매체에 실린 같은 기사는 하나로 (source_count = 묶인 기사 수)
+    return news_dedup.dedupe_news(news_list)
+
+def _news_from(provider_name: str, fetch, ticker_symbol: str, timeout: float):
+    """출처 1개 조회. 장애 시 마지막 정상 목록, 그것도 없으면 빈 목록 (다른 출처 결과는 그대로)"""
     try:
-        # 검색어 설정: 티커 + "stock" (예: VOO stock)
-        rss_query = f"{ticker_symbol} stock"
-        # 구글 뉴스 RSS 주소 (미국/영어 설정)
-        rss_url = f"https://news.google.com/rss/search?q={rss_query}&hl=en-US&gl=US&ceid=US:en"
-        
-        rss_res = requests.get(rss_url, timeout=5)
-        
-        if rss_res.status_code == 200:
-            # XML 데이터 파싱 (분해)
-            root = ET.fromstring(rss_res.text)
-            
-            # <item> 태그 찾기 (뉴스 기사들)
-            count = 0
-            for item in root.findall('./channel/item'):
-                if count >= 5: break # 5개 제한
-                
-                title = item.find('title').text
-                link = item.find('link').text
-                pub_date = item.find('pubDate').text
-                
-                news_list.append({
-                    "title": title,
-                    "link": link,
-                    "source": "Global (Google)", # 출처 변경
-                    "pubDate": pub_date
-                })
-                count += 1
-    except Exception as e:
-        print(f"⚠️ Google RSS Error: {e}")
+        return resilience.call_with_stale(provider_name, ("news", ticker_symbol), fetch,
+                                          ticker_symbol, timeout, deadline=timeout)
+    except UpstreamUnavailable as e:
+        print(f"⚠️ {provider_name} News Unavailable ({ticker_symbol}): {e.reason}")
+        return []
+
+# 2-1. 네이버 뉴스 (국내 5개)
+def _fetch_naver_news(ticker_symbol: str, timeout: float):
+    items = providers.current().naver_news(ticker_symbol, 5, NAVER_CLIENT_ID, NAVER_CLIENT_SECRET, timeout)
 
+    news_list = []
+    for item in items:
+        clean_title = re.sub('<[^<]+?>', '', item['title'])
+        clean_title = clean_title.replace("&quot;", '"').replace("&amp;", "&")
+
+        news_list.append({
+            "title": clean_title,
+            "link": item['originallink'] if item['originallink'] else item['link'],
+            "source": "Domestic (Naver)",
+            "pubDate": item['pubDate']
+        })
     return news_list
 
-# 3. 차트 데이터 (기존 유지)
+# 2-2. 구글 뉴스 RSS (해외 5개) - 야후 대체 🚀
+def _fetch_google_news(ticker_symbol: str, timeout: float):
+    # 검색어 설정: 티커 + "stock" (예: VOO stock), 구글 뉴스 RSS (미국/영어 설정)
+    rss_text = providers.current().google_news(f"{ticker_symbol} stock", timeout)
+    if rss_text is None:
+        return []
+
+    # XML 데이터 파싱 (분해)
+    root = ET.fromstring(rss_text)
+
+    # <item> 태그 찾기 (뉴스 기사들) - 5개 제한
+    news_list = []
+    for item in root.findall('./channel/item')[:5]:
+        news_list.append({
+            "title": item.find('title').text,
+            "link": item.find('link').text,
+            "source": "Global (Google)",
+            "pubDate": item.find('pubDate').text
+        })
+    return news_list
+
+# 3. 차트 데이터 (3개월) - 범용 함수와 캐시를 같이 씀
 def get_price_history(ticker_symbol: str):
-    try:
-        ticker = yf.Ticker(ticker_symbol.strip().upper())
-        # [수정] 1달 -> 3달치 데이터로 변경 요청 반영
-        hist = ticker.history(period="3mo") 
-        
-        if hist.empty: return None
-
-        history_list = []
-        for date, row in hist.iterrows():
-            date_str = date.strftime("%Y-%m-%d")
-            history_list.append({
-                "date": date_str,
-                "price": row['Close']
-            })
-            
-        return {"ticker": ticker_symbol, "history": history_list}
-    except Exception:
-        return None
+    # [수정] 1달 -> 3달치 데이터로 변경 요청 반영
+    return get_price_history_custom(ticker_symbol, period="3mo")
 
 # ======================================================================
 # 주요 지수(Indices) 데이터 가져오기
 # ======================================================================
+# 야후 파이낸스 티커 기준
+MAJOR_INDICES = {
+    "KOSPI": "^KS11",
+    "NASDAQ": "^IXIC",
+    "S&P 500": "^GSPC",
+    "Nikkei 225": "^N225"
+}
+
 def get_major_indices():
-    # 야후 파이낸스 티커 기준
-    indices = {
-        "KOSPI": "^KS11",
-        "NASDAQ": "^IXIC",
-        "S&P 500": "^GSPC",
-        "Nikkei 225": "^N225"
-    }
-    
+    quotes = get_current_prices(MAJOR_INDICES.values()) # 4개 지수를 한번에 조회
     results = []
-    for name, ticker_symbol in indices.items():
-        data = get_current_price(ticker_symbol) # 기존 함수 재사용
+    for name, ticker_symbol in MAJOR_INDICES.items():
+        data = quotes.get(ticker_symbol)
         if data:
             data['name'] = name # 사람이 읽기 쉬운 이름 추가
             results.append(data)
             
     return results
 
-# 지수 차트 데이터 (3개월) - 범용 함수
+# 차트 데이터 캐시 (일봉이라 시세보다 길게 유지)
+HISTORY_CACHE_TTL = float(os.getenv("HISTORY_CACHE_TTL", "300"))   # 초
+_history_cache = TTLCache(maxsize=int(os.getenv("HISTORY_CACHE_MAXSIZE", "512")), ttl=HISTORY_CACHE_TTL)
+
+# 지수 차트 데이터 (3개월) - 범용 함수 (캐시 경유)
 def get_price_history_custom(ticker_symbol: str, period: str = "3mo"):
+    ticker_symbol = ticker_symbol.strip().upper()
+    return _history_cache.get_or_load((ticker_symbol, period),
+                                      lambda: _fetch_price_history(ticker_symbol, period))
+
+def _fetch_price_history(ticker_symbol: str, period: str):
+    # 로컬 일봉 저장소에서 배열로 꺼내기 (없는 날짜만 야후에서 이어받음)
+    arrays = get_history_arrays(ticker_symbol, period)
+    if arrays is None: return None
+
+    dates, closes = arrays
+    date_strs = np.datetime_as_string(dates, unit="D").tolist()
+    history_list = [{"date": d, "price": p} for d, p in zip(date_strs, closes.tolist())]
+    return {"ticker": ticker_symbol, "history": history_list}
+
+def get_history_arrays(ticker_symbol: str, period: str = "3mo"):
+    """(날짜 배열 datetime64[D], 종가 배열 float64) 또는 None. 저장된 데이터도 없이 야후 장애면 UpstreamUnavailable"""
     try:
-        ticker = yf.Ticker(ticker_symbol.strip().upper())
-        hist = ticker.history(period=period)
-        
-        if hist.empty: return None
-
-        history_list = []
-        for date, row in hist.iterrows():
-            date_str = date.strftime("%Y-%m-%d")
-            history_list.append({
-                "date": date_str,
-                "price": row['Close']
-            })
-            
-        return {"ticker": ticker_symbol, "history": history_list}
-    except Exception:
+        return history_store.get_arrays(ticker_symbol, period)
+    except ValueError as e:
+        print(f"⚠️ History Period Error ({ticker_symbol}): {e}")
+        return None
+
+def get_histories(ticker_symbols, period: str = "3mo"):
+    """
+    여러 종목의 (날짜, 종가) 배열을 병렬로 가져옵니다. {티커(대문자): 배열 튜플 또는 None}
+    저장소에 이미 있는 종목은 메모리 배열을 그대로 쓰고, 없는/오래된 종목만 야후를 호출합니다.
+    """
+    symbols = list(dict.fromkeys(t.strip().upper() for t in ticker_symbols))
+    futures = {symbol: resilience.submit(_quote_executor, _history_or_none, symbol, period) for symbol in symbols}
+    return {symbol: future.result() for symbol, future in futures.items()}
+
+def _history_or_none(ticker_symbol: str, period: str):
+    try:
+        return get_history_arrays(ticker_symbol, period)
+    except UpstreamUnavailable:
         return None
+
+def get_history_last_modified(ticker_symbol: str):
+    """차트 데이터가 마지막으로 바뀐 시각 (Last-Modified 헤더용)"""
+    return history_store.last_modified(ticker_symbol)
+
+# 3-1. 미리 데우기(스케줄러)용: 캐시를 건너뛰고 새로 받아 캐시에 넣기
+def refresh_price(ticker_symbol: str):
+    ticker_symbol = ticker_symbol.strip().upper()
+    data = _fetch_current_price(ticker_symbol)
+    if data and not data.get("stale"):
+        _quote_cache.set(ticker_symbol, data)
+    return data
+
+def refresh_price_history(ticker_symbol: str, period: str = "3mo"):
+    """일봉은 자주 바뀌지 않으므로 야후 확인 주기는 저장소(HISTORY_REFRESH_SECONDS)에 맡기고 캐시만 채움"""
+    ticker_symbol = ticker_symbol.strip().upper()
+    data = _fetch_price_history(ticker_symbol, period)
+    if data:
+        _history_cache.set((ticker_symbol, period), data)
+    return data
+
+def get_history_cache_stats():
+    return dict(_history_cache.stats(), store=history_store.stats())
     
 # app/finance.py에 추가
 
-def get_exchange_rate():
-    """실시간 USD/KRW 환율을 가져옵니다."""
-    try:
-        ticker = yf.Ticker("KRW=X")
-        return ticker.fast_info.last_price
-    except Exception as e:
-        print(f"⚠️ 환율 조회 실패: {e}")
-        return 1400.0 # 실패 시 임시 기본값
\ No newline at end of file
+def fx_ticker(currency: str, base_currency: str):
+    """통화쌍 야후 티커 (예: USD -> KRW = 'USDKRW=X')"""
+    return f"{currency}{base_currency}=X"
+
+def get_fx_rates(currencies, base_currency: str = "KRW"):
+    """
+    {통화: 기준통화 환산율} - 여러 통화를 한 번의 일괄 조회로 가져옵니다.
+    조회 실패한 통화는 None (임의의 기본값으로 채우지 않음)
+    """
+    base_currency = base_currency.upper()
+    currencies = {c.upper() for c in currencies if c}
+    rates = {base_currency: 1.0}
+    others = sorted(currencies - {base_currency})
+    if others:
+        quotes = get_current_prices([fx_ticker(c, base_currency) for c in others])
+        for currency in others:
+            quote = quotes.get(fx_ticker(currency, base_currency))
+            rates[currency] = quote["price"] if quote and quote.get("price") else None
+    return rates
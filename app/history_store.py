@@ -0,0 +1,196 @@
+# app/history_store.py
+# 종목별 일봉(OHLC) 로컬 저장소
+# 처음 한 번만 기간 전체를 받아오고, 이후에는 마지막 저장일 이후의 봉만 이어붙입니다.
+# 데이터는 종목당 압축 안 한 .npz(열 단위 배열) 파일 1개 + 메모리 사본으로 들고 있고,
+# 차트 요청은 네트워크/판다스 루프 없이 배열 슬라이싱만으로 응답합니다.
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+import numpy as np
+from app import providers, resilience
+from app.cache import TTLCache
+from app.resilience import UpstreamUnavailable
+
+HISTORY_STORE_DIR = os.getenv("HISTORY_STORE_DIR", "data/history")
+# 마지막 확인 후 이 시간이 지나야 야후에 새 봉이 있는지 다시 물어봄 (초)
+HISTORY_REFRESH_SECONDS = float(os.getenv("HISTORY_REFRESH_SECONDS", "300"))
+# 일봉 다운로드 데드라인 (시세 1건보다 응답이 큼)
+HISTORY_DOWNLOAD_DEADLINE = float(os.getenv("HISTORY_DOWNLOAD_DEADLINE", "10"))
+# 메모리에 들고 있을 종목 수 (넘치면 오래 안 쓴 종목부터 내림 - 다시 요청되면 디스크에서 읽음)
+HISTORY_STORE_MAXSIZE = int(os.getenv("HISTORY_STORE_MAXSIZE", "2048"))
+HISTORY_LOCK_STRIPES = 64   # 종목별 잠금 대신 고정 개수 잠금을 나눠 씀 (임의 티커 요청에도 늘어나지 않음)
+
+COLUMNS = providers.HISTORY_COLUMNS
+_MAX_START = np.datetime64("1900-01-01", "D")   # period="max" 일 때의 커버 시작일
+
+# yfinance period 문자열 -> 오늘 기준으로 거슬러 올라갈 기간
+_PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_start(period: str, today=None):
+    """'3mo', '1y', 'ytd', 'max' 같은 기간 문자열을 시작일(datetime64[D])로 바꿉니다."""
+    today = today if today is not None else np.datetime64("today", "D")
+    if period == "max":
+        return _MAX_START
+    if period == "ytd":
+        return today.astype("datetime64[Y]").astype("datetime64[D]")
+
+    match = _PERIOD_PATTERN.match(period)
+    if not match:
+        raise ValueError(f"지원하지 않는 기간입니다: {period}")
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return today - np.timedelta64(amount, "D")
+    if unit == "wk":
+        return today - np.timedelta64(amount * 7, "D")
+    months = amount if unit == "mo" else amount * 12
+    # 월 단위는 달력 기준으로 빼고, 일자는 가능한 범위에서 유지
+    month_start = today.astype("datetime64[M]") - np.timedelta64(months, "M")
+    day_offset = today - today.astype("datetime64[M]").astype("datetime64[D]")
+    next_month = (month_start + np.timedelta64(1, "M")).astype("datetime64[D]")
+    return min(month_start.astype("datetime64[D]") + day_offset, next_month - np.timedelta64(1, "D"))
+
+
+class _Series:
+    """한 종목의 배열 묶음 (dates + OHLCV)"""
+    def __init__(self, dates, columns, covered_from):
+        self.dates = dates              # datetime64[D], 오름차순
+        self.columns = columns          # {"close": float64 배열, ...}
+        self.covered_from = covered_from
+        self.checked_at = 0.0           # 마지막으로 야후에 확인한 시각 (monotonic)
+        self.verified_at = time.time()  # 마지막으로 야후 확인에 성공한 시각 (stale 나이 계산용)
+        self.modified_at = time.time()  # 데이터가 마지막으로 바뀐 시각 (Last-Modified 헤더용)
+
+
+class HistoryStore:
+    def __init__(self, root: str = HISTORY_STORE_DIR, refresh_seconds: float = HISTORY_REFRESH_SECONDS):
+        self.root = root
+        self.refresh_seconds = refresh_seconds
+        self._series = TTLCache(maxsize=HISTORY_STORE_MAXSIZE, ttl=float("inf"))
+        self._locks = [threading.Lock() for _ in range(HISTORY_LOCK_STRIPES)]
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+
+    # 1. 기간만큼 잘라서 반환 (dates, closes) - 없으면 None
+    def get_arrays(self, ticker: str, period: str = "3mo", column: str = "close"):
+        ticker = ticker.strip().upper()
+        start = period_start(period)
+        with self._lock_for(ticker):
+            series = self._ensure(ticker, start, period)
+        if series is None or len(series.dates) == 0:
+            return None
+        idx = np.searchsorted(series.dates, start)
+        return series.dates[idx:], series.columns[column][idx:]
+
+    def last_modified(self, ticker: str):
+        """종목 데이터가 마지막으로 바뀐 시각 (유닉스 초) - 없으면 None"""
+        series = self._series.get(ticker.strip().upper())
+        return series.modified_at if series else None
+
+    def stats(self):
+        return {
+            "tickers": self._series.stats()["size"],
+            "evictions": self._series.stats()["evictions"],
+            "full_fetches": self.full_fetches,
+            "incremental_fetches": self.incremental_fetches,
+            "root": self.root,
+        }
+
+    # 2. 저장소 상태 확인 -> 필요한 만큼만 야후 호출
+    def _ensure(self, ticker, start, period):
+        series = self._series.get(ticker)
+        if series is None:
+            series = self._load(ticker)
+
+        # (1) 처음이거나, 저장된 구간보다 더 과거가 필요하면 기간 전체 다운로드
+        if series is None or start < series.covered_from:
+            try:
+                fetched = self._download(ticker, period=period)
+            except UpstreamUnavailable:
+                fetched = None
+                if series is None:
+                    raise
+                self._serve_stale(series)
+            if fetched is None:
+                return series
+            dates, columns = fetched
+            series = _Series(dates, columns, start)
+            series.checked_at = time.monotonic()
+            self.full_fetches += 1
+            self._save(ticker, series)
+
+        # (2) 이미 있으면 마지막 저장일부터 이어받기 (당일 미완성 봉도 덮어씀)
+        elif time.monotonic() - series.checked_at > self.refresh_seconds:
+            last_date = str(series.dates[-1]) if len(series.dates) else str(series.covered_from)
+            try:
+                fetched = self._download(ticker, start=last_date)
+                series.verified_at = time.time()
+            except UpstreamUnavailable:
+                # 야후 장애: 갖고 있는 배열을 그대로 쓰고, 다음 요청에서 다시 확인
+                self._serve_stale(series)
+                self._series.set(ticker, series)
+                return series
+            series.checked_at = time.monotonic()
+            if fetched is not None and len(fetched[0]):
+                new_dates, new_columns = fetched
+                keep = np.searchsorted(series.dates, new_dates[0])
+                series.dates = np.concatenate([series.dates[:keep], new_dates])
+                merged = {name: np.concatenate([series.columns[name][:keep], new_columns[name]])
+                          for name in COLUMNS}
+                changed = (len(merged["close"]) != len(series.columns["close"])
+                           or not np.array_equal(merged["close"], series.columns["close"], equal_nan=True))
+                series.columns = merged
+                if changed:
+                    series.modified_at = time.time()
+                self.incremental_fetches += 1
+                self._save(ticker, series)
+
+        self._series.set(ticker, series)
+        return series
+
+    def _download(self, ticker, period=None, start=None):
+        """(dates, columns) 또는 None(데이터 없음). 야후 장애는 UpstreamUnavailable"""
+        return resilience.get_provider("yahoo").call(providers.current().history, ticker, period=period,
+                                                     start=start, deadline=HISTORY_DOWNLOAD_DEADLINE)
+
+    def _serve_stale(self, series):
+        resilience.mark_stale(None, time.time() - series.verified_at)
+
+    # 3. 디스크 입출력 (원자적 교체로 다른 워커가 반쯤 쓴 파일을 읽지 않게)
+    def _path(self, ticker):
+        safe_name = re.sub(r"[^A-Za-z0-9._=-]", "_", ticker)
+        return os.path.join(self.root, f"{safe_name}.npz")
+
+    def _load(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                columns = {name: data[name] for name in COLUMNS}
+                series = _Series(data["dates"], columns, data["covered_from"][()])
+            series.modified_at = os.path.getmtime(path)
+            series.verified_at = series.modified_at
+            return series
+        except Exception as e:
+            print(f"⚠️ History Store Read Error ({ticker}): {e}")
+            return None
+
+    def _save(self, ticker, series):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, dates=series.dates, covered_from=np.array(series.covered_from), **series.columns)
+            os.replace(tmp_path, self._path(ticker))
+        except Exception as e:
+            print(f"⚠️ History Store Write Error ({ticker}): {e}")
+
+    def _lock_for(self, ticker):
+        return self._locks[zlib.crc32(ticker.encode("utf-8")) % len(self._locks)]
+
+
+history_store = HistoryStore()
@@ -0,0 +1,28 @@
+# app/http_client.py
+# 외부 API(네이버/구글 RSS 등) 호출용 공용 HTTP 세션
+# 매 호출마다 TCP+TLS 연결을 새로 맺지 않도록 keep-alive 커넥션 풀을 재사용합니다.
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # 호스트별 풀 개수
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))          # 풀당 최대 연결 수
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """프로세스 전체에서 공유하는 requests.Session (스레드에서 동시에 써도 됨)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                                      pool_maxsize=HTTP_POOL_MAXSIZE,
+                                      max_retries=0)  # 재시도는 호출부 데드라인 안에서 판단
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
@@ -0,0 +1,149 @@
+# app/indicators.py
+# 기술적 지표 계산 (SMA/EMA, RSI, MACD, 볼린저 밴드, 변동성)
+# 종가 배열 전체를 한 번에 계산합니다. (이동창은 누적합/슬라이딩 윈도우, 지수평활은 pandas ewm)
+# 결과는 (종목, 기간, 지표, 파라미터, 데이터 끝 지점) 단위로 캐시합니다.
+import math
+import os
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from app.cache import TTLCache
+
+INDICATOR_CACHE_TTL = float(os.getenv("INDICATOR_CACHE_TTL", "300"))   # 초
+TRADING_DAYS_PER_YEAR = 252
+
+_indicator_cache = TTLCache(maxsize=int(os.getenv("INDICATOR_CACHE_MAXSIZE", "2048")), ttl=INDICATOR_CACHE_TTL)
+
+
+# 1. 지표 함수 (입력: 종가 배열 / 출력: 같은 길이의 배열, 계산 안 되는 앞부분은 NaN)
+def sma(closes, window: int = 20):
+    out = np.full(len(closes), np.nan)
+    if window <= len(closes):
+        sums = np.cumsum(np.insert(closes, 0, 0.0))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def ema(closes, span: int = 20):
+    out = pd.Series(closes).ewm(span=span, adjust=False).mean().to_numpy()
+    out[:span - 1] = np.nan   # 초기값 구간은 신뢰할 수 없으므로 비움
+    return out
+
+
+def rsi(closes, window: int = 14):
+    """와일더(Wilder) 방식 RSI"""
+    out = np.full(len(closes), np.nan)
+    if len(closes) <= window:
+        return out
+    delta = np.diff(closes)
+    gains = pd.Series(np.clip(delta, 0, None)).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    losses = pd.Series(np.clip(-delta, 0, None)).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+    out[1:] = values
+    out[:window] = np.nan
+    return out
+
+
+def macd(closes, fast: int = 12, slow: int = 26, signal: int = 9):
+    line = ema(closes, fast) - ema(closes, slow)
+    signal_line = np.full(len(closes), np.nan)
+    valid = ~np.isnan(line)
+    if valid.sum() >= signal:
+        signal_line[valid] = ema(line[valid], signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def _rolling_std(values, window: int):
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1)
+    return out
+
+
+def bollinger(closes, window: int = 20, num_std: float = 2.0):
+    middle = sma(closes, window)
+    band = _rolling_std(closes, window) * num_std
+    return {"middle": middle, "upper": middle + band, "lower": middle - band}
+
+
+def volatility(closes, window: int = 20):
+    """일간 로그수익률의 이동 표준편차를 연율화 (%)"""
+    out = np.full(len(closes), np.nan)
+    if len(closes) > 1:
+        log_returns = np.diff(np.log(closes))
+        out[1:] = _rolling_std(log_returns, window) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+    return out
+
+
+# 2. 지표 이름 -> (함수, 기본 파라미터)
+INDICATORS = {
+    "sma": (sma, (20,)),
+    "ema": (ema, (20,)),
+    "rsi": (rsi, (14,)),
+    "macd": (macd, (12, 26, 9)),
+    "bb": (bollinger, (20, 2.0)),
+    "vol": (volatility, (20,)),
+}
+
+
+def parse_spec(spec: str):
+    """
+    "sma:20,sma:60,rsi,macd:12:26:9,bb:20:2" -> [("sma", (20,)), ("sma", (60,)), ("rsi", (14,)), ...]
+    생략한 파라미터는 기본값, 잘못된 이름/값은 ValueError
+    (기간처럼 정수인 파라미터에 2.5 같은 소수는 잘라내지 않고 거부, inf/nan도 거부)
+    """
+    parsed = []
+    for item in filter(None, (part.strip().lower() for part in (spec or "").split(","))):
+        name, *raw_params = item.split(":")
+        if name not in INDICATORS:
+            raise ValueError(f"지원하지 않는 지표입니다: {name} (가능: {', '.join(INDICATORS)})")
+        defaults = INDICATORS[name][1]
+        if len(raw_params) > len(defaults):
+            raise ValueError(f"파라미터가 너무 많습니다: {item}")
+        try:
+            params = tuple(int(raw) if isinstance(default, int) else float(raw)
+                           for raw, default in zip(raw_params, defaults))
+        except ValueError:
+            raise ValueError(f"파라미터는 숫자여야 합니다 (기간은 정수): {item}")
+        params = params + defaults[len(params):]
+        if not all(math.isfinite(p) for p in params):
+            raise ValueError(f"파라미터는 유한한 숫자여야 합니다: {item}")
+        if any(p <= 0 for p in params):
+            raise ValueError(f"파라미터는 0보다 커야 합니다: {item}")
+        if (name, params) not in parsed:
+            parsed.append((name, params))
+    return parsed
+
+
+def spec_key(name: str, params):
+    """응답에 쓰는 지표 키 (예: sma_20, macd_12_26_9, bb_20_2)"""
+    return "_".join([name] + [f"{p:g}" for p in params])
+
+
+# 3. 캐시 경유 계산
+def compute(ticker: str, period: str, dates, closes, specs):
+    """
+    {지표 키: 값 리스트 또는 {하위 이름: 값 리스트}} - NaN은 None
+    같은 종목/기간이라도 마지막 봉이 바뀌면 다시 계산합니다.
+    """
+    if len(closes) == 0:
+        return {spec_key(name, params): None for name, params in specs}
+    data_version = (len(closes), str(dates[-1]), float(closes[-1]))
+    results = {}
+    for name, params in specs:
+        key = (ticker.strip().upper(), period, name, params, data_version)
+        results[spec_key(name, params)] = _indicator_cache.get_or_load(
+            key, lambda name=name, params=params: _to_json(INDICATORS[name][0](closes, *params)))
+    return results
+
+
+def get_indicator_cache_stats():
+    return _indicator_cache.stats()
+
+
+def _to_json(values):
+    if isinstance(values, dict):
+        return {name: _to_json(v) for name, v in values.items()}
+    rounded = np.round(values, 4)
+    return [None if np.isnan(v) else v for v in rounded.tolist()]
@@ -0,0 +1,245 @@
+# app/investor_flows.py
+# 수급 추적기: 투자자별(외국인/기관/개인) 일별 순매수 저장 + N일 연속 순매수 종목 찾기
+# 연속 일수는 (날짜 x 종목) 행렬 전체에 대해 run-length 계산을 한 번에 하고,
+# 새 거래일이 하루씩 들어오면 저장된 연속 일수에 그날 값만 이어붙여 갱신합니다.
+#
+# 실행: python -m app.investor_flows --fixture                 (로컬 CSV로 적재)
+#       python -m app.investor_flows --start 2026-10-01       (pykrx로 적재, 설치 필요)
+import argparse
+import os
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, delete, func
+from app import models
+from app.database import SessionLocal, engine
+
+INVESTORS = ("foreign", "institution", "individual")
+FLOW_FIXTURE_PATH = os.getenv("FLOW_FIXTURE_PATH",
+                              os.path.join(os.path.dirname(__file__), "data", "investor_flows_fixture.csv"))
+# 전체 재계산 시 거슬러 올라가는 최대 기간 (이보다 긴 연속은 이 값에서 잘림)
+FLOW_STREAK_LOOKBACK_DAYS = int(os.getenv("FLOW_STREAK_LOOKBACK_DAYS", "180"))
+
+
+# 1. 데이터 소스: fetch(start, end) -> DataFrame[trade_date, ticker, investor, net_buy]
+class CsvFlowSource:
+    """date,ticker,investor,net_buy 형식의 로컬 CSV (테스트/오프라인용)"""
+    def __init__(self, path: str = FLOW_FIXTURE_PATH):
+        self.path = path
+
+    def fetch(self, start: date = None, end: date = None):
+        frame = pd.read_csv(self.path, dtype={"ticker": str})
+        frame = frame.rename(columns={"date": "trade_date"})
+        frame["trade_date"] = pd.to_datetime(frame["trade_date"]).dt.date
+        if start:
+            frame = frame[frame["trade_date"] >= start]
+        if end:
+            frame = frame[frame["trade_date"] <= end]
+        return frame[["trade_date", "ticker", "investor", "net_buy"]]
+
+
+class PykrxFlowSource:
+    """한국거래소 투자자별 순매수 (pykrx 패키지가 설치되어 있을 때만 사용 가능)"""
+    INVESTOR_LABELS = {"foreign": "외국인", "institution": "기관합계", "individual": "개인"}
+
+    def __init__(self, market: str = "KOSPI", suffix: str = ".KS"):
+        self.market = market
+        self.suffix = suffix
+
+    def fetch(self, start: date = None, end: date = None):
+        try:
+            from pykrx import stock
+        except ImportError:
+            raise RuntimeError("pykrx가 설치되어 있지 않습니다. (pip install pykrx) 또는 --fixture 사용")
+
+        end = end or date.today()
+        start = start or end
+        frames = []
+        day = start
+        while day <= end:
+            if day.weekday() < 5:
+                for investor, label in self.INVESTOR_LABELS.items():
+                    try:
+                        raw = stock.get_market_net_purchases_of_equities(
+                            day.strftime("%Y%m%d"), day.strftime("%Y%m%d"), self.market, label)
+                    except Exception as e:
+                        print(f"⚠️ Investor Flow Fetch Error ({day}, {investor}): {e}")
+                        continue
+                    if raw is None or raw.empty:
+                        continue   # 휴장일
+                    frames.append(pd.DataFrame({
+                        "trade_date": day,
+                        "ticker": [f"{code}{self.suffix}" for code in raw.index],
+                        "investor": investor,
+                        "net_buy": raw["순매수거래대금"].to_numpy(dtype="float64"),
+                    }))
+            day += timedelta(days=1)
+        if not frames:
+            return pd.DataFrame(columns=["trade_date", "ticker", "investor", "net_buy"])
+        return pd.concat(frames, ignore_index=True)
+
+
+# 2. 연속 일수 계산 (벡터화)
+def compute_streaks(values):
+    """
+    values: (날짜 x 종목) 순매수 행렬 (NaN = 그날 데이터 없음 -> 연속 끊김)
+    반환: (streak, streak_amount) 같은 모양의 행렬
+      streak: +N = 그날까지 N일 연속 순매수, -N = N일 연속 순매도, 0 = 순매수 0/데이터 없음
+    """
+    values = np.nan_to_num(np.asarray(values, dtype="float64"), nan=0.0)
+    signs = np.sign(values)
+    n_days = len(values)
+    if n_days == 0:
+        return np.zeros_like(values, dtype="int64"), values
+
+    # 부호가 바뀌는 지점 = 새 구간 시작 -> 구간 시작 행 번호를 누적 최대값으로 전파
+    starts = np.ones_like(signs, dtype=bool)
+    starts[1:] = signs[1:] != signs[:-1]
+    rows = np.arange(n_days)[:, None]
+    run_start = np.maximum.accumulate(np.where(starts, rows, 0), axis=0)
+
+    streak = ((rows - run_start + 1) * signs).astype("int64")
+
+    # 구간 합계 = 누적합(오늘) - 누적합(구간 시작 전날)
+    cumulative = np.cumsum(values, axis=0)
+    before_start = np.where(run_start > 0,
+                            np.take_along_axis(cumulative, np.maximum(run_start - 1, 0), axis=0), 0.0)
+    streak_amount = np.where(signs != 0, cumulative - before_start, 0.0)
+    return streak, streak_amount
+
+
+def extend_streaks(prev_streak, prev_amount, values):
+    """저장된 연속 일수에 하루치 값을 이어붙임 (종목 배열 단위)"""
+    values = np.nan_to_num(np.asarray(values, dtype="float64"), nan=0.0)
+    signs = np.sign(values).astype("int64")
+    continues = (signs != 0) & (np.sign(prev_streak) == signs)
+    streak = np.where(continues, prev_streak + signs, signs)
+    streak_amount = np.where(continues, prev_amount + values, np.where(signs != 0, values, 0.0))
+    return streak, streak_amount
+
+
+# 3. 적재 + 연속 일수 갱신
+def ingest(source, start: date = None, end: date = None, session_factory=SessionLocal):
+    """소스에서 받은 일별 순매수를 저장하고, 들어온 날짜 순서대로 연속 일수를 갱신합니다."""
+    frame = source.fetch(start, end)
+    if frame.empty:
+        print("📭 Investor Flow: 새 데이터 없음")
+        return {"rows": 0, "days": 0}
+
+    frame = frame[frame["investor"].isin(INVESTORS)].drop_duplicates(
+        ["trade_date", "ticker", "investor"], keep="last")
+    days = sorted(frame["trade_date"].unique())
+
+    with session_factory() as db:
+        # 같은 (날짜, 투자자)를 다시 받으면 덮어쓰기 (삭제 후 일괄 삽입)
+        # 이번에 안 들어온 투자자의 기존 데이터는 그대로 둠 (일부 투자자 조회 실패/부분 CSV)
+        for investor, investor_days in frame.groupby("investor")["trade_date"].unique().items():
+            db.execute(delete(models.InvestorFlow).where(models.InvestorFlow.investor == investor,
+                                                         models.InvestorFlow.trade_date.in_(list(investor_days))))
+        db.execute(models.InvestorFlow.__table__.insert(), frame.to_dict("records"))
+        db.flush()
+
+        for investor in INVESTORS:
+            investor_frame = frame[frame["investor"] == investor]
+            if investor_frame.empty:
+                continue
+            as_of = _streak_as_of(db, investor)
+            investor_days = sorted(investor_frame["trade_date"].unique())
+            if as_of is None or investor_days[0] > as_of:
+                # 새 거래일만 들어옴 -> 날짜 순서대로 이어붙이기
+                for day in investor_days:
+                    _update_streaks(db, investor, day, investor_frame[investor_frame["trade_date"] == day])
+            else:
+                # 이미 반영한 과거 날짜를 다시 받음 -> 최신일 기준 한 번만 재계산
+                _rebuild_streaks(db, investor, max(as_of, investor_days[-1]))
+        db.commit()
+
+    print(f"📊 Investor Flow: {len(frame)} rows, {len(days)} days ({days[0]} ~ {days[-1]})")
+    return {"rows": len(frame), "days": len(days)}
+
+
+def _streak_as_of(db, investor):
+    return db.execute(
+        select(func.max(models.InvestorFlowStreak.as_of)).where(models.InvestorFlowStreak.investor == investor)
+    ).scalar()
+
+
+def _update_streaks(db, investor, day, day_frame):
+    previous_day = db.execute(
+        select(func.max(models.InvestorFlow.trade_date))
+        .where(models.InvestorFlow.investor == investor, models.InvestorFlow.trade_date < day)
+    ).scalar()
+    if previous_day is None or _streak_as_of(db, investor) != previous_day:
+        # 처음이거나 저장된 결과가 바로 전 거래일 기준이 아니면 구간 전체 재계산
+        _rebuild_streaks(db, investor, day)
+        return
+
+    # 저장된 연속 일수가 바로 전 거래일 기준이면 오늘 값만 이어붙이기
+    stored = db.execute(
+        select(models.InvestorFlowStreak).where(models.InvestorFlowStreak.investor == investor)
+    ).scalars().all()
+    current = {row.ticker: row for row in stored}
+    tickers = sorted(set(current) | set(day_frame["ticker"]))
+    today = day_frame.set_index("ticker")["net_buy"].reindex(tickers).to_numpy(dtype="float64")
+    prev_streak = np.array([current[t].streak if t in current else 0 for t in tickers], dtype="int64")
+    prev_amount = np.array([current[t].streak_amount if t in current else 0.0 for t in tickers])
+    streak, amount = extend_streaks(prev_streak, prev_amount, today)
+    _save_streaks(db, investor, day, tickers, streak, amount, today)
+
+
+def _rebuild_streaks(db, investor, day):
+    tickers, matrix = _load_matrix(db, investor, day)
+    if not tickers:
+        return
+    streak, amount = compute_streaks(matrix)
+    _save_streaks(db, investor, day, tickers, streak[-1], amount[-1], matrix[-1])
+
+
+def _save_streaks(db, investor, day, tickers, streak, amount, today):
+    db.execute(delete(models.InvestorFlowStreak).where(models.InvestorFlowStreak.investor == investor))
+    db.execute(models.InvestorFlowStreak.__table__.insert(), [
+        {"ticker": t, "investor": investor, "as_of": day, "streak": s, "streak_amount": a,
+         "net_buy": 0.0 if np.isnan(v) else v}
+        for t, s, a, v in zip(tickers, streak.tolist(), amount.tolist(), today.tolist())
+    ])
+
+
+def _load_matrix(db, investor, day):
+    """investor의 (day - lookback ~ day) 순매수를 (날짜 x 종목) 행렬로"""
+    rows = db.execute(
+        select(models.InvestorFlow.trade_date, models.InvestorFlow.ticker, models.InvestorFlow.net_buy)
+        .where(models.InvestorFlow.investor == investor,
+               models.InvestorFlow.trade_date <= day,
+               models.InvestorFlow.trade_date > day - timedelta(days=FLOW_STREAK_LOOKBACK_DAYS))
+    ).all()
+    frame = pd.DataFrame(rows, columns=["trade_date", "ticker", "net_buy"])
+    matrix = frame.pivot(index="trade_date", columns="ticker", values="net_buy").sort_index()
+    return list(matrix.columns), matrix.to_numpy(dtype="float64")
+
+
+# 4. 조회
+def streaks_query(investor: str = "foreign", min_days: int = 3, side: str = "buy", limit: int = 50):
+    """min_days일 이상 연속 순매수(side=buy) 또는 순매도(side=sell) 중인 종목 (긴 순서)"""
+    streak = models.InvestorFlowStreak.streak
+    query = select(models.InvestorFlowStreak).where(models.InvestorFlowStreak.investor == investor)
+    if side == "buy":
+        query = query.where(streak >= min_days).order_by(streak.desc(), models.InvestorFlowStreak.streak_amount.desc())
+    else:
+        query = query.where(streak <= -min_days).order_by(streak.asc(), models.InvestorFlowStreak.streak_amount.asc())
+    return query.limit(limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="투자자별 순매수 적재 + 연속 순매수 갱신")
+    parser.add_argument("--fixture", nargs="?", const=FLOW_FIXTURE_PATH, help="pykrx 대신 로컬 CSV 사용")
+    parser.add_argument("--start", type=date.fromisoformat, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="종료일 (YYYY-MM-DD, 기본 오늘)")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    source = CsvFlowSource(args.fixture) if args.fixture else PykrxFlowSource()
+    ingest(source, args.start, args.end)
+
+
+if __name__ == "__main__":
+    main()
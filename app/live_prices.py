@@ -0,0 +1,127 @@
+# app/live_prices.py
+# 웹소켓 실시간 시세 허브
+# 접속자가 몇 명이든 종목당 1번만 시세를 가져와서 구독자 전원에게 같은 메시지를 뿌립니다.
+# (야후 호출 수 = 구독 중인 "서로 다른 종목 수", 접속자 수와 무관)
+import asyncio
+import json
+import os
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+from app import finance
+
+LIVE_PRICE_INTERVAL = float(os.getenv("LIVE_PRICE_INTERVAL", "10"))   # 초
+LIVE_PRICE_MAX_TICKERS = int(os.getenv("LIVE_PRICE_MAX_TICKERS", "50"))  # 접속 1개당 구독 상한
+
+
+class PriceHub:
+    def __init__(self, interval: float = LIVE_PRICE_INTERVAL):
+        self.interval = interval
+        self._subscribers = {}   # ticker -> {websocket, ...}
+        self._connections = {}   # websocket -> {ticker, ...}
+        self._last_sent = {}     # ticker -> 마지막으로 보낸 시세 (변한 것만 다시 보냄)
+        self._lock = asyncio.Lock()
+        self._task = None
+        self.broadcasts = 0
+
+    # 1. 시작/종료 (FastAPI lifespan에서 호출)
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # 2. 구독 관리
+    async def subscribe(self, websocket: WebSocket, tickers):
+        tickers = [t.strip().upper() for t in tickers if t and t.strip()]
+        async with self._lock:
+            current = self._connections.setdefault(websocket, set())
+            tickers = [t for t in dict.fromkeys(tickers) if t not in current]
+            tickers = tickers[:max(0, LIVE_PRICE_MAX_TICKERS - len(current))]
+            for ticker in tickers:
+                current.add(ticker)
+                self._subscribers.setdefault(ticker, set()).add(websocket)
+
+        # 새로 구독한 종목은 다음 주기를 기다리지 않고 바로 한 번 보내줌 (캐시에 있으면 즉시)
+        if tickers:
+            quotes = await run_in_threadpool(finance.get_current_prices, tickers)
+            for ticker, quote in quotes.items():
+                if quote:
+                    await self._safe_send(websocket, _price_message(quote))
+        return tickers
+
+    async def unsubscribe(self, websocket: WebSocket, tickers):
+        async with self._lock:
+            current = self._connections.get(websocket, set())
+            for ticker in (t.strip().upper() for t in tickers if t):
+                current.discard(ticker)
+                self._remove_subscriber(ticker, websocket)
+
+    async def disconnect(self, websocket: WebSocket):
+        async with self._lock:
+            for ticker in self._connections.pop(websocket, set()):
+                self._remove_subscriber(ticker, websocket)
+
+    def _remove_subscriber(self, ticker, websocket):
+        sockets = self._subscribers.get(ticker)
+        if sockets is None:
+            return
+        sockets.discard(websocket)
+        if not sockets:
+            del self._subscribers[ticker]
+            self._last_sent.pop(ticker, None)
+
+    # 3. 주기적으로 종목별 시세 1번 조회 -> 구독자 전원에게 전송
+    async def _loop(self):
+        while True:
+            try:
+                await self.publish_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"🚨 Live Price Error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def publish_once(self):
+        async with self._lock:
+            tickers = list(self._subscribers)
+        if not tickers:
+            return
+
+        quotes = await run_in_threadpool(finance.get_current_prices, tickers)
+        for ticker, quote in quotes.items():
+            if not quote or self._last_sent.get(ticker) == quote:
+                continue
+            self._last_sent[ticker] = quote
+            message = _price_message(quote)   # 종목당 메시지 1번만 직렬화
+            async with self._lock:
+                sockets = list(self._subscribers.get(ticker, ()))
+            await asyncio.gather(*(self._safe_send(ws, message) for ws in sockets))
+            self.broadcasts += 1
+
+    async def _safe_send(self, websocket: WebSocket, message: str):
+        try:
+            await websocket.send_text(message)
+        except Exception:
+            await self.disconnect(websocket)   # 끊긴 소켓 정리
+
+    def stats(self):
+        return {
+            "connections": len(self._connections),
+            "tickers": len(self._subscribers),
+            "interval": self.interval,
+            "broadcasts": self.broadcasts,
+        }
+
+
+def _price_message(quote: dict):
+    return json.dumps({"type": "price", "data": quote}, ensure_ascii=False)
+
+
+price_hub = PriceHub()
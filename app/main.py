@@ -1,8 +1,10 @@
 # app/main.py
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app import models, schemas, crud
-from app.database import engine, get_db
+from app.database import engine, get_db, get_async_db, AsyncSessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # 로그인 API 만들기
 from fastapi.security import OAuth2PasswordRequestForm
@@ -11,22 +13,65 @@ from app import utils
 # 의존성 함수 get_current_user
 from fastapi.security import OAuth2PasswordBearer  # <--- 토큰 추출기
 from jose import jwt, JWTError                     # <--- 토큰 해독기
-from app import models, schemas, crud, utils, finance, news_collector
+from app import models, schemas, crud, utils, finance, news_collector, auth_cache
 from typing import List     # 리스트 형태를 쓰기 위해 필요
 
 # 서버와 HTML 연결하기
 from fastapi import Request
 from fastapi.templating import Jinja2Templates  # 템플릿 엔진 추가
 from fastapi.responses import HTMLResponse      # HTML 응답 추가
+from fastapi.responses import StreamingResponse, Response, JSONResponse # SSE 스트리밍 응답, 저장된 JSON 그대로 응답
+import json
 
 # AI 모듈 가져오기
-from app import ai_analyst
+from app import ai_analyst, briefings, dashboard, chart_response, valuation
+from app.history_store import period_start
+from app import investor_flows, calendar_events, resilience, rate_limiter, providers
+from datetime import date
+from app import indicators as indicator_engine   # 쿼리 파라미터 이름(indicators)과 겹치지 않게
+
+
+# 백그라운드 미리 데우기 스케줄러 / 실시간 시세 허브
+from app import scheduler, live_prices
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 
 
 # 1. DB 테이블 자동 생성 (혹시 안 만들어진 게 있다면)
 models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
+# 1-1. 기존 테이블에 빠진 컬럼 추가 (실패하면 시작 시 한 번만 알리고 브리핑 캐시 없이 동작)
+if not models.upgrade_schema(engine):
+    briefings.disable_cache("DB 스키마 업그레이드 실패 - daily_briefings.input_hash 없음")
+
+# 앱 시작/종료 시 백그라운드 작업 켜고 끄기
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if scheduler.PREWARM_ENABLED:
+        scheduler.prewarm_scheduler.start()
+    live_prices.price_hub.start()
+    yield
+    await live_prices.price_hub.stop()
+    scheduler.prewarm_scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# 외부 API 장애 + 대신 줄 마지막 정상값도 없음 -> 404 대신 503 (잠시 후 다시 시도)
+@app.exception_handler(resilience.UpstreamUnavailable)
+async def upstream_unavailable_handler(request: Request, exc: resilience.UpstreamUnavailable):
+    headers = {"Retry-After": str(max(1, int(exc.retry_after or 5)))}
+    return JSONResponse(status_code=503, headers=headers,
+                        content={"detail": "외부 데이터 서버 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요.",
+                                 "provider": exc.provider})
+
+# 마지막 정상값(stale)으로 응답했다면 가장 오래된 값의 나이를 헤더로 알려줌
+@app.middleware("http")
+async def stale_age_header(request: Request, call_next):
+    with resilience.track_request_staleness() as staleness:
+        response = await call_next(request)
+    if "age" in staleness:
+        response.headers["X-Stale-Age"] = str(staleness["age"])
+    return response
 
 # HTML 템플릿 폴더 지정
 templates = Jinja2Templates(directory="app/templates")
@@ -67,31 +112,44 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
 # 1. 토큰을 어디서 가져올지 설정 (Url="login"은 Swagger UI에서 자물쇠 버튼을 누르면 login API를 호출하라는 뜻)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-# 2. 현재 로그인한 사용자 가져오기 (경비원 함수)
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    # 자격 증명 실패 시 내보낼 에러 메시지 미리 준비
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="자격 증명을 검증할 수 없습니다 (유효하지 않은 토큰).",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+# 2. 토큰 해독 (utils에 있는 비밀키 사용) - 위조/만료/이메일 없음이면 None
+def _decode_token(token: str):
     try:
-        # (1) 토큰 해독 (utils에 있는 비밀키 사용)
         payload = jwt.decode(token, utils.SECRET_KEY, algorithms=[utils.ALGORITHM])
-        email: str = payload.get("sub") # 토큰 안에 'sub'라는 이름으로 이메일이 들어있음
-        
-        if email is None:
-            raise credentials_exception
-            
     except JWTError:
-        raise credentials_exception # 토큰이 위조되었거나 만료됨
+        return None # 토큰이 위조되었거나 만료됨
+    # 토큰 안에 'sub'라는 이름으로 이메일이 들어있음
+    return payload if payload.get("sub") else None
+
+# 2-1. 토큰 검증 (비동기 세션) - 실패 시 None
+async def authenticate_token(token: str, db: AsyncSession):
+    # (0) 이미 검증한 토큰이면 DB까지 가지 않고 바로 반환 (토큰 exp까지만 유효)
+    cached_user = auth_cache.token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    # (1) 토큰 해독
+    payload = _decode_token(token)
+    if payload is None:
+        return None
         
-    # (2) 해독된 이메일로 진짜 유저가 DB에 있는지 확인
-    user = crud.get_user_by_email(db, email=email)
+    # (2) 해독된 이메일로 진짜 유저가 DB에 있는지 확인 (기다리는 동안 스레드를 붙잡지 않음)
+    user = await crud.get_user_by_email_async(db, email=payload["sub"])
     if user is None:
-        raise credentials_exception
+        return None
         
+    # (3) 세션과 분리된 가벼운 스냅샷으로 캐시에 넣어두고 반환
+    return auth_cache.token_cache.put(token, user, payload.get("exp"))
+
+# 2-2. 현재 로그인한 사용자 가져오기 (경비원 함수)
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_token(token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="자격 증명을 검증할 수 없습니다 (유효하지 않은 토큰).",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 # 3. 내 정보 보기 API (보호된 라우트 테스트용)
@@ -173,17 +231,17 @@ def read_asset_news(ticker: str, user: models.User = Depends(get_current_user)):
 
 # 6-1. 관심종목 추가 (POST)
 @app.post("/interests", response_model=schemas.InterestCreate)
-def create_interest(interest: schemas.InterestCreate,
-                    db: Session = Depends(get_db),
-                    user: models.User = Depends(get_current_user)):
+async def create_interest(interest: schemas.InterestCreate,
+                          db: AsyncSession = Depends(get_async_db),
+                          user: models.User = Depends(get_current_user)):
     """
     관심 종목을 디비에 저장. (이미 있는건 중복 저장 안함)
     """
     # 1. 중복확인
-    existing_interest = db.query(models.UserInterest).filter(
+    existing_interest = (await db.execute(select(models.UserInterest).where(
         models.UserInterest.user_id == user.id,
         models.UserInterest.ticker == interest.ticker
-    ).first()
+    ))).scalars().first()
 
     if existing_interest:
         raise HTTPException(status_code=400, detail="이미 관심 종목에 등록되어 있습니다.")
@@ -195,61 +253,93 @@ def create_interest(interest: schemas.InterestCreate,
         user_id = user.id
     )
     db.add(new_interest)
-    db.commit()
-    db.refresh(new_interest)
+    await _bump_calendar_generation(db, user.id)   # 캘린더에 보일 종목이 바뀜
+    await db.commit()
+    await db.refresh(new_interest)
     return new_interest
 
+async def _bump_calendar_generation(db: AsyncSession, user_id: int):
+    # 커밋과 같은 트랜잭션 -> 다른 워커의 캘린더 캐시도 다음 요청부터 새 키를 씀
+    await db.execute(calendar_events.bump_generation(db.bind.dialect.name, calendar_events.user_scope(user_id)))
+
 # 6-2. 내 관심 목록 조회 (GET)
 @app.get("/interests", response_model=List[schemas.InterestResponse])
-def read_interests(db: Session = Depends(get_db), 
-                   user: models.User = Depends(get_current_user)):
+async def read_interests(db: AsyncSession = Depends(get_async_db), 
+                         user: models.User = Depends(get_current_user)):
     """
     로그인한 사용자의 모든 관심 종목을 가져옵니다.
     """
-    return user.interests
+    result = await db.execute(select(models.UserInterest).where(models.UserInterest.user_id == user.id))
+    return result.scalars().all()
 
 # 6-3. 관심 종목 삭제 (DELETE)
 @app.delete("/interests/{ticker}")
-def delete_interest(ticker: str, 
-                    db: Session = Depends(get_db), 
-                    user: models.User = Depends(get_current_user)):
+async def delete_interest(ticker: str, 
+                          db: AsyncSession = Depends(get_async_db), 
+                          user: models.User = Depends(get_current_user)):
     """
     특정 종목(ticker)을 관심 목록에서 삭제합니다.
     """
     # 1. 삭제할 대상을 찾음 (내 아이디 + 티커)
-    target = db.query(models.UserInterest).filter(
+    target = (await db.execute(select(models.UserInterest).where(
         models.UserInterest.user_id == user.id,
         models.UserInterest.ticker == ticker
-    ).first()
+    ))).scalars().first()
     
     if not target:
         raise HTTPException(status_code=404, detail="해당 종목이 관심 목록에 없습니다.")
     
     # 2. 삭제 실행
-    db.delete(target)
-    db.commit()
+    await db.delete(target)
+    await _bump_calendar_generation(db, user.id)   # 캘린더에 보일 종목이 바뀜
+    await db.commit()
     return {"msg": f"{ticker} 삭제 완료"}
 
 # 7. 주가 차트 데이터 조회 API 
 @app.get("/assets/history/{ticker}", response_model=schemas.HistoryResponse)
 def read_asset_history(ticker: str,
+                       request: Request,
+                       period: str = "3mo",
+                       format: str = Query("full", pattern="^(full|compact)$"),
+                       indicators: str = None,
                        user: models.User = Depends(get_current_user)):
     """
-    특정 종목의 1달치 추가 차트용 흐름 데이터를 가져옴
+    특정 종목의 차트용 흐름 데이터를 가져옴 (기본 3달치)
+    format=compact 이면 시작일 + 차분 배열 형식, 안 바뀐 차트는 304 응답
+    indicators=sma:20,rsi:14,macd,bb:20:2 처럼 주면 기술적 지표도 같이 반환
     """
-    data = finance.get_price_history(ticker)
+    _validate_period(period)
+    specs = _parse_indicator_specs(indicators)
+    arrays = finance.get_history_arrays(ticker, period)
 
-    if not data:
+    if arrays is None:
         raise HTTPException(status_code=404, detail="과거 데이터를 불러올 수 없습니다.")
     
-    return data
+    return chart_response.history_response(request, ticker, period, arrays,
+                                           finance.get_history_last_modified(ticker), format, specs)
+
+def _parse_indicator_specs(spec: str):
+    try:
+        return indicator_engine.parse_spec(spec)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _validate_period(period: str):
+    # 잘못된 기간은 데이터 조회 전에 400 (조회 쪽에서는 "데이터 없음"으로 묻혀버림)
+    try:
+        period_start(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 # 8. AI 브리핑 조회 API
 @app.get("/assets/briefing/{ticker}", response_model=schemas.AiBriefingResponse)
-def read_asset_briefing(ticker: str, user: models.User = Depends(get_current_user)):
+def read_asset_briefing(ticker: str,
+                        db: Session = Depends(get_db),
+                        user: models.User = Depends(get_current_user)):
     """
     종목의 가격과 뉴스를 종합하여 AI가 등락 원인을 분석해줍니다.
+    (입력이 그대로면 DB에 저장된 브리핑을 바로 돌려줍니다)
     """
     # 1. 가격 정보 가져오기
     price_info = finance.get_current_price(ticker)
@@ -259,14 +349,75 @@ def read_asset_briefing(ticker: str, user: models.User = Depends(get_current_use
     # 2. 통합 뉴스 가져오기
     news_list = finance.get_integrated_news(ticker)
     
-    # 3. AI에게 분석 요청 (시간이 2~3초 걸림)
-    briefing_text = ai_analyst.analyze_market_data(ticker, price_info, news_list)
+    # 3. 저장된 브리핑 재사용 or AI에게 분석 요청 (새로 만들 땐 2~3초 걸림)
+    briefing_text = briefings.get_briefing(db, ticker, price_info, news_list)
     
     return {
         "ticker": ticker,
         "briefing": briefing_text
     }
 
+# 8-1. AI 브리핑 스트리밍 API (Server-Sent Events)
+@app.get("/assets/briefing/{ticker}/stream")
+def stream_asset_briefing(ticker: str, user: models.User = Depends(get_current_user)):
+    """
+    AI 브리핑을 생성되는 대로 SSE로 흘려보냅니다. (첫 글자가 수백 ms 안에 도착)
+    - data: {"text": "..."}  : 브리핑 조각
+    - event: done            : 생성 완료
+    - event: error           : 생성 도중 오류 (data.message에 안내 문구)
+    """
+    price_info = finance.get_current_price(ticker)
+    if not price_info:
+        raise HTTPException(status_code=404, detail="가격 정보를 찾을 수 없습니다.")
+
+    news_list = finance.get_integrated_news(ticker)
+
+    def event_stream():
+        try:
+            for text in briefings.stream_briefing(ticker, price_info, news_list):
+                yield _sse_event({"text": text})
+            yield _sse_event({"ticker": ticker}, event="done")
+        except Exception as e:
+            print(f"🚨 AI Streaming Error: {e}")
+            yield _sse_event({"message": ai_analyst.AI_ERROR_MESSAGE}, event="error")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _sse_event(data: dict, event: str = None):
+    """SSE 한 건 포맷팅 (줄바꿈이 섞인 본문도 안전하도록 JSON으로 감쌈)"""
+    payload = json.dumps(data, ensure_ascii=False)
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n"
+
+
+# 9. 대시보드 한 번에 조회 API (관심종목 전체의 가격 + 뉴스 + 차트 + AI 브리핑)
+@app.get("/dashboard/snapshot")
+def read_dashboard_snapshot(include_briefing: bool = True,
+                            stream: bool = False,
+                            db: Session = Depends(get_db),
+                            user: models.User = Depends(get_current_user)):
+    """
+    관심종목마다 4번씩 나눠 부르던 API를 한 번에 처리합니다. (인증/DB 조회 1번, 종목별 병렬 수집)
+    stream=true 이면 종목 섹션이 준비되는 대로 한 줄씩(NDJSON) 내려보냅니다.
+    """
+    interests = [
+        schemas.InterestResponse.model_validate(item).model_dump()
+        for item in db.query(models.UserInterest).filter(models.UserInterest.user_id == user.id)
+                      .order_by(models.UserInterest.id).all()
+    ]
+
+    if stream:
+        def line_stream():
+            for section in dashboard.iter_sections(interests, include_briefing):
+                yield json.dumps(section, ensure_ascii=False) + "\n"
+        return StreamingResponse(line_stream(), media_type="application/x-ndjson")
+
+    return {
+        "interests": interests,
+        "sections": dashboard.build_snapshot(interests, include_briefing)
+    }
+
 
 # ======================================================================
 # 홈 화면 항목
@@ -280,7 +431,11 @@ def read_home_indices():
 
 # [홈] 3. 차트 데이터 조회 (지수용 - 3개월)
 @app.get("/home/chart/{ticker}")
-def read_home_chart(ticker: str):
+def read_home_chart(ticker: str,
+                    request: Request,
+                    period: str = "3mo",
+                    format: str = Query("full", pattern="^(full|compact)$"),
+                    indicators: str = None):
     # 특수문자 처리 (KOSPI 등은 URL에서 문제가 될 수 있으므로 매핑)
     ticker_map = {
         "KOSPI": "^KS11",
@@ -289,14 +444,20 @@ def read_home_chart(ticker: str):
         "NIKKEI": "^N225"
     }
     real_ticker = ticker_map.get(ticker, ticker)
-    return finance.get_price_history_custom(real_ticker, period="3mo")
+    _validate_period(period)
+    specs = _parse_indicator_specs(indicators)
+    arrays = finance.get_history_arrays(real_ticker, period)
+    if arrays is None:
+        return None
+    return chart_response.history_response(request, real_ticker, period, arrays,
+                                           finance.get_history_last_modified(real_ticker), format, specs)
 
 ##########################################################################
 # 포트폴리오
 ##########################################################################
 # 1. 포트폴리오 종목 추가
 @app.post("/portfolio")
-def add_portfolio_item(item: schemas.PortfolioCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+async def add_portfolio_item(item: schemas.PortfolioCreate, db: AsyncSession = Depends(get_async_db), user: models.User = Depends(get_current_user)):
     db_item = models.Portfolio(
         owner_id=user.id,
         ticker=item.ticker.upper().strip(),
@@ -304,66 +465,225 @@ def add_portfolio_item(item: schemas.PortfolioCreate, db: Session = Depends(get_
         quantity=item.quantity
     )
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await _bump_calendar_generation(db, user.id)   # 캘린더에 보일 종목이 바뀜
+    await db.commit()
+    await db.refresh(db_item)
     return db_item
 
 # 2. 내 포트폴리오 조회 및 실시간 수익률 계산
 @app.get("/portfolio", response_model=List[schemas.PortfolioResponse])
-def read_portfolio(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+async def read_portfolio(db: AsyncSession = Depends(get_async_db), user: models.User = Depends(get_current_user)):
+    summary = await _value_portfolio(db, user, "KRW")
+
+    # 원화가 아닌 종목만 원화 환산액 표시 (기존 응답 형식 유지)
+    for row in summary["holdings"]:
+        row["krw_valuation"] = row["base_valuation"] if row["currency"] != "KRW" else None
+    return summary["holdings"]
+
+# 2-1. 포트폴리오 전체 요약 (종목별 + 기준통화 합계)
+@app.get("/portfolio/summary", response_model=schemas.PortfolioSummaryResponse)
+async def read_portfolio_summary(base_currency: str = "KRW",
+                                 db: AsyncSession = Depends(get_async_db),
+                                 user: models.User = Depends(get_current_user)):
+    """
+    종목별 평가금액/비중/평가손익/당일 변동과 기준통화 합계를 한 번에 계산합니다.
+    """
+    return await _value_portfolio(db, user, base_currency)
+
+# 2-2. 포트폴리오 가치 변화 (기간별 시계열)
+@app.get("/portfolio/history", response_model=schemas.PortfolioHistoryResponse)
+async def read_portfolio_history(period: str = "3mo", base_currency: str = "KRW",
+                                 db: AsyncSession = Depends(get_async_db),
+                                 user: models.User = Depends(get_current_user)):
+    """
+    현재 보유 종목 기준으로 기간 동안의 포트폴리오 평가금액/수익률 변화를 계산합니다.
+    종목별 일봉은 로컬 저장소에서 재사용하고, 없는 종목만 병렬로 받아옵니다.
+    """
+    _validate_period(period)
+    base_currency = base_currency.upper()
+
+    result = await db.execute(select(models.Portfolio).where(models.Portfolio.owner_id == user.id))
+    holdings = [{"ticker": item.ticker, "quantity": item.quantity, "avg_price": item.avg_price}
+                for item in result.scalars().all()]
+    tickers = [h["ticker"] for h in holdings]
+
+    def load():
+        # 통화는 시세 캐시에서, 일봉은 종목 + 필요한 환율을 한 번에 병렬 조회
+        quotes = finance.get_current_prices(tickers)
+        currencies = {symbol: quote.get("currency") for symbol, quote in quotes.items() if quote}
+        fx_currencies = sorted({c.upper() for c in currencies.values() if c and c.upper() != base_currency})
+        histories = finance.get_histories(tickers + [finance.fx_ticker(c, base_currency) for c in fx_currencies], period)
+        fx_histories = {c: histories.get(finance.fx_ticker(c, base_currency)) for c in fx_currencies}
+        return valuation.portfolio_history(holdings, currencies, histories, fx_histories, base_currency)
+
+    summary = await run_in_threadpool(load)
+    summary["period"] = period
+    return summary
+
+async def _value_portfolio(db: AsyncSession, user, base_currency: str):
     # 1. DB에서 내 잔고 목록 가져오기
-    items = db.query(models.Portfolio).filter(models.Portfolio.owner_id == user.id).all()
-    
-    # 2. 실시간 환율 가져오기
-    exchange_rate = finance.get_exchange_rate()
-    
-    result = []
-    for item in items:
-        # 실시간 가격 조회
-        price_info = finance.get_current_price(item.ticker)
-        if not price_info:
-            continue
-            
-        current_price = price_info['price']
-        currency = price_info['currency']
-        
-        # 계산 로직
-        purchase_amount = item.avg_price * item.quantity      # 매수 금액
-        current_valuation = current_price * item.quantity     # 현재 평가 금액
-        
-        # 수익률 계산 (0으로 나누기 방지)
-        if item.avg_price > 0:
-            return_rate = ((current_price - item.avg_price) / item.avg_price) * 100
-        else:
-            return_rate = 0.0
-
-        # 원화 환산 (미국 주식인 경우)
-        krw_valuation = None
-        if currency == "USD":
-            krw_valuation = current_valuation * exchange_rate
-
-        result.append({
-            "id": item.id,
-            "ticker": item.ticker,
-            "quantity": item.quantity,
-            "avg_price": item.avg_price,
-            "current_price": current_price,
-            "purchase_amount": purchase_amount,
-            "current_valuation": current_valuation,
-            "return_rate": return_rate,
-            "currency": currency,
-            "krw_valuation": krw_valuation
-        })
-        
-    return result
+    result = await db.execute(select(models.Portfolio).where(models.Portfolio.owner_id == user.id))
+    holdings = [{"id": item.id, "ticker": item.ticker, "quantity": item.quantity, "avg_price": item.avg_price}
+                for item in result.scalars().all()]
+
+    # 2. 보유 종목 시세 일괄 조회 -> 필요한 통화의 환율만 한 번 더 일괄 조회 (야후 대기는 스레드풀에서)
+    quotes = await run_in_threadpool(finance.get_current_prices, [h["ticker"] for h in holdings])
+    currencies = {quote.get("currency") for quote in quotes.values() if quote}
+    fx_rates = await run_in_threadpool(finance.get_fx_rates, currencies, base_currency)
+
+    # 3. 배열 한 번에 계산
+    return valuation.value_portfolio(holdings, quotes, fx_rates, base_currency)
 
 # 3. 포트폴리오 종목 삭제
 @app.delete("/portfolio/{item_id}")
-def delete_portfolio_item(item_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    db_item = db.query(models.Portfolio).filter(models.Portfolio.id == item_id, models.Portfolio.owner_id == user.id).first()
+async def delete_portfolio_item(item_id: int, db: AsyncSession = Depends(get_async_db), user: models.User = Depends(get_current_user)):
+    result = await db.execute(select(models.Portfolio).where(models.Portfolio.id == item_id, models.Portfolio.owner_id == user.id))
+    db_item = result.scalars().first()
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    db.delete(db_item)
-    db.commit()
-    return {"message": "Deleted successfully"}
\ No newline at end of file
+    await db.delete(db_item)
+    await _bump_calendar_generation(db, user.id)   # 캘린더에 보일 종목이 바뀜
+    await db.commit()
+    return {"message": "Deleted successfully"}
+
+##########################################################################
+# 실시간 시세 (웹소켓)
+##########################################################################
+@app.websocket("/ws/prices")
+async def price_socket(websocket: WebSocket, token: str = ""):
+    """
+    접속할 때 한 번만 인증(?token=)하고, 이후 메시지로 종목을 구독합니다.
+    - 보내기: {"action": "subscribe" | "unsubscribe", "tickers": ["AAPL", ...]}
+    - 받기:   {"type": "price", "data": {code, price, change_percent, currency}}
+    """
+    user = None
+    if token:
+        async with AsyncSessionLocal() as db:
+            user = await authenticate_token(token, db)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            tickers = message.get("tickers") or []
+            if message.get("action") == "subscribe":
+                await live_prices.price_hub.subscribe(websocket, tickers)
+            elif message.get("action") == "unsubscribe":
+                await live_prices.price_hub.unsubscribe(websocket, tickers)
+    except (WebSocketDisconnect, ValueError):
+        pass
+    finally:
+        await live_prices.price_hub.disconnect(websocket)
+
+
+##########################################################################
+# 주도 섹터 / 주도주 (스크리너 결과 조회)
+##########################################################################
+@app.get("/screener/leaders")
+async def read_screener_leaders(market: str = Query("KR", pattern="^(KR|US|kr|us)$"),
+                                db: AsyncSession = Depends(get_async_db)):
+    """
+    시장별 1개월 상승률 상위 종목 + 섹터별 묶음 (python -m app.screener 로 저장된 최신 결과)
+    """
+    result = await db.execute(
+        select(models.ScreenerSnapshot.payload)
+        .where(models.ScreenerSnapshot.market == market.upper())
+        .order_by(models.ScreenerSnapshot.created_at.desc(), models.ScreenerSnapshot.id.desc())
+        .limit(1)
+    )
+    payload = result.scalar_one_or_none()
+    if payload is None:
+        raise HTTPException(status_code=404, detail="아직 스크리너 결과가 없습니다.")
+    return Response(content=payload.encode("utf-8"), media_type="application/json")
+
+
+##########################################################################
+# 경제 캘린더 (경제지표 + 내 관심/보유 종목 실적 발표)
+##########################################################################
+@app.get("/calendar")
+async def read_calendar(start: date, end: date,
+                        db: AsyncSession = Depends(get_async_db),
+                        user: models.User = Depends(get_current_user)):
+    """
+    start~end (YYYY-MM-DD, 양끝 포함) 기간의 일정.
+    적재 세대 / 내 종목 세대가 같으면 캐시에서 응답 (PK 조회 1번으로 확인 -> 워커 간에도 바로 반영)
+    """
+    if end < start or (end - start).days > calendar_events.CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400,
+                            detail=f"기간은 시작일 이후 {calendar_events.CALENDAR_MAX_DAYS}일 이내여야 합니다.")
+
+    generations = (await db.execute(calendar_events.generations_query(user.id))).all()
+    key = calendar_events.cache_key(user.id, start, end, generations)
+    events = calendar_events.get_cached(key)
+    if events is None:
+        result = await db.execute(calendar_events.range_query(user.id, start, end))
+        events = [calendar_events.to_dict(event) for event in result.scalars().all()]
+        calendar_events.set_cached(key, events)
+    return events
+
+
+##########################################################################
+# 수급 추적기 (투자자별 연속 순매수)
+##########################################################################
+@app.get("/flows/streaks")
+async def read_flow_streaks(investor: str = Query("foreign", pattern="^(foreign|institution|individual)$"),
+                            side: str = Query("buy", pattern="^(buy|sell)$"),
+                            min_days: int = Query(3, ge=1),
+                            limit: int = Query(50, ge=1, le=500),
+                            db: AsyncSession = Depends(get_async_db)):
+    """
+    N일 이상 연속 순매수(side=buy) / 순매도(side=sell) 중인 종목 (python -m app.investor_flows 로 적재된 결과)
+    """
+    result = await db.execute(investor_flows.streaks_query(investor, min_days, side, limit))
+    return [{"ticker": row.ticker, "as_of": row.as_of, "days": abs(row.streak),
+             "streak_amount": row.streak_amount, "net_buy": row.net_buy}
+            for row in result.scalars().all()]
+
+
+##########################################################################
+# 시스템 상태 (캐시/튜닝용)
+##########################################################################
+@app.get("/system/cache")
+def read_cache_stats():
+    """
+    시세 캐시 적중/미스 카운터 (QUOTE_CACHE_TTL 튜닝용)
+    """
+    return {"quotes": finance.get_quote_cache_stats(),
+            "history": finance.get_history_cache_stats(),
+            "indicators": indicator_engine.get_indicator_cache_stats(),
+            "calendar": calendar_events.get_cache_stats(),
+            "auth": auth_cache.token_cache.stats(),
+            "live_prices": live_prices.price_hub.stats()}
+
+@app.get("/system/upstreams")
+def read_upstream_status():
+    """
+    외부 API별 서킷 브레이커 상태 / 호출·실패·시간초과·차단 횟수
+    """
+    return resilience.stats()
+
+@app.get("/system/quotas")
+def read_quota_status():
+    """
+    네이버/Gemini 호출 한도: 남은 토큰, 오늘 사용량/남은 횟수(모든 워커 합산), 초기화까지 남은 시간
+    process: 이 워커에서 통과/대기 후 통과/포기(우선순위별) 횟수
+    """
+    return rate_limiter.remaining()
+
+@app.get("/system/providers")
+def read_provider_status():
+    """
+    외부 API 원본 호출 모드(live/record/replay)와 종류별 호출·저장·재생 실패·주입 실패 횟수
+    """
+    return providers.stats()
+
+@app.get("/system/prewarm")
+def read_prewarm_status():
+    """
+    미리 데우기 스케줄러 상태 (종목별 마지막 갱신 시각 / 실패 내용)
+    """
+    return scheduler.prewarm_scheduler.status()
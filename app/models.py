@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, ForeignKey, DateTime, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, ForeignKey, DateTime, Text, Date, UniqueConstraint, Index
 # 쿼리문의 JOIN 을 대신함. 간결하게 (user.interests 처럼)
 from sqlalchemy.orm import relationship
 # 데이터베이스 자체 함수를 쓰고 싶을 때 사용
@@ -65,11 +65,18 @@ class DailyBriefing(Base):
     asset_code = Column(String, ForeignKey("assets.code", ondelete="CASCADE"))
     summary_text = Column(Text, nullable=False)
     news_links = Column(Text)
+    # 입력(가격/등락률 반올림값 + 뉴스 링크 집합)의 해시. 같은 입력이면 저장된 브리핑 재사용
+    input_hash = Column(String(64))
     # func.now() : DB서버(PostgreSQL)에게 데이터가 저장되는 순간을 찍으라 말하는 것
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     asset = relationship("Asset")
 
+    # (종목, 입력 해시)로 최신 브리핑을 바로 찾기 위한 인덱스
+    __table_args__ = (
+        Index('ix_daily_briefings_asset_hash', 'asset_code', 'input_hash', 'created_at'),
+    )
+
 # 5. 포트폴리오
 class Portfolio(Base):
     __tablename__ = "portfolios"
@@ -81,4 +88,115 @@ class Portfolio(Base):
     avg_price = Column(Float)           # 평균 단가
     quantity = Column(Float)            # 보유 주수 (소수점 거래 가능성을 위해 Float)
     
-    owner = relationship("User", back_populates="portfolios")
\ No newline at end of file
+    owner = relationship("User", back_populates="portfolios")
+
+# 6. 번역 캐시 (같은 문장을 매번 번역 API로 보내지 않도록)
+class TranslationCache(Base):
+    __tablename__ = "translation_cache"
+
+    # 원문 SHA-256 해시 + 목표 언어가 키 (원문이 길어도 인덱스는 고정 길이)
+    source_hash = Column(String(64), primary_key=True)
+    target_lang = Column(String(10), primary_key=True)
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# 7. 주도주 스크리너 결과 (시장별 스냅샷 - 조회 API는 최신 1건만 읽음)
+class ScreenerSnapshot(Base):
+    __tablename__ = "screener_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    market = Column(String(8), nullable=False)      # KR, US
+    as_of = Column(String(10), nullable=False)      # 기준 거래일 (YYYY-MM-DD)
+    payload = Column(Text, nullable=False)          # 순위/섹터 결과 JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_screener_snapshots_market_created', 'market', 'created_at'),
+    )
+
+# 8. 투자자별 일별 순매수 (수급 추적기)
+class InvestorFlow(Base):
+    __tablename__ = "investor_flows"
+
+    trade_date = Column(Date, primary_key=True)
+    ticker = Column(String, primary_key=True)          # 예: 005930.KS
+    investor = Column(String(16), primary_key=True)    # foreign, institution, individual
+    net_buy = Column(Float, nullable=False)            # 순매수 금액 (원, 순매도는 음수)
+
+    # 투자자별로 날짜 구간을 읽어서 연속 순매수를 다시 계산할 때 사용
+    __table_args__ = (
+        Index('ix_investor_flows_investor_date', 'investor', 'trade_date'),
+    )
+
+# 9. 투자자별 연속 순매수/순매도 일수 (새 거래일이 들어올 때마다 이어서 갱신)
+class InvestorFlowStreak(Base):
+    __tablename__ = "investor_flow_streaks"
+
+    ticker = Column(String, primary_key=True)
+    investor = Column(String(16), primary_key=True)
+    as_of = Column(Date, nullable=False)               # 마지막으로 반영한 거래일
+    streak = Column(Integer, nullable=False)           # +N: N일 연속 순매수, -N: N일 연속 순매도
+    streak_amount = Column(Float, nullable=False)      # 연속 구간 동안의 순매수 합계
+    net_buy = Column(Float, nullable=False)            # 마지막 거래일 순매수
+
+# 10. 경제 캘린더 (경제지표 발표 + 실적 발표)
+class CalendarEvent(Base):
+    __tablename__ = "calendar_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # 같은 일정을 다시 적재하면 덮어쓰기 위한 키 (예: earnings:AAPL:2026-10-30, macro:US:2026-10-15:CPI)
+    source_key = Column(String, nullable=False, unique=True)
+    event_date = Column(Date, nullable=False)
+    event_time = Column(String(8))                     # HH:MM (모르면 비움)
+    ticker = Column(String)                            # 경제지표 일정은 NULL
+    event_type = Column(String(16), nullable=False)    # earnings, macro
+    country = Column(String(4))
+    title = Column(String, nullable=False)
+    importance = Column(Integer, default=1)            # 1(낮음) ~ 3(높음)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # 기간 조회: 날짜 구간 + (공통 일정 또는 내 종목) 필터
+    __table_args__ = (
+        Index('ix_calendar_events_date_ticker', 'event_date', 'ticker'),
+    )
+
+
+# 캘린더 캐시 세대 번호 (워커/프로세스가 달라도 같은 값을 보도록 DB에 둠)
+# scope: "ingest" (일정 적재 시 +1), "user:{id}" (그 사용자의 관심/보유 종목이 바뀔 때 +1)
+class CalendarGeneration(Base):
+    __tablename__ = "calendar_generations"
+
+    scope = Column(String(32), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+
+# 기존 테이블에 나중에 추가된 컬럼 (create_all 은 이미 있는 테이블을 고치지 않음)
+# (테이블, 컬럼, 컬럼 타입 DDL, 같이 만들 인덱스)
+_ADDED_COLUMNS = [
+    ("daily_briefings", "input_hash", "VARCHAR(64)", DailyBriefing.__table__.indexes),
+]
+
+
+def upgrade_schema(bind):
+    """
+    빠진 컬럼/인덱스를 추가합니다. (여러 번 실행해도 안전)
+    실패하면 False - 해당 기능(예: 브리핑 캐시)은 꺼진 채로 동작합니다.
+    """
+    from sqlalchemy import inspect, text
+    ok = True
+    for table, column, ddl, indexes in _ADDED_COLUMNS:
+        try:
+            inspector = inspect(bind)
+            if not inspector.has_table(table):
+                continue
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                with bind.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                print(f"🛠️ DB 스키마 업그레이드: {table}.{column} 추가")
+            for index in indexes:
+                index.create(bind=bind, checkfirst=True)
+        except Exception as e:
+            ok = False
+            print(f"🚨 DB 스키마 업그레이드 실패 ({table}.{column}): {e}")
+    return ok
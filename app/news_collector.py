@@ -1,26 +1,131 @@
 # app/news_collector.py
-import requests
 import os
-import yfinance as yf
+import hashlib
 from dotenv import load_dotenv
-from deep_translator import GoogleTranslator
 from datetime import datetime
+from app import models, providers, resilience
+from app.resilience import UpstreamUnavailable
+from app.cache import TTLCache
+from app.database import SessionLocal
 
 load_dotenv()
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
 
 # --- 1. 번역 도구 ---
+# 메모리 캐시 -> DB 캐시 -> (남은 것만 한 번에) 번역 API 순서로 찾습니다.
+TRANSLATION_MEMO_TTL = float(os.getenv("TRANSLATION_MEMO_TTL", "86400"))  # 초
+TRANSLATION_BATCH_CHARS = 4500   # 번역 API 1회 요청 글자 수 한도(5000)보다 약간 작게
+_BATCH_SEPARATOR = "\n"
+
+_translation_memo = TTLCache(maxsize=4096, ttl=TRANSLATION_MEMO_TTL)
+
+def _text_hash(text: str):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def translate_many(texts, target: str = 'ko'):
+    """
+    여러 문장을 번역해서 같은 순서의 리스트로 돌려줍니다.
+    이미 번역한 문장은 API를 부르지 않고, 나머지는 묶어서 한 번에 보냅니다.
+    """
+    results = {}
+    pending = []
+    for text in dict.fromkeys(t for t in texts if t):
+        cached = _translation_memo.get((text, target))
+        if cached is not None:
+            results[text] = cached
+        else:
+            pending.append(text)
+
+    if pending:
+        found = _load_translations(pending, target)
+        results.update(found)
+        pending = [text for text in pending if text not in found]
+
+    if pending:
+        translated = _translate_batch(pending, target)
+        results.update(translated)
+        _save_translations(translated, target)
+
+    for text, translated_text in results.items():
+        _translation_memo.set((text, target), translated_text)
+    return [results.get(text, text) if text else "" for text in texts]
+
 def translate_to_korean(text):
     """영어를 한국어로 번역합니다."""
+    return translate_many([text], target='ko')[0]
+
+def _translate_batch(texts, target):
+    """
+    줄바꿈으로 이어붙여 한 번에 번역 -> 다시 줄 단위로 나눔 (개수가 안 맞으면 개별 번역)
+    번역이 비어 있거나(None 포함) 실패한 문장은 결과에서 빠짐 -> 캐시하지 않고 호출부에서 원문 그대로 표시
+    """
+    translated = {}
+    chunk = []
+    chunk_chars = 0
+    chunks = []
+    for text in texts:
+        text_len = len(text) + len(_BATCH_SEPARATOR)
+        if chunk and chunk_chars + text_len > TRANSLATION_BATCH_CHARS:
+            chunks.append(chunk)
+            chunk, chunk_chars = [], 0
+        chunk.append(text)
+        chunk_chars += text_len
+    if chunk:
+        chunks.append(chunk)
+
+    translate = providers.current().translate
+    provider = resilience.get_provider("translate")
+    for chunk in chunks:
+        # 문장 안의 줄바꿈은 구분자와 섞이지 않게 공백으로
+        joined = _BATCH_SEPARATOR.join(text.replace("\n", " ") for text in chunk)
+        try:
+            lines = (provider.call(translate, joined, target) or "").split(_BATCH_SEPARATOR)
+            if len(lines) == len(chunk):
+                translated.update({text: line.strip() for text, line in zip(chunk, lines) if line.strip()})
+                continue
+            print(f"⚠️ Translation batch split mismatch ({len(lines)} != {len(chunk)}), 개별 번역으로 재시도")
+        except UpstreamUnavailable as e:
+            print(f"Translation Error: {e}")   # 번역 안 된 문장은 원문 그대로 표시
+            continue
+        for text in chunk:
+            try:
+                result = (provider.call(translate, text, target) or "").strip()
+            except UpstreamUnavailable as e:
+                print(f"Translation Error: {e}")
+                break
+            if result:
+                translated[text] = result
+    return translated
+
+def _load_translations(texts, target):
+    hash_to_text = {_text_hash(text): text for text in texts}
     try:
-        if not text:
-            return ""
-        translator = GoogleTranslator(source='auto', target='ko')
-        return translator.translate(text)
+        with SessionLocal() as db:
+            rows = db.query(models.TranslationCache).filter(
+                models.TranslationCache.target_lang == target,
+                models.TranslationCache.source_hash.in_(list(hash_to_text))
+            ).all()
+            return {hash_to_text[row.source_hash]: row.translated_text for row in rows if row.translated_text}
     except Exception as e:
-        print(f"Translation Error: {e}")
-        return text
+        print(f"⚠️ Translation Cache Read Error: {e}")
+        return {}
+
+def _save_translations(translated, target):
+    if not translated:
+        return
+    try:
+        with SessionLocal() as db:
+            for text, translated_text in translated.items():
+                db.merge(models.TranslationCache(
+                    source_hash=_text_hash(text),
+                    target_lang=target,
+                    source_text=text,
+                    translated_text=translated_text
+                ))
+            db.commit()
+    except Exception as e:
+        print(f"⚠️ Translation Cache Write Error: {e}")
 
 # --- 2. 네이버 뉴스 (한국) ---
 def get_naver_news(keyword: str, limit: int):
@@ -28,39 +133,29 @@ def get_naver_news(keyword: str, limit: int):
         print("🚨 오류: .env 파일에 네이버 API 키가 없습니다!")
         return []
 
-    url = "https://openapi.naver.com/v1/search/news.json"
-    headers = {
-        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
-    }
-    params = {"query": keyword, "display": limit, "sort": "sim"}
+    def fetch():
+        items = providers.current().naver_news(keyword, limit, NAVER_CLIENT_ID, NAVER_CLIENT_SECRET, timeout=5)
+        news_list = []
+        for item in items:
+            news_list.append({
+                "source": "Naver",
+                "title": remove_html_tags(item['title']),
+                "link": item['link'],
+                "pubDate": item['pubDate'],
+                "is_translated": False
+            })
+        return news_list
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            items = response.json().get("items", [])
-            news_list = []
-            for item in items:
-                news_list.append({
-                    "source": "Naver",
-                    "title": remove_html_tags(item['title']),
-                    "link": item['link'],
-                    "pubDate": item['pubDate'],
-                    "is_translated": False
-                })
-            return news_list
-        else:
-            print(f"Naver API Error Code: {response.status_code}")
-            return []
-    except Exception as e:
+        return resilience.call_with_stale("naver", ("news", keyword, limit), fetch)
+    except UpstreamUnavailable as e:
         print(f"Naver Connection Error: {e}")
         return []
 
 # --- 3. 야후 뉴스 (미국/글로벌) ---
 def get_yahoo_news(ticker_code: str, limit: int):
     try:
-        ticker = yf.Ticker(ticker_code)
-        news_items = ticker.news
+        news_items = resilience.get_provider("yahoo").call(providers.current().yahoo_news, ticker_code)
         
         # 뉴스 데이터가 없으면 빈 리스트 반환
         if not news_items:
@@ -68,6 +163,11 @@ def get_yahoo_news(ticker_code: str, limit: int):
 
         selected_news = news_items[:limit]
         result_list = []
+
+        # 제목을 먼저 모아서 한 번에 번역 (캐시에 있는 제목은 API 호출 없음)
+        datas = [item.get('content', item) for item in selected_news]
+        titles = [data.get('title') for data in datas]
+        translated_titles = dict(zip(titles, translate_many(titles, target='ko')))
         
         for item in selected_news:
             # [수정된 부분] 데이터가 'content'라는 키 안에 숨어있는지 확인
@@ -88,8 +188,8 @@ def get_yahoo_news(ticker_code: str, limit: int):
             # 날짜 추출
             pub_date_str = str(data.get('pubDate', '')) # 이미 문자열로 들어옴
             
-            # 번역 실행
-            translated_title = translate_to_korean(original_title)
+            # 번역 결과 꺼내기
+            translated_title = translated_titles.get(original_title, original_title)
             
             result_list.append({
                 "source": "Yahoo(US)",
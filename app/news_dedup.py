@@ -0,0 +1,104 @@
+# app/news_dedup.py
+# 뉴스 중복 제거 (여러 매체에 같은 기사가 실린 경우 하나로 묶기)
+# 제목 정규화 -> 글자 3-gram 집합 -> MinHash 서명 -> LSH 밴드 버킷으로 후보쌍만 비교
+# 모든 쌍을 비교하지 않으므로 기사 수에 거의 비례하는 시간에 끝납니다.
+import html
+import os
+import re
+import unicodedata
+import zlib
+import numpy as np
+
+NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.6"))   # 같은 기사로 볼 제목 유사도 (Jaccard)
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+BANDS = 16                         # 16밴드 x 4행: 유사도 0.6 이상은 거의 항상 후보로 잡힘
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20)
+_HASH_A = _rng.integers(1, 1 << 32, NUM_PERMUTATIONS, dtype="uint64")
+_HASH_B = _rng.integers(0, 1 << 32, NUM_PERMUTATIONS, dtype="uint64")
+
+# Google RSS 제목 끝의 " - 매체명", 앞뒤의 [단독]/(종합) 같은 말머리
+_PUBLISHER_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+_TAGS = re.compile(r"[\[\(【<][^\]\)】>]{1,10}[\]\)】>]")
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_title(title: str):
+    text = unicodedata.normalize("NFKC", html.unescape(title or ""))
+    text = _PUBLISHER_SUFFIX.sub("", text)
+    text = _TAGS.sub(" ", text)
+    return _NON_WORD.sub(" ", text).lower().strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE):
+    compact = text.replace(" ", "")
+    if len(compact) <= size:
+        return {compact} if compact else set()
+    return {compact[i:i + size] for i in range(len(compact) - size + 1)}
+
+
+def minhash(shingle_set):
+    """글자 n-gram 집합 -> 길이 NUM_PERMUTATIONS 서명 (각 해시 함수의 최소값)"""
+    if not shingle_set:
+        return np.full(NUM_PERMUTATIONS, np.iinfo("uint64").max, dtype="uint64")
+    values = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype="uint64",
+                         count=len(shingle_set))
+    hashed = (values[:, None] * _HASH_A + _HASH_B) % _MERSENNE_PRIME
+    return hashed.min(axis=0)
+
+
+def cluster(titles, threshold: float = NEWS_DEDUP_THRESHOLD):
+    """제목 목록 -> 묶음 번호 리스트 (같은 번호 = 같은 기사, 번호는 묶음의 첫 기사 위치)"""
+    sets = [shingles(normalize_title(title)) for title in titles]
+    parent = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # 1. LSH: 서명을 밴드로 잘라 같은 버킷에 들어간 것만 후보
+    buckets = {}
+    for i, shingle_set in enumerate(sets):
+        if not shingle_set:
+            continue
+        signature = minhash(shingle_set)
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+            buckets.setdefault(key, []).append(i)
+
+    # 2. 같은 버킷 안의 후보쌍만 실제 Jaccard로 확인 후 합치기 (앞쪽 기사가 대표)
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                if len(sets[i] & sets[j]) / len(sets[i] | sets[j]) >= threshold:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+    return [find(i) for i in range(len(titles))]
+
+
+def dedupe_news(news_list, threshold: float = NEWS_DEDUP_THRESHOLD):
+    """
+    같은 기사 묶음마다 대표 1건만 남김 (원래 순서 유지, 먼저 나온 기사가 대표)
+    대표에는 source_count(묶인 기사 수)와 sources(매체 목록)를 추가합니다.
+    """
+    if len(news_list) < 2:
+        return [dict(news, source_count=1, sources=[news.get("source")]) for news in news_list]
+
+    labels = cluster([news.get("title", "") for news in news_list], threshold)
+    representatives = {}
+    for news, label in zip(news_list, labels):
+        rep = representatives.get(label)
+        if rep is None:
+            representatives[label] = dict(news, source_count=1, sources=[news.get("source")])
+        else:
+            rep["source_count"] += 1
+            if news.get("source") not in rep["sources"]:
+                rep["sources"].append(news.get("source"))
+    return list(representatives.values())
@@ -0,0 +1,349 @@
+# app/providers.py
+# 외부 API 원본 호출 계층 (야후 / 네이버 / 구글 RSS / 번역 / Gemini)
+# finance, news_collector, history_store, ai_analyst 는 네트워크를 직접 부르지 않고 current()를 거칩니다.
+# - live:   실제 호출 (기본값)
+# - record: 실제 호출 + 응답을 고정 데이터(fixture) 파일로 저장
+# - replay: 네트워크 없이 저장된 응답만 사용 + 지연시간/실패 주입 (재현 가능한 성능 측정, 부하 테스트용)
+#
+# 설정: UPSTREAM_MODE=live|record|replay, UPSTREAM_FIXTURES_DIR=data/fixtures
+#       UPSTREAM_LATENCY_MS="40" 또는 "20-80" 또는 "yahoo=20-60,gemini=800,*=10"  (replay 전용)
+#       UPSTREAM_FAILURE_RATE="0.05" 또는 "naver=0.2"                            (replay 전용)
+# 이 모듈은 원본 응답만 다루고, 데드라인/서킷 브레이커/호출 한도는 호출부의 resilience 계층이 그대로 적용합니다.
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import numpy as np
+import yfinance as yf
+from app import http_client
+
+UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "live")
+UPSTREAM_FIXTURES_DIR = os.getenv("UPSTREAM_FIXTURES_DIR", "data/fixtures")
+UPSTREAM_LATENCY_MS = os.getenv("UPSTREAM_LATENCY_MS", "0")
+UPSTREAM_FAILURE_RATE = os.getenv("UPSTREAM_FAILURE_RATE", "0")
+UPSTREAM_SEED = int(os.getenv("UPSTREAM_SEED", "42"))
+# 저장된 응답이 없는 키는 같은 종류의 다른 응답으로 대신함 (종목 수를 늘려 부하 테스트할 때)
+UPSTREAM_REPLAY_FALLBACK = os.getenv("UPSTREAM_REPLAY_FALLBACK", "0") == "1"
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "2"))
+
+HISTORY_COLUMNS = ("open", "high", "low", "close", "volume")
+NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
+GOOGLE_RSS_URL = "https://news.google.com/rss/search"
+
+# 호출 종류 -> 업스트림 이름 (resilience 공급자 이름과 같음, 지연/실패 설정 키)
+KIND_UPSTREAMS = {
+    "quote": "yahoo", "history": "yahoo", "yahoo_news": "yahoo",
+    "naver_news": "naver", "google_news": "google_rss",
+    "translate": "translate", "generate": "gemini", "generate_stream": "gemini",
+}
+
+
+class FixtureMissing(LookupError):
+    """replay 모드에서 저장된 응답이 없음 (호출부에는 업스트림 실패로 보임)"""
+
+
+class InjectedFailure(ConnectionError):
+    """replay 모드에서 설정한 비율로 일부러 낸 실패"""
+
+
+# 1. 실제 호출
+class LiveProvider:
+    mode = "live"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._translators = {}
+        self.counters = {}   # {종류: {"calls", ...}}
+
+    def _invoke(self, kind, key, fetch, encode=None, decode=None):
+        """종류별 공통 진입점 (하위 클래스가 저장/재생을 끼워넣음)"""
+        self._count(kind, "calls")
+        return fetch()
+
+    def _count(self, kind, name):
+        with self._lock:
+            counters = self.counters.setdefault(kind, {"calls": 0})
+            counters[name] = counters.get(name, 0) + 1
+
+    # 야후
+    def quote(self, ticker_symbol: str):
+        """{"price", "previous_close", "currency"(없으면 None)} 또는 None(데이터 없음)"""
+        def fetch():
+            ticker = yf.Ticker(ticker_symbol)
+            # fast_info 사용 시도
+            try:
+                return {"price": ticker.fast_info.last_price,
+                        "previous_close": ticker.fast_info.previous_close,
+                        "currency": ticker.fast_info.currency}
+            except Exception:
+                # 실패시 history 사용
+                hist = ticker.history(period="5d")
+                if hist.empty:
+                    return None
+                price = float(hist['Close'].iloc[-1])
+                return {"price": price,
+                        "previous_close": float(hist['Close'].iloc[-2]) if len(hist) > 1 else price,
+                        "currency": None}
+        return self._invoke("quote", [ticker_symbol], fetch)
+
+    def history(self, ticker_symbol: str, period: str = None, start=None):
+        """일봉 (dates datetime64[D], {컬럼: float64 배열}) 또는 None(데이터 없음)"""
+        def fetch():
+            ticker = yf.Ticker(ticker_symbol)
+            hist = ticker.history(start=start) if start is not None else ticker.history(period=period)
+            if hist is None or hist.empty:
+                return None
+            return _frame_to_arrays(hist)
+        return self._invoke("history", [ticker_symbol, period, str(start) if start is not None else None],
+                            fetch, encode=_encode_history, decode=_decode_history)
+
+    def yahoo_news(self, ticker_symbol: str):
+        return self._invoke("yahoo_news", [ticker_symbol], lambda: yf.Ticker(ticker_symbol).news)
+
+    # 네이버 / 구글 RSS
+    def naver_news(self, query: str, display: int, client_id: str, client_secret: str, timeout: float):
+        """네이버 검색 API items 목록. 서버 장애/한도 초과(5xx, 429)는 예외, 그 외 오류 코드는 빈 목록"""
+        def fetch():
+            response = http_client.get_session().get(
+                NAVER_NEWS_URL,
+                headers={"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret},
+                params={"query": query, "display": display, "sort": "sim"},
+                timeout=(HTTP_CONNECT_TIMEOUT, timeout))
+            if response.status_code >= 500 or response.status_code == 429:
+                response.raise_for_status()   # 서버 장애/한도 초과는 실패로 기록 (서킷 브레이커)
+            if response.status_code != 200:
+                print(f"⚠️ Naver API Error Code: {response.status_code}")
+                return []
+            return response.json().get("items", [])
+        return self._invoke("naver_news", [query, display], fetch)
+
+    def google_news(self, query: str, timeout: float):
+        """구글 뉴스 RSS 원문(XML 문자열) 또는 None(오류 코드)"""
+        def fetch():
+            response = http_client.get_session().get(
+                GOOGLE_RSS_URL, params={"q": query, "hl": "en-US", "gl": "US", "ceid": "US:en"},
+                timeout=(HTTP_CONNECT_TIMEOUT, timeout))
+            if response.status_code >= 500 or response.status_code == 429:
+                response.raise_for_status()
+            if response.status_code != 200:
+                print(f"⚠️ Google RSS Error Code: {response.status_code}")
+                return None
+            return response.text
+        return self._invoke("google_news", [query], fetch)
+
+    # 번역
+    def translate(self, text: str, target: str = "ko"):
+        return self._invoke("translate", [text, target], lambda: self._translator(target).translate(text))
+
+    def _translator(self, target):
+        from deep_translator import GoogleTranslator
+        with self._lock:
+            translator = self._translators.get(target)
+            if translator is None:
+                translator = self._translators[target] = GoogleTranslator(source='auto', target=target)
+        return translator
+
+    # Gemini
+    def generate(self, model, prompt: str, **kwargs):
+        """model.generate_content() 응답 본문 (model: 재사용 클라이언트 또는 테스트용 가짜 모델)"""
+        return self._invoke("generate", [prompt, kwargs],
+                            lambda: model.generate_content(prompt, **kwargs).text)
+
+    def generate_stream(self, model, prompt: str):
+        """스트리밍 응답의 텍스트 조각을 차례로 yield"""
+        self._count("generate_stream", "calls")
+        for chunk in model.generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+    def stats(self):
+        with self._lock:
+            counters = {kind: dict(values) for kind, values in self.counters.items()}
+        return {"mode": self.mode, "kinds": counters}
+
+
+# 2. 고정 데이터 파일 (종류별 폴더 / 키 해시.json)
+class _FixtureStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._listing = {}
+
+    def path(self, kind, key):
+        raw = json.dumps(key, ensure_ascii=False, sort_keys=True, default=str)
+        return os.path.join(self.root, kind, hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["value"]
+
+    def save(self, kind, key, value):
+        path = self.path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"kind": kind, "key": key, "value": value}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)   # 원자적 교체 (동시에 같은 키를 기록해도 반쯤 쓴 파일이 없음)
+
+    def any_path(self, kind, key):
+        """같은 종류의 저장된 응답 중 하나 (키 해시로 골라서 항상 같은 파일)"""
+        files = self._listing.get(kind)
+        if files is None:
+            directory = os.path.join(self.root, kind)
+            files = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+            self._listing[kind] = files
+        if not files:
+            return None
+        index = int(os.path.basename(self.path(kind, key))[:12], 16) % len(files)
+        return os.path.join(self.root, kind, files[index])
+
+
+class RecordingProvider(LiveProvider):
+    """실제 호출 결과를 그대로 돌려주면서 고정 데이터로 저장 (실패한 호출은 저장하지 않음)"""
+    mode = "record"
+
+    def __init__(self, root: str = UPSTREAM_FIXTURES_DIR):
+        super().__init__()
+        self.store = _FixtureStore(root)
+
+    def _invoke(self, kind, key, fetch, encode=None, decode=None):
+        value = super()._invoke(kind, key, fetch)
+        try:
+            self.store.save(kind, key, encode(value) if encode and value is not None else value)
+            self._count(kind, "recorded")
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Fixture Write Error ({kind}): {e}")
+        return value
+
+    def generate_stream(self, model, prompt: str):
+        chunks = []
+        for text in super().generate_stream(model, prompt):
+            chunks.append(text)
+            yield text
+        try:
+            self.store.save("generate_stream", [prompt], chunks)
+            self._count("generate_stream", "recorded")
+        except OSError as e:
+            print(f"⚠️ Fixture Write Error (generate_stream): {e}")
+
+
+class ReplayProvider(LiveProvider):
+    """저장된 응답만 사용 (네트워크 없음) + 업스트림별 지연시간/실패율 주입"""
+    mode = "replay"
+
+    def __init__(self, root: str = UPSTREAM_FIXTURES_DIR, latency_ms: str = UPSTREAM_LATENCY_MS,
+                 failure_rate: str = UPSTREAM_FAILURE_RATE, seed: int = UPSTREAM_SEED,
+                 fallback: bool = UPSTREAM_REPLAY_FALLBACK):
+        super().__init__()
+        self.store = _FixtureStore(root)
+        self.latency_ms = _parse_per_upstream(latency_ms, _parse_range)
+        self.failure_rate = _parse_per_upstream(failure_rate, float)
+        self.fallback = fallback
+        self._random = random.Random(seed)
+
+    def _invoke(self, kind, key, fetch, encode=None, decode=None):
+        self._count(kind, "calls")
+        self._simulate(kind)
+        value = self._lookup(kind, key)
+        return decode(value) if decode and value is not None else value
+
+    def generate_stream(self, model, prompt: str):
+        self._count("generate_stream", "calls")
+        self._simulate("generate_stream")
+        chunks = self._lookup("generate_stream", [prompt], alternate=("generate", [prompt, {}]))
+        for text in ([chunks] if isinstance(chunks, str) else chunks or []):
+            yield text
+
+    def _simulate(self, kind):
+        upstream = KIND_UPSTREAMS[kind]
+        with self._lock:
+            low, high = _lookup_setting(self.latency_ms, upstream, (0.0, 0.0))
+            delay = self._random.uniform(low, high) / 1000
+            failed = self._random.random() < _lookup_setting(self.failure_rate, upstream, 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            self._count(kind, "injected_failures")
+            raise InjectedFailure(f"injected {upstream} failure")
+
+    def _lookup(self, kind, key, alternate=None):
+        path = self.store.path(kind, key)
+        if not os.path.exists(path) and alternate:
+            path = self.store.path(*alternate)   # 스트리밍 응답이 없으면 같은 프롬프트의 일반 응답
+        if not os.path.exists(path):
+            path = self.store.any_path(kind, key) if self.fallback else None
+            if path is None:
+                self._count(kind, "missing")
+                raise FixtureMissing(f"{kind} fixture not found: {key!r}"[:200])
+            self._count(kind, "fallback")
+        return self.store.load(path)
+
+
+def _frame_to_arrays(hist):
+    """yfinance DataFrame -> (dates, {컬럼: 배열})"""
+    index = hist.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)   # 거래소 현지 날짜 기준
+    dates = index.values.astype("datetime64[D]")
+    columns = {}
+    for name in HISTORY_COLUMNS:
+        source = name.capitalize()
+        if source in hist.columns:
+            columns[name] = hist[source].to_numpy(dtype="float64")
+        else:
+            columns[name] = np.full(len(dates), np.nan)
+    return dates, columns
+
+
+def _encode_history(arrays):
+    dates, columns = arrays
+    return {"dates": np.datetime_as_string(dates, unit="D").tolist(),
+            "columns": {name: values.tolist() for name, values in columns.items()}}
+
+
+def _decode_history(value):
+    return (np.array(value["dates"], dtype="datetime64[D]"),
+            {name: np.array(values, dtype="float64") for name, values in value["columns"].items()})
+
+
+def _parse_range(text):
+    low, _, high = text.partition("-")
+    return float(low), float(high or low)
+
+
+def _parse_per_upstream(spec, convert):
+    """'40' -> {'*': 40} / 'yahoo=20-60,*=10' -> {'yahoo': (20, 60), '*': (10, 10)}"""
+    settings = {}
+    for part in filter(None, (p.strip() for p in str(spec).split(","))):
+        name, sep, value = part.rpartition("=")
+        settings[name.strip() if sep else "*"] = convert(value.strip())
+    return settings
+
+
+def _lookup_setting(settings, upstream, default):
+    return settings.get(upstream, settings.get("*", default))
+
+
+# 3. 현재 공급자 (프로세스 전체 공용)
+_MODES = {"live": LiveProvider, "record": RecordingProvider, "replay": ReplayProvider}
+if UPSTREAM_MODE not in _MODES:
+    raise ValueError(f"UPSTREAM_MODE는 live/record/replay 중 하나여야 합니다: {UPSTREAM_MODE}")
+_current = _MODES[UPSTREAM_MODE]()
+
+
+def current():
+    return _current
+
+
+def use(provider):
+    """공급자 교체 (벤치마크/테스트용). 이전 공급자를 반환"""
+    global _current
+    previous, _current = _current, provider
+    return previous
+
+
+def stats():
+    return dict(_current.stats(), fixtures_dir=getattr(getattr(_current, "store", None), "root", None))
@@ -0,0 +1,249 @@
+# app/rate_limiter.py
+# 외부 API 호출 한도 관리 (네이버 검색 API / Gemini)
+# - 토큰 버킷: 초당 허용량(rate) + 순간 최대(burst)
+# - 일일 한도: 업스트림 기준 자정에 초기화
+# - 여러 uvicorn 워커가 같은 한도를 나눠 쓰도록 상태는 로컬 sqlite 파일 1개에 저장
+#   (BEGIN IMMEDIATE 로 읽기-수정-쓰기를 한 번에 잠금 -> 워커 간 경쟁 없음)
+# - 우선순위: 사용자 요청(interactive)은 토큰이 찰 때까지 잠깐 기다리고,
+#   백그라운드 갱신(background)은 예비분을 남겨두고 모자라면 바로 포기
+# - 같은 파일에 워커 간 임대(lease) 테이블도 둠 -> 백그라운드 작업을 워커 1개만 돌리는 데 사용
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+QUOTA_DB_PATH = os.getenv("QUOTA_DB_PATH", "data/quota.sqlite3")
+# 사용자 요청이 토큰을 기다리는 최대 시간 (초) - 넘으면 포기
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "2"))
+# 백그라운드 작업은 버킷/일일 한도가 이 비율 아래로 내려가면 쓰지 않음 (사용자 요청 몫)
+BACKGROUND_RESERVE = float(os.getenv("BACKGROUND_RESERVE", "0.3"))
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, name: str, reason: str, retry_after: float):
+        super().__init__(f"{name}: {reason}")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Bucket:
+    """한도 설정 1개 (daily_limit 0 = 일일 한도 없음)"""
+    def __init__(self, name: str, rate: float, burst: float, daily_limit: int, reset_tz: str):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.daily_limit = daily_limit
+        self.reset_tz = ZoneInfo(reset_tz)
+
+    def today(self, now: float):
+        return datetime.fromtimestamp(now, self.reset_tz).date().isoformat()
+
+    def seconds_until_reset(self, now: float):
+        local = datetime.fromtimestamp(now, self.reset_tz)
+        midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), self.reset_tz)
+        return max(0.0, (midnight - local).total_seconds())
+
+
+BUCKETS = {
+    # 네이버 검색 API: 하루 25,000회 (한국 자정 초기화)
+    "naver": Bucket("naver",
+                    float(os.getenv("NAVER_RATE_PER_SECOND", "10")),
+                    float(os.getenv("NAVER_RATE_BURST", "10")),
+                    int(os.getenv("NAVER_DAILY_LIMIT", "25000")),
+                    "Asia/Seoul"),
+    # Gemini: 분당/일일 요청 수 (태평양 시간 자정 초기화)
+    "gemini": Bucket("gemini",
+                     float(os.getenv("GEMINI_RATE_PER_MINUTE", "15")) / 60,
+                     float(os.getenv("GEMINI_RATE_BURST", "5")),
+                     int(os.getenv("GEMINI_DAILY_LIMIT", "1500")),
+                     "America/Los_Angeles"),
+}
+
+_priority = contextvars.ContextVar("rate_limit_priority", default=INTERACTIVE)
+_local = threading.local()            # 스레드별 sqlite 연결
+_stats_lock = threading.Lock()
+_stats = {}                           # 이 프로세스의 {버킷: {"granted", "waited", "shed_interactive", "shed_background"}}
+
+
+# 1. 우선순위
+@contextmanager
+def background():
+    """이 블록 안의 외부 호출은 백그라운드 우선순위 (스레드풀로 넘길 때는 resilience.submit 사용)"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+# 2. 공유 상태 (sqlite 파일)
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        directory = os.path.dirname(QUOTA_DB_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(QUOTA_DB_PATH, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS rate_buckets (
+                            name TEXT PRIMARY KEY,
+                            tokens REAL NOT NULL,
+                            updated_at REAL NOT NULL,
+                            day TEXT NOT NULL,
+                            used_today INTEGER NOT NULL DEFAULT 0)""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS leases (
+                            name TEXT PRIMARY KEY,
+                            owner TEXT NOT NULL,
+                            expires_at REAL NOT NULL)""")
+        _local.conn = conn
+    return conn
+
+
+def _take(bucket: Bucket, cost: int, priority: str, now: float):
+    """
+    토큰을 가져가 봄. 반환: (기다릴 시간, 포기 사유)
+      (0, None) = 성공 / (n, None) = n초 뒤 다시 시도 / (n, 사유) = 포기 (n = Retry-After)
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT tokens, updated_at, day, used_today FROM rate_buckets WHERE name = ?",
+                           (bucket.name,)).fetchone()
+        today = bucket.today(now)
+        if row is None:
+            tokens, used_today = bucket.burst, 0
+        else:
+            tokens = min(bucket.burst, row[0] + max(0.0, now - row[1]) * bucket.rate)
+            used_today = row[3] if row[2] == today else 0
+
+        reserve = BACKGROUND_RESERVE if priority == BACKGROUND else 0.0
+        result = (0.0, None)
+        if bucket.daily_limit and used_today + cost > bucket.daily_limit * (1 - reserve):
+            result = (bucket.seconds_until_reset(now), "daily quota exhausted")
+        elif tokens - cost < bucket.burst * reserve:
+            wait = (cost + bucket.burst * reserve - tokens) / bucket.rate
+            result = (wait, "rate limited" if priority == BACKGROUND else None)
+        else:
+            tokens -= cost
+            used_today += cost
+
+        conn.execute("INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at, day, used_today) "
+                     "VALUES (?, ?, ?, ?, ?)", (bucket.name, tokens, now, today, used_today))
+        conn.execute("COMMIT")
+        return result
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# 3. 획득
+def acquire(name: str, cost: int = 1, max_wait: float = RATE_LIMIT_MAX_WAIT):
+    """
+    name 버킷에서 cost만큼 사용. 한도가 없는 이름이면 바로 통과.
+    사용자 요청은 max_wait까지 기다렸다가, 백그라운드는 기다리지 않고 QuotaExceeded.
+    """
+    bucket = BUCKETS.get(name)
+    if bucket is None or not RATE_LIMIT_ENABLED:
+        return
+    priority = _priority.get()
+    deadline = time.monotonic() + max_wait
+    waited = False
+    while True:
+        try:
+            wait, reason = _take(bucket, cost, priority, time.time())
+        except sqlite3.Error as e:
+            # 한도 파일을 못 쓰면 막지 않고 통과 (호출 자체를 멈추는 것보다 나음)
+            print(f"⚠️ Rate Limiter Error ({name}): {e}")
+            return
+        if wait == 0:
+            _count(name, "waited" if waited else "granted")
+            return
+        if reason is None and time.monotonic() + wait > deadline:
+            reason = "rate limited"
+        if reason is not None:
+            _count(name, f"shed_{priority}")
+            raise QuotaExceeded(name, reason, wait)
+        waited = True
+        time.sleep(wait)
+
+
+def _count(name, key):
+    with _stats_lock:
+        counters = _stats.setdefault(name, {"granted": 0, "waited": 0, "shed_interactive": 0, "shed_background": 0})
+        counters[key] += 1
+
+
+# 4. 워커 간 임대 (여러 워커 중 1개만 실행할 작업용)
+def hold_lease(name: str, owner: str, ttl: float):
+    """
+    name 임대를 owner가 잡거나 연장 (ttl초 동안 유효). 다른 owner가 유효하게 들고 있으면 False.
+    한도 파일을 못 쓰면 True (막는 것보다 각자 실행하는 편이 나음 - acquire와 같은 방침)
+    """
+    now = time.time()
+    try:
+        conn = _connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            held = row is None or row[0] == owner or row[1] < now
+            if held:
+                conn.execute("INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                             (name, owner, now + ttl))
+            conn.execute("COMMIT")
+            return held
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"⚠️ Lease Error ({name}): {e}")
+        return True
+
+
+def release_lease(name: str, owner: str):
+    """owner가 들고 있으면 바로 놓음 (다른 워커가 만료를 기다리지 않고 이어받도록)"""
+    try:
+        _connect().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+    except sqlite3.Error as e:
+        print(f"⚠️ Lease Error ({name}): {e}")
+
+
+# 5. 남은 한도 조회 (/system/quotas)
+def remaining():
+    now = time.time()
+    try:
+        rows = {row[0]: row[1:] for row in _connect().execute(
+            "SELECT name, tokens, updated_at, day, used_today FROM rate_buckets")}
+    except sqlite3.Error as e:
+        print(f"⚠️ Rate Limiter Error: {e}")
+        rows = {}
+
+    result = {}
+    for name, bucket in BUCKETS.items():
+        tokens, updated_at, day, used_today = rows.get(name, (bucket.burst, now, bucket.today(now), 0))
+        used_today = used_today if day == bucket.today(now) else 0
+        with _stats_lock:
+            counters = dict(_stats.get(name, {}))
+        result[name] = {
+            "rate_per_second": round(bucket.rate, 4),
+            "burst": bucket.burst,
+            "tokens": round(min(bucket.burst, tokens + max(0.0, now - updated_at) * bucket.rate), 2),
+            "daily_limit": bucket.daily_limit or None,
+            "used_today": used_today,
+            "remaining_today": bucket.daily_limit - used_today if bucket.daily_limit else None,
+            "resets_in_seconds": round(bucket.seconds_until_reset(now)),
+            "process": counters,
+        }
+    return {"enabled": RATE_LIMIT_ENABLED, "background_reserve": BACKGROUND_RESERVE, "buckets": result}
@@ -0,0 +1,264 @@
+# app/resilience.py
+# 외부 API(야후/네이버/구글 RSS/번역/Gemini) 공용 보호막
+# - 데드라인: 호출은 업스트림 전용 스레드풀에서 돌리고, 호출한 쪽은 데드라인까지만 기다림
+# - 동시 호출 상한: 업스트림이 멈춰서 스레드가 다 묶이면 새 호출은 바로 실패 (기다리지 않음)
+# - 서킷 브레이커: 연속 실패가 쌓이면 한동안 호출 자체를 하지 않고 바로 실패
+# - 호출 한도: 네이버/Gemini는 rate_limiter 버킷에서 토큰을 받아야 호출 (워커 간 공유)
+# - 마지막 정상값: 업스트림이 실패하면 마지막으로 받은 값을 나이(stale_age_seconds)와 함께 대신 반환
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from app import rate_limiter
+from app.cache import TTLCache
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))     # 연속 실패 횟수
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))          # 열린 뒤 재시도까지 (초)
+STALE_MAX_AGE_SECONDS = float(os.getenv("STALE_MAX_AGE_SECONDS", "86400"))       # 마지막 정상값 보관 기간 (초)
+
+
+class UpstreamUnavailable(Exception):
+    """업스트림 실패 + 대신 줄 마지막 정상값도 없음 -> API에서는 503"""
+    def __init__(self, provider: str, reason: str, retry_after: float = None):
+        super().__init__(f"{provider}: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """closed(정상) -> 연속 실패 N회 -> open(바로 실패) -> 대기 후 half_open(1건만 시험) -> 성공 시 closed"""
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def cancel_probe(self):
+        """허용받은 시험 호출을 실제로 보내지 못했을 때 (다음 호출이 다시 시험할 수 있게)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_after(self):
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened_count += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class Provider:
+    """업스트림 1개 (데드라인 + 동시 호출 상한 + 서킷 브레이커)"""
+    def __init__(self, name: str, deadline: float, max_concurrency: int = 16):
+        self.name = name
+        self.deadline = deadline
+        self.max_concurrency = max_concurrency
+        self.breaker = CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"upstream-{name}")
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.quota_rejected = 0
+        self.last_error = None
+
+    def call(self, fn, *args, deadline: float = None, wait: float = 0, **kwargs):
+        """
+        fn을 데드라인 안에 실행. 실패/시간초과/차단 시 UpstreamUnavailable
+        wait: 동시 호출 상한이 꽉 찼을 때 빈 자리를 기다리는 최대 시간 (기본 0 = 바로 포기)
+        """
+        self._admit(wait)
+        future = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        try:
+            result = future.result(timeout=deadline or self.deadline)
+        except FutureTimeoutError:
+            # 스레드는 업스트림 전용 풀에서 계속 돌다가 끝나면 반납됨 (웹 워커는 바로 풀려남)
+            self.timeouts += 1
+            self._failed(f"timeout after {deadline or self.deadline}s")
+            raise UpstreamUnavailable(self.name, "timeout")
+        except Exception as e:
+            self._failed(repr(e))
+            raise UpstreamUnavailable(self.name, str(e)) from e
+        self.breaker.record_success()
+        return result
+
+    @contextmanager
+    def guard(self):
+        """스트리밍처럼 데드라인을 걸 수 없는 호출용: 브레이커 확인 + 성공/실패 기록만"""
+        self._admit()
+        try:
+            yield
+        except Exception as e:
+            self._failed(repr(e))
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            self._release(None)
+
+    def _admit(self, wait: float = 0):
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name, "circuit open", self.breaker.retry_after())
+        with self._lock:
+            give_up_at = time.monotonic() + wait
+            while self.in_flight >= self.max_concurrency and time.monotonic() < give_up_at:
+                self._slot_freed.wait(give_up_at - time.monotonic())
+            if self.in_flight >= self.max_concurrency:
+                self.rejected += 1
+                saturated = True
+            else:
+                self.in_flight += 1
+                self.calls += 1
+                saturated = False
+        if saturated:
+            # 브레이커가 half_open 시험 호출로 허용했다면 실패로 기록해서 다시 열어둠
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(self.name, "too many in-flight calls", self.deadline)
+        try:
+            rate_limiter.acquire(self.name)
+        except rate_limiter.QuotaExceeded as e:
+            # 한도 초과는 업스트림 장애가 아니므로 브레이커에는 기록하지 않음
+            with self._lock:
+                self.in_flight -= 1
+                self.calls -= 1
+                self.quota_rejected += 1
+                self._slot_freed.notify()
+            self.breaker.cancel_probe()
+            raise UpstreamUnavailable(self.name, e.reason, e.retry_after)
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+            self._slot_freed.notify()
+
+    def _failed(self, error: str):
+        self.failures += 1
+        self.last_error = error
+        self.breaker.record_failure()
+        print(f"⚠️ Upstream {self.name} failed: {error} (breaker {self.breaker.state})")
+
+    def stats(self):
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "opened_count": self.breaker.opened_count,
+            "deadline": self.deadline,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "quota_rejected": self.quota_rejected,
+            "last_error": self.last_error,
+        }
+
+
+PROVIDERS = {
+    "yahoo": Provider("yahoo", float(os.getenv("YAHOO_DEADLINE", "4")),
+                      int(os.getenv("YAHOO_MAX_CONCURRENCY", "32"))),
+    "naver": Provider("naver", float(os.getenv("NAVER_DEADLINE", "3"))),
+    "google_rss": Provider("google_rss", float(os.getenv("GOOGLE_RSS_DEADLINE", "5"))),
+    "translate": Provider("translate", float(os.getenv("TRANSLATE_DEADLINE", "5")), 4),
+    "gemini": Provider("gemini", float(os.getenv("GEMINI_DEADLINE", "45")),
+                       int(os.getenv("GEMINI_MAX_IN_FLIGHT", "8"))),
+}
+
+
+def get_provider(name: str):
+    return PROVIDERS[name]
+
+
+# ---------------------------------------------------------
+# 마지막 정상값 (stale-while-revalidate)
+# ---------------------------------------------------------
+_last_good = TTLCache(maxsize=int(os.getenv("STALE_STORE_MAXSIZE", "10000")), ttl=STALE_MAX_AGE_SECONDS)
+# 요청 1건 동안 내려간 stale 값 중 가장 오래된 나이 (미들웨어가 X-Stale-Age 헤더로 붙임)
+_request_staleness = contextvars.ContextVar("request_staleness", default=None)
+
+
+def call_with_stale(provider_name: str, key, fn, *args, deadline: float = None, **kwargs):
+    """
+    업스트림 호출. 성공하면 마지막 정상값을 갱신하고, 실패하면 마지막 정상값을 대신 반환합니다.
+    데드라인을 넘겨도 호출은 업스트림 풀에서 계속 진행되고, 늦게 도착한 결과로 정상값이 갱신됩니다.
+    dict 결과에는 stale/stale_age_seconds 필드가 붙습니다. 정상값도 없으면 UpstreamUnavailable.
+    """
+    def load():
+        value = fn(*args, **kwargs)
+        if value is not None:
+            _last_good.set((provider_name, key), (value, time.time()))
+        return value
+
+    try:
+        return get_provider(provider_name).call(load, deadline=deadline)
+    except UpstreamUnavailable:
+        entry = _last_good.get((provider_name, key))
+        if entry is None:
+            raise
+        value, stored_at = entry
+        return mark_stale(value, time.time() - stored_at)
+
+
+def mark_stale(value, age: float):
+    age = round(age, 1)
+    holder = _request_staleness.get()
+    if holder is not None:
+        holder["age"] = max(holder.get("age", 0.0), age)
+    if isinstance(value, dict):
+        return dict(value, stale=True, stale_age_seconds=age)
+    return value
+
+
+@contextmanager
+def track_request_staleness():
+    """요청 범위 시작 (미들웨어용). yield 한 dict의 "age"에 가장 오래된 stale 나이가 담김"""
+    holder = {}
+    token = _request_staleness.set(holder)
+    try:
+        yield holder
+    finally:
+        _request_staleness.reset(token)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """요청 컨텍스트(stale 기록용)를 유지한 채 다른 스레드풀에 작업 제출"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def stats():
+    return {name: provider.stats() for name, provider in PROVIDERS.items()}
@@ -0,0 +1,145 @@
+# app/scheduler.py
+# 백그라운드 미리 데우기(pre-warm) 스케줄러
+# 관심종목/보유종목/주요 지수의 시세와 차트를 주기적으로 새로 받아 캐시에 넣어두면
+# 사용자 요청은 거의 항상 캐시에서 바로 응답됩니다.
+# uvicorn/gunicorn 워커마다 스케줄러가 뜨지만, 실제 갱신은 임대(lease)를 잡은 워커 1개만 합니다.
+# (임대는 rate_limiter의 공유 sqlite 파일에 있음 - 그 워커가 죽으면 만료 후 다른 워커가 이어받음)
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from app import models, finance, rate_limiter, resilience
+from app.database import SessionLocal
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "1") == "1"
+# 시세 캐시 TTL(기본 30초)보다 짧게 돌아야 캐시가 식기 전에 채워짐
+PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", "25"))      # 초
+PREWARM_JITTER = float(os.getenv("PREWARM_JITTER", "5"))           # 초 (±)
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "8"))   # 동시에 갱신할 종목 수
+PREWARM_HISTORY_PERIOD = "3mo"                                     # 대시보드/홈 차트 기간
+PREWARM_LEASE_NAME = "prewarm"
+
+
+def collect_tickers(db):
+    """관심종목 + 보유종목 + 주요 지수 티커를 중복 없이 모읍니다."""
+    interest_rows = db.query(models.UserInterest.ticker).distinct().all()
+    portfolio_rows = db.query(models.Portfolio.ticker).distinct().all()
+
+    tickers = {row[0].strip().upper() for row in interest_rows + portfolio_rows if row[0]}
+    tickers.update(finance.MAJOR_INDICES.values())
+    return sorted(tickers)
+
+
+class PrewarmScheduler:
+    def __init__(self, interval: float = PREWARM_INTERVAL, jitter: float = PREWARM_JITTER,
+                 concurrency: int = PREWARM_CONCURRENCY, session_factory=SessionLocal):
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.session_factory = session_factory
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ticker_status = {}   # ticker -> {"last_refresh", "last_error", "failures"}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.lease_ttl = (interval + jitter) * 3   # 몇 바퀴 연속 못 돌면 다른 워커가 이어받음
+        self.leader = False
+        self.last_run_at = None
+        self.last_run_seconds = None
+
+    # 1. 시작/종료 훅 (FastAPI lifespan에서 호출)
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+        self._thread.start()
+        print(f"🔥 Prewarm scheduler started (interval {self.interval}s ±{self.jitter}s)")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self.leader:
+            rate_limiter.release_lease(PREWARM_LEASE_NAME, self.owner)
+            self.leader = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            try:
+                self.leader = rate_limiter.hold_lease(PREWARM_LEASE_NAME, self.owner, self.lease_ttl)
+                if self.leader:
+                    self.run_once()
+            except Exception as e:
+                print(f"🚨 Prewarm Error: {e}")
+            # 여러 워커가 같은 순간에 몰리지 않도록 지터를 섞어서 대기
+            delay = max(1.0, self.interval + random.uniform(-self.jitter, self.jitter))
+            self._stop_event.wait(delay)
+
+    # 2. 한 바퀴 갱신
+    def run_once(self):
+        started = time.monotonic()
+        with self.session_factory() as db:
+            tickers = collect_tickers(db)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="prewarm") as executor:
+            for ticker in tickers:
+                if self._stop_event.is_set():
+                    break
+                executor.submit(self._refresh_ticker, ticker)
+
+        self.last_run_at = datetime.now(timezone.utc)
+        self.last_run_seconds = round(time.monotonic() - started, 3)
+        return tickers
+
+    def _refresh_ticker(self, ticker: str):
+        error = None
+        try:
+            # 백그라운드 우선순위: 호출 한도가 빠듯하면 사용자 요청 몫은 건드리지 않고 건너뜀
+            # 야후 장애로 마지막 정상값(stale)을 받은 경우도 갱신 실패로 기록
+            with rate_limiter.background(), resilience.track_request_staleness() as staleness:
+                if finance.refresh_price(ticker) is None:
+                    error = "가격 데이터 없음"
+                elif finance.refresh_price_history(ticker, PREWARM_HISTORY_PERIOD) is None:
+                    error = "차트 데이터 없음"
+                elif "age" in staleness:
+                    error = f"업스트림 장애 - 이전 값 유지 ({staleness['age']}초 전 데이터)"
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            status = self._ticker_status.setdefault(
+                ticker, {"last_refresh": None, "last_error": None, "failures": 0})
+            if error is None:
+                status["last_refresh"] = datetime.now(timezone.utc).isoformat()
+                status["last_error"] = None
+                status["failures"] = 0
+            else:
+                status["last_error"] = error
+                status["failures"] += 1
+
+    # 3. 상태 조회 (/system/prewarm)
+    def status(self):
+        with self._lock:
+            tickers = {ticker: dict(status) for ticker, status in self._ticker_status.items()}
+        return {
+            "running": self.running,
+            "leader": self.leader,
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "concurrency": self.concurrency,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_seconds": self.last_run_seconds,
+            "tickers": tickers,
+        }
+
+
+prewarm_scheduler = PrewarmScheduler()
@@ -39,6 +39,8 @@ class PriceResponse(BaseModel):
     price: float
     change_percent: float
     currency: str
+    stale: bool = False                        # 외부 API 장애로 마지막 정상값을 대신 보낸 경우
+    stale_age_seconds: Optional[float] = None  # 그 값의 나이 (초)
 
 # --- 뉴스 정보 포장지 ---
 class NewsResponse(BaseModel):
@@ -74,6 +76,7 @@ class HistoryPoint(BaseModel):
 class HistoryResponse(BaseModel):
     ticker: str
     history: List[HistoryPoint]
+    indicators: Optional[dict] = None   # indicators= 요청 시 {지표 키: 값 배열}
 
 # AI 브리핑 응답 포장지
 class AiBriefingResponse(BaseModel):
@@ -97,6 +100,39 @@ class PortfolioResponse(BaseModel):
     return_rate: float
     currency: str
     krw_valuation: float | None = None # 달러 주식일 경우 원화 환산액
+    unrealized_pnl: float | None = None    # 평가손익 (현지 통화)
+    day_change: float | None = None        # 당일 변동 금액 (현지 통화)
+    base_valuation: float | None = None    # 기준통화(원화) 환산 평가금액
+    weight: float | None = None            # 포트폴리오 내 비중 (%)
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# 포트폴리오 합계 (기준통화)
+class PortfolioTotals(BaseModel):
+    valuation: float
+    purchase_amount: float
+    unrealized_pnl: float
+    return_rate: float
+    day_change: float
+    day_change_percent: float
+
+class PortfolioSummaryResponse(BaseModel):
+    base_currency: str
+    holdings: List[PortfolioResponse]
+    totals: PortfolioTotals
+    fx_rates: dict[str, float | None]
+    missing_quotes: List[str]
+    missing_fx: List[str]
+
+# 포트폴리오 가치 시계열 (기준통화)
+class PortfolioHistoryResponse(BaseModel):
+    base_currency: str
+    period: str
+    dates: List[str]
+    value: List[float]
+    return_rate: List[float]   # 기간 시작일 대비 (%)
+    pnl: List[float]           # 매입금액 대비 평가손익
+    missing_quotes: List[str]  # 시세(통화)를 못 받아서 빠진 종목
+    missing_history: List[str]
+    missing_fx: List[str]
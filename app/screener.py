@@ -0,0 +1,200 @@
+# app/screener.py
+# 주도 섹터 / 주도주 스크리너 (국장, 미장 분리)
+# 종목 유니버스 전체의 종가를 청크 단위 일괄 다운로드(병렬)로 받고,
+# 1개월 수익률 계산 -> 시장별 상위 N위 -> 섹터별 묶음을 배열 연산 한 번으로 처리합니다.
+# 결과는 DB에 스냅샷으로 저장해두고, 조회 API는 저장된 최신 결과만 읽습니다.
+#
+# 실행: python -m app.screener              (야후에서 받기)
+#       python -m app.screener --fixture    (로컬 고정 데이터로 실행 - 테스트용)
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from sqlalchemy import delete
+from app import models
+from app.database import SessionLocal, engine
+from app.history_store import period_start
+
+_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+SCREENER_UNIVERSE_PATH = os.getenv("SCREENER_UNIVERSE_PATH", os.path.join(_DATA_DIR, "screener_universe.csv"))
+SCREENER_FIXTURE_PATH = os.getenv("SCREENER_FIXTURE_PATH", os.path.join(_DATA_DIR, "screener_fixture_closes.csv"))
+SCREENER_CHUNK_SIZE = int(os.getenv("SCREENER_CHUNK_SIZE", "200"))       # yf.download 1회당 종목 수
+SCREENER_FETCH_WORKERS = int(os.getenv("SCREENER_FETCH_WORKERS", "4"))   # 동시에 받을 청크 수
+SCREENER_TOP_N = int(os.getenv("SCREENER_TOP_N", "30"))
+SCREENER_LOOKBACK = os.getenv("SCREENER_LOOKBACK", "1mo")
+MARKETS = ("KR", "US")
+
+
+# 1. 유니버스 (ticker, name, market, sector CSV)
+def load_universe(path: str = SCREENER_UNIVERSE_PATH):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if row.get("ticker")]
+    seen = set()
+    universe = []
+    for row in rows:
+        ticker = row["ticker"].strip().upper()
+        if ticker in seen:
+            continue
+        seen.add(ticker)
+        universe.append({"ticker": ticker,
+                         "name": (row.get("name") or ticker).strip(),
+                         "market": (row.get("market") or "").strip().upper(),
+                         "sector": (row.get("sector") or "기타").strip() or "기타"})
+    return universe
+
+
+# 2. 종가 소스: fetch(tickers) -> (dates datetime64[D], closes 행렬 [날짜 x 종목], 유니버스 순서)
+class YahooCloseSource:
+    """yf.download 로 청크 단위 일괄 조회, 청크끼리는 병렬"""
+    def __init__(self, chunk_size: int = SCREENER_CHUNK_SIZE, workers: int = SCREENER_FETCH_WORKERS,
+                 period: str = "3mo"):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.period = period
+
+    def fetch(self, tickers):
+        chunks = [tickers[i:i + self.chunk_size] for i in range(0, len(tickers), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="screener") as executor:
+            frames = [frame for frame in executor.map(self._download, chunks) if frame is not None]
+        if not frames:
+            return np.array([], dtype="datetime64[D]"), np.empty((0, len(tickers)))
+        closes = pd.concat(frames, axis=1)
+        closes = closes.loc[:, ~closes.columns.duplicated()].reindex(columns=tickers)
+        return _frame_to_matrix(closes)
+
+    def _download(self, chunk):
+        try:
+            data = yf.download(chunk, period=self.period, interval="1d", auto_adjust=True,
+                               progress=False, threads=False)
+            if data is None or data.empty:
+                return None
+            closes = data["Close"]
+            if isinstance(closes, pd.Series):
+                closes = closes.to_frame(chunk[0])
+            index = closes.index
+            if getattr(index, "tz", None) is not None:
+                closes.index = index.tz_localize(None)
+            return closes
+        except Exception as e:
+            print(f"⚠️ Screener Download Error ({chunk[0]}..{chunk[-1]}, {len(chunk)}개): {e}")
+            return None
+
+
+class FixtureCloseSource:
+    """date 열 + 종목별 종가 열로 된 로컬 CSV (테스트/오프라인용)"""
+    def __init__(self, path: str = SCREENER_FIXTURE_PATH):
+        self.path = path
+
+    def fetch(self, tickers):
+        closes = pd.read_csv(self.path, index_col="date", parse_dates=["date"])
+        closes.columns = [c.strip().upper() for c in closes.columns]
+        return _frame_to_matrix(closes.reindex(columns=tickers))
+
+
+def _frame_to_matrix(closes):
+    closes = closes.sort_index().ffill()   # 휴장/결측일은 직전 종가
+    dates = closes.index.values.astype("datetime64[D]")
+    return dates, closes.to_numpy(dtype="float64")
+
+
+# 3. 계산 (배열 한 번에)
+def compute_leaders(universe, dates, closes, lookback: str = SCREENER_LOOKBACK, top_n: int = SCREENER_TOP_N):
+    """
+    {시장: {"as_of", "lookback", "universe_size", "priced", "leaders": [...], "sectors": [...]}}
+    기준일은 마지막 거래일, 비교 기준은 (기준일 - lookback) 당일 또는 그 직전 거래일 종가
+    """
+    markets = np.array([item["market"] for item in universe])
+    sectors = np.array([item["sector"] for item in universe])
+    results = {}
+    if len(dates) == 0:
+        return {market: _empty_result(market, lookback, int((markets == market).sum())) for market in MARKETS}
+
+    as_of = dates[-1]
+    base_index = max(int(np.searchsorted(dates, period_start(lookback, today=as_of), side="right")) - 1, 0)
+    last_close = closes[-1]
+    base_close = closes[base_index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (last_close / base_close - 1) * 100
+    valid = np.isfinite(returns) & (base_close > 0)
+
+    for market in MARKETS:
+        in_market = markets == market
+        candidates = np.flatnonzero(in_market & valid)
+        # 수익률 내림차순 (같으면 유니버스 순서)
+        ranked = candidates[np.argsort(-returns[candidates], kind="stable")][:top_n]
+
+        leaders = [{"rank": rank, "ticker": universe[i]["ticker"], "name": universe[i]["name"],
+                    "sector": universe[i]["sector"], "return_rate": round(float(returns[i]), 2),
+                    "close": float(last_close[i])}
+                   for rank, i in enumerate(ranked.tolist(), start=1)]
+
+        # 상위 종목을 섹터별로 묶기: 종목 수 많은 순 -> 평균 수익률 높은 순
+        names, inverse, counts = np.unique(sectors[ranked], return_inverse=True, return_counts=True)
+        avg_returns = np.bincount(inverse, weights=returns[ranked], minlength=len(names)) / np.maximum(counts, 1)
+        order = np.lexsort((-avg_returns, -counts))
+        sector_groups = [{"sector": str(names[s]), "count": int(counts[s]),
+                          "avg_return": round(float(avg_returns[s]), 2),
+                          "tickers": [leader["ticker"] for leader in leaders if leader["sector"] == names[s]]}
+                         for s in order.tolist()]
+
+        results[market] = {
+            "market": market,
+            "as_of": str(as_of),
+            "lookback": lookback,
+            "universe_size": int(in_market.sum()),
+            "priced": len(candidates),
+            "leaders": leaders,
+            "sectors": sector_groups,
+        }
+    return results
+
+
+def _empty_result(market, lookback, universe_size):
+    return {"market": market, "as_of": None, "lookback": lookback, "universe_size": universe_size,
+            "priced": 0, "leaders": [], "sectors": []}
+
+
+# 4. 실행 + 저장
+def run_screener(source=None, universe_path: str = SCREENER_UNIVERSE_PATH, session_factory=SessionLocal):
+    """유니버스 전체를 계산해서 시장별 스냅샷을 저장하고 결과를 반환합니다."""
+    source = source or YahooCloseSource()
+    started = time.perf_counter()
+    universe = load_universe(universe_path)
+    dates, closes = source.fetch([item["ticker"] for item in universe])
+    results = compute_leaders(universe, dates, closes)
+
+    with session_factory() as db:
+        for market, result in results.items():
+            if not result["priced"]:
+                continue   # 데이터를 못 받은 시장은 이전 스냅샷 유지
+            # 조회는 최신 1건만 쓰므로 같은 트랜잭션에서 이전 스냅샷을 교체 (매 실행마다 행이 쌓이지 않게)
+            db.execute(delete(models.ScreenerSnapshot).where(models.ScreenerSnapshot.market == market))
+            db.add(models.ScreenerSnapshot(market=market, as_of=result["as_of"],
+                                           payload=json.dumps(result, ensure_ascii=False)))
+        db.commit()
+
+    print(f"📈 Screener done: {len(universe)} tickers, "
+          + ", ".join(f"{m} {r['priced']}/{r['universe_size']}" for m, r in results.items())
+          + f" ({time.perf_counter() - started:.1f}s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주도 섹터/주도주 스크리너 실행")
+    parser.add_argument("--fixture", nargs="?", const=SCREENER_FIXTURE_PATH,
+                        help="야후 대신 로컬 종가 CSV 사용 (경로 생략 시 기본 고정 데이터)")
+    parser.add_argument("--universe", default=SCREENER_UNIVERSE_PATH, help="유니버스 CSV 경로")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    source = FixtureCloseSource(args.fixture) if args.fixture else YahooCloseSource()
+    run_screener(source, args.universe)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# app/valuation.py
+# 포트폴리오 평가 엔진 (다중 통화)
+# 보유 종목/시세를 배열로 모아서 평가금액, 비중, 평가손익, 당일 변동, 기준통화 합계를 한 번에 계산합니다.
+# 기간별 가치 시계열도 종목/환율 일봉을 하나의 (날짜 x 종목) 행렬로 맞춰서 계산합니다.
+import numpy as np
+
+
+def value_portfolio(holdings, quotes, fx_rates, base_currency: str = "KRW"):
+    """
+    holdings: [{"id", "ticker", "quantity", "avg_price"}, ...]
+    quotes:   {티커(대문자): 가격정보 dict 또는 None}  (finance.get_current_prices 결과)
+    fx_rates: {통화: 기준통화 환산율 또는 None}       (finance.get_fx_rates 결과)
+
+    시세가 없는 종목은 결과에서 빠지고 missing_quotes에 남습니다. (기존 /portfolio 동작과 같음)
+    환율이 없는 통화의 종목은 기준통화 값이 None이 되고 합계에서 빠지며 missing_fx에 남습니다.
+    """
+    base_currency = base_currency.upper()
+    priced = []
+    missing_quotes = []
+    for holding in holdings:
+        quote = quotes.get(holding["ticker"].strip().upper())
+        if quote:
+            priced.append((holding, quote))
+        else:
+            missing_quotes.append(holding["ticker"])
+
+    if not priced:
+        return {"base_currency": base_currency, "holdings": [], "totals": _empty_totals(),
+                "fx_rates": fx_rates, "missing_quotes": missing_quotes, "missing_fx": []}
+
+    # 1. 열 단위 배열로 모으기
+    quantity = np.array([h["quantity"] or 0.0 for h, _ in priced], dtype="float64")
+    avg_price = np.array([h["avg_price"] or 0.0 for h, _ in priced], dtype="float64")
+    price = np.array([q["price"] for _, q in priced], dtype="float64")
+    prev_close = np.array([_previous_close(q) for _, q in priced], dtype="float64")
+    currencies = [(q.get("currency") or base_currency).upper() for _, q in priced]
+    fx = np.array([np.nan if fx_rates.get(c) is None else fx_rates[c] for c in currencies], dtype="float64")
+
+    # 2. 종목별 계산 (현지 통화)
+    purchase_amount = avg_price * quantity
+    current_valuation = price * quantity
+    unrealized_pnl = current_valuation - purchase_amount
+    safe_avg = np.where(avg_price > 0, avg_price, 1.0)
+    return_rate = np.where(avg_price > 0, (price - avg_price) / safe_avg * 100, 0.0)
+    day_change = (price - prev_close) * quantity
+    day_change = np.where(np.isnan(day_change), 0.0, day_change)
+
+    # 3. 기준통화 환산 + 비중
+    base_valuation = current_valuation * fx
+    base_purchase = purchase_amount * fx
+    base_pnl = unrealized_pnl * fx
+    base_day_change = day_change * fx
+    has_fx = ~np.isnan(fx)
+    total_valuation = base_valuation[has_fx].sum()
+    weight = base_valuation / total_valuation * 100 if total_valuation > 0 else np.zeros_like(base_valuation)
+
+    # 4. 합계 (환율 없는 종목 제외)
+    total_purchase = base_purchase[has_fx].sum()
+    total_pnl = base_pnl[has_fx].sum()
+    total_day_change = base_day_change[has_fx].sum()
+    prev_total = total_valuation - total_day_change
+    totals = {
+        "valuation": float(total_valuation),
+        "purchase_amount": float(total_purchase),
+        "unrealized_pnl": float(total_pnl),
+        "return_rate": float(total_pnl / total_purchase * 100) if total_purchase > 0 else 0.0,
+        "day_change": float(total_day_change),
+        "day_change_percent": float(total_day_change / prev_total * 100) if prev_total > 0 else 0.0,
+    }
+
+    # 5. 응답용 dict로 풀기 (배열 -> 파이썬 리스트는 열마다 1번씩만 변환)
+    columns = {
+        "current_price": price.tolist(),
+        "purchase_amount": purchase_amount.tolist(),
+        "current_valuation": current_valuation.tolist(),
+        "return_rate": return_rate.tolist(),
+        "unrealized_pnl": unrealized_pnl.tolist(),
+        "day_change": day_change.tolist(),
+        "base_valuation": _nullable(base_valuation),
+        "weight": _nullable(weight),
+    }
+    rows = []
+    for i, (holding, _) in enumerate(priced):
+        row = {
+            "id": holding["id"],
+            "ticker": holding["ticker"],
+            "quantity": holding["quantity"],
+            "avg_price": holding["avg_price"],
+            "currency": currencies[i],
+        }
+        for name, values in columns.items():
+            row[name] = values[i]
+        rows.append(row)
+
+    return {
+        "base_currency": base_currency,
+        "holdings": rows,
+        "totals": totals,
+        "fx_rates": fx_rates,
+        "missing_quotes": missing_quotes,
+        "missing_fx": sorted({c for c, ok in zip(currencies, has_fx) if not ok}),
+    }
+
+
+def portfolio_history(holdings, currencies, histories, fx_histories, base_currency: str = "KRW"):
+    """
+    포트폴리오 가치 시계열 (현재 보유 수량을 기간 내내 들고 있었다고 가정)
+    holdings:     [{"ticker", "quantity", "avg_price"}, ...]
+    currencies:   {티커(대문자): 통화}                        (시세를 못 받은 종목은 없음)
+    histories:    {티커(대문자): (dates, closes) 또는 None}   (finance.get_histories 결과)
+    fx_histories: {통화: (dates, rates) 또는 None}            (기준통화 자신은 필요 없음)
+
+    모든 시리즈를 날짜 합집합 위에 정렬하고 휴장일은 직전 값으로 채웁니다.
+    모든 종목/환율 값이 처음으로 다 갖춰진 날부터 반환합니다.
+    통화를 모르는 종목(시세 실패)은 환산할 수 없으므로 빠지고 missing_quotes에 남습니다. (value_portfolio와 같음)
+    """
+    base_currency = base_currency.upper()
+    result = {"base_currency": base_currency, "dates": [], "value": [], "return_rate": [],
+              "pnl": [], "missing_quotes": [], "missing_history": [], "missing_fx": []}
+
+    # 1. 계산에 쓸 수 있는 종목만 고르기
+    usable = []
+    for holding in holdings:
+        ticker = holding["ticker"].strip().upper()
+        currency = (currencies.get(ticker) or "").upper()
+        if not currency:
+            result["missing_quotes"].append(holding["ticker"])
+        elif not histories.get(ticker):
+            result["missing_history"].append(holding["ticker"])
+        elif currency != base_currency and not fx_histories.get(currency):
+            if currency not in result["missing_fx"]:
+                result["missing_fx"].append(currency)
+        else:
+            usable.append((holding, ticker, currency))
+    if not usable:
+        return result
+
+    fx_used = sorted({currency for _, _, currency in usable if currency != base_currency})
+    series = [histories[ticker] for _, ticker, _ in usable] + [fx_histories[c] for c in fx_used]
+
+    # 2. 날짜 합집합 위에 (날짜 x 시리즈) 행렬로 정렬 + 직전 값 채우기
+    dates = np.unique(np.concatenate([s[0] for s in series]))
+    matrix = np.full((len(dates), len(series)), np.nan)
+    for col, (s_dates, s_values) in enumerate(series):
+        matrix[np.searchsorted(dates, s_dates), col] = s_values
+    matrix = _forward_fill(matrix)
+
+    complete = ~np.isnan(matrix).any(axis=1)
+    if not complete.any():
+        return result
+    first = int(np.argmax(complete))
+    dates, matrix = dates[first:], matrix[first:]
+
+    # 3. 종목별 환율 열을 붙여서 한 번에 곱하고 합산
+    closes = matrix[:, :len(usable)]
+    fx_columns = np.ones((len(dates), len(usable)))
+    fx_index = {currency: len(usable) + i for i, currency in enumerate(fx_used)}
+    for col, (_, _, currency) in enumerate(usable):
+        if currency != base_currency:
+            fx_columns[:, col] = matrix[:, fx_index[currency]]
+
+    quantity = np.array([h["quantity"] or 0.0 for h, _, _ in usable], dtype="float64")
+    avg_price = np.array([h["avg_price"] or 0.0 for h, _, _ in usable], dtype="float64")
+    value = (closes * quantity * fx_columns).sum(axis=1)
+    cost = (avg_price * quantity * fx_columns).sum(axis=1)   # 매입금액도 그날 환율로 환산
+
+    start_value = value[0]
+    result.update(
+        dates=np.datetime_as_string(dates, unit="D").tolist(),
+        value=value.tolist(),
+        return_rate=((value / start_value - 1) * 100).tolist() if start_value > 0 else [0.0] * len(value),
+        pnl=(value - cost).tolist(),
+    )
+    return result
+
+
+def _forward_fill(matrix):
+    """열마다 NaN을 바로 위(직전 날짜)의 값으로 채움"""
+    index = np.where(~np.isnan(matrix), np.arange(len(matrix))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return matrix[index, np.arange(matrix.shape[1])]
+
+
+def _previous_close(quote):
+    previous_close = quote.get("previous_close")
+    if previous_close:
+        return previous_close
+    # 예전 형식 시세(전일 종가 없음)는 등락률로 역산
+    change = quote.get("change_percent") or 0.0
+    return quote["price"] / (1 + change / 100) if change > -100 else np.nan
+
+
+def _nullable(values):
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def _empty_totals():
+    return {"valuation": 0.0, "purchase_amount": 0.0, "unrealized_pnl": 0.0,
+            "return_rate": 0.0, "day_change": 0.0, "day_change_percent": 0.0}
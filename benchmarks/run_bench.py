@@ -0,0 +1,326 @@
+# benchmarks/run_bench.py
+# 엔드포인트 부하 테스트 (네트워크 없이 재현 가능)
+# - 임시 SQLite DB + 가짜 업스트림(providers 계층 교체)으로 FastAPI 앱을 uvicorn 스레드에서 띄움
+# - 시나리오(엔드포인트)별로 동시 요청을 보내고 처리량, p50/p95/p99 지연, 업스트림 호출 수를 측정
+# - 결과는 JSON 파일로 저장 -> 커밋끼리 비교 (--baseline 으로 이전 결과와 비교해서 느려지면 실패 코드)
+#
+# 실행: python benchmarks/run_bench.py
+#       python benchmarks/run_bench.py --concurrency 32 --requests 500 --latency-ms "yahoo=30-80,*=20"
+#       python benchmarks/run_bench.py --fixtures data/fixtures      (UPSTREAM_MODE=record 로 녹화한 실제 응답 재생)
+#       python benchmarks/run_bench.py --baseline bench_prev.json --max-regression 0.2
+import argparse
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICKERS = ["AAPL", "MSFT", "NVDA", "TSLA", "005930.KS", "000660.KS"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="엔드포인트 부하 테스트")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오별 요청 수")
+    parser.add_argument("--warmup", type=int, default=5, help="시나리오별 측정 전 요청 수")
+    parser.add_argument("--users", type=int, default=4, help="가상 사용자 수")
+    parser.add_argument("--latency-ms", default="yahoo=20-60,naver=10-30,google_rss=20-50,translate=20,gemini=300",
+                        help="업스트림별 주입 지연 (providers.UPSTREAM_LATENCY_MS 형식)")
+    parser.add_argument("--failure-rate", default="0", help="업스트림별 주입 실패율 (0~1)")
+    parser.add_argument("--fixtures", help="가짜 응답 대신 녹화된 고정 데이터 폴더 재생")
+    parser.add_argument("--only", help="쉼표로 구분한 시나리오 이름만 실행")
+    parser.add_argument("--rate-limit", action="store_true", help="호출 한도(rate_limiter) 켜기")
+    parser.add_argument("--output", default="bench_results.json", help="결과 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="p95가 기준보다 이 비율 이상 늘면 실패 (기본 20%%)")
+    return parser.parse_args()
+
+
+# 1. 환경 (앱 import 전에 설정해야 모듈 상단 설정값에 반영됨)
+def prepare_environment(args, workdir):
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "HISTORY_STORE_DIR": os.path.join(workdir, "history"),
+        "QUOTA_DB_PATH": os.path.join(workdir, "quota.sqlite3"),
+        "RATE_LIMIT_ENABLED": "1" if args.rate_limit else "0",
+        "PREWARM_ENABLED": "0",
+        "UPSTREAM_MODE": "live",   # 공급자는 아래에서 직접 교체
+    })
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ.setdefault("NAVER_CLIENT_ID", "bench")
+    os.environ.setdefault("NAVER_CLIENT_SECRET", "bench")
+    sys.path.insert(0, ROOT)
+
+
+# 2. 가짜 업스트림: 재생 공급자의 지연/실패 주입은 그대로 쓰고, 응답만 키로부터 만들어냄
+def make_synthetic_provider(providers, history_store, args):
+    import numpy as np
+
+    class SyntheticProvider(providers.ReplayProvider):
+        mode = "synthetic"
+
+        def _lookup(self, kind, key, alternate=None):
+            return getattr(self, f"_fake_{kind}")(*key)
+
+        def _fake_quote(self, ticker):
+            price = _seed(ticker) % 90000 / 100 + 10
+            return {"price": price, "previous_close": round(price * 0.99, 4),
+                    "currency": "KRW" if ticker.endswith((".KS", ".KQ")) or ticker == "KRW=X" else "USD"}
+
+        def _fake_history(self, ticker, period, start):
+            today = np.datetime64("today", "D")
+            dates = np.arange(today - np.timedelta64(800, "D"), today + np.timedelta64(1, "D"))
+            dates = dates[np.is_busday(dates)]
+            dates = dates[dates >= (np.datetime64(start[:10], "D") if start else history_store.period_start(period))]
+            rng = np.random.default_rng(_seed(ticker))
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+            return {"dates": np.datetime_as_string(dates, unit="D").tolist(),
+                    "columns": {"open": close.tolist(), "high": (close * 1.01).tolist(),
+                                "low": (close * 0.99).tolist(), "close": close.tolist(),
+                                "volume": np.full(len(dates), 1e6).tolist()}}
+
+        def _fake_yahoo_news(self, ticker):
+            return [{"content": {"title": f"{ticker} headline {i}", "pubDate": "2026-01-01T00:00:00Z",
+                                 "clickThroughUrl": {"url": f"https://example.com/{ticker}/{i}"}}}
+                    for i in range(5)]
+
+        def _fake_naver_news(self, query, display):
+            return [{"title": f"<b>{query}</b> 뉴스 {i}", "originallink": f"https://example.kr/{query}/{i}",
+                     "link": f"https://example.kr/{query}/{i}", "pubDate": "Thu, 01 Jan 2026 00:00:00 +0900"}
+                    for i in range(display)]
+
+        def _fake_google_news(self, query):
+            items = "".join(f"<item><title>{query} story {i} - Wire</title><link>https://example.com/g/{i}</link>"
+                            f"<pubDate>Thu, 01 Jan 2026 00:00:00 GMT</pubDate></item>" for i in range(5))
+            return f"<rss><channel>{items}</channel></rss>"
+
+        def _fake_translate(self, text, target):
+            return text
+
+        def _fake_generate(self, prompt, kwargs):
+            return "합성 브리핑 본문입니다. " * 20
+
+        def _fake_generate_stream(self, prompt):
+            return ["합성 ", "브리핑 ", "본문입니다."]
+
+    return SyntheticProvider(latency_ms=args.latency_ms, failure_rate=args.failure_rate)
+
+
+def _seed(text):
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+# 3. 서버 (uvicorn을 같은 프로세스의 스레드에서 실행)
+def start_server(app):
+    import uvicorn
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           access_log=False))
+    thread = threading.Thread(target=server.run, name="bench-server", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("서버가 시작되지 않았습니다.")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+# 4. 시나리오: (이름, 메서드, 경로 생성 함수, 요청 옵션 생성 함수)
+def build_scenarios(users):
+    def auth(i):
+        return {"headers": users[i % len(users)]["headers"]}
+
+    def ticker(i):
+        return TICKERS[i % len(TICKERS)]
+
+    return [
+        ("login", "POST", lambda i: "/login",
+         lambda i: {"data": {"username": users[i % len(users)]["email"], "password": "bench-password"}}),
+        ("interests_list", "GET", lambda i: "/interests", auth),
+        ("interests_add", "POST", lambda i: "/interests",
+         lambda i: dict(auth(i), json={"ticker": f"BENCH{i}", "category": "stock"})),
+        ("interests_delete", "DELETE", lambda i: f"/interests/BENCH{i}", auth),
+        ("portfolio", "GET", lambda i: "/portfolio", auth),
+        ("portfolio_summary", "GET", lambda i: "/portfolio/summary", auth),
+        ("portfolio_history", "GET", lambda i: "/portfolio/history?period=6mo", auth),
+        ("assets_price", "GET", lambda i: f"/assets/price/{ticker(i)}", auth),
+        ("assets_news", "GET", lambda i: f"/assets/news/{ticker(i)}", auth),
+        ("assets_history", "GET", lambda i: f"/assets/history/{ticker(i)}?period=1y", auth),
+        ("assets_history_compact", "GET",
+         lambda i: f"/assets/history/{ticker(i)}?period=1y&format=compact&indicators=sma:20,rsi,macd", auth),
+        ("assets_briefing", "GET", lambda i: f"/assets/briefing/{ticker(i)}", auth),
+        ("home_indices", "GET", lambda i: "/home/indices", lambda i: {}),
+        ("home_chart", "GET", lambda i: f"/home/chart/{['KOSPI', 'NASDAQ', 'S_P500', 'NIKKEI'][i % 4]}",
+         lambda i: {}),
+    ]
+
+
+def create_users(base_url, count):
+    import requests
+    users = []
+    with requests.Session() as session:
+        for n in range(count):
+            email = f"bench{n}@example.com"
+            session.post(f"{base_url}/signup", json={"email": email, "password": "bench-password"})
+            token = session.post(f"{base_url}/login",
+                                 data={"username": email, "password": "bench-password"}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            for i, ticker in enumerate(TICKERS):
+                session.post(f"{base_url}/interests", headers=headers, json={"ticker": ticker, "category": "stock"})
+                if i % 2 == 0:
+                    session.post(f"{base_url}/portfolio", headers=headers,
+                                 json={"ticker": ticker, "avg_price": 100.0, "quantity": 1 + i})
+            users.append({"email": email, "headers": headers})
+    return users
+
+
+def run_scenario(base_url, scenario, args):
+    import requests
+    name, method, path, options = scenario
+    local = threading.local()
+
+    def send(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path(i), timeout=60, **options(i))
+            ok = response.status_code < 400
+            status = response.status_code
+        except requests.RequestException:
+            ok, status = False, "error"
+        return time.perf_counter() - started, ok, status
+
+    # 준비 요청 (캐시/커넥션 데우기 - 결과에는 넣지 않음)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(send, range(-args.warmup, 0)))
+        started = time.perf_counter()
+        results = list(executor.map(send, range(args.requests)))
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def summarize(results, elapsed, upstream_calls):
+    import numpy as np
+    latencies = np.array([latency for latency, _, _ in results]) * 1000
+    statuses = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist() if len(latencies) else (0, 0, 0)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, ok, _ in results if not ok),
+        "statuses": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "latency_ms": {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2),
+                       "mean": round(float(latencies.mean()), 2) if len(latencies) else 0,
+                       "max": round(float(latencies.max()), 2) if len(latencies) else 0},
+        "upstream_calls": upstream_calls,
+        "upstream_calls_per_request": round(sum(upstream_calls.values()) / len(results), 3) if results else 0,
+    }
+
+
+def upstream_call_counts(provider):
+    return {kind: counters.get("calls", 0) for kind, counters in provider.stats()["kinds"].items()}
+
+
+def diff_counts(after, before):
+    return {kind: after[kind] - before.get(kind, 0) for kind in after if after[kind] - before.get(kind, 0)}
+
+
+# 5. 이전 결과와 비교
+def compare(results, baseline_path, max_regression):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["scenarios"]
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous["latency_ms"]["p95"]:
+            continue
+        change = current["latency_ms"]["p95"] / previous["latency_ms"]["p95"] - 1
+        marker = "🔺" if change > max_regression else "  "
+        print(f"{marker} {name:24s} p95 {previous['latency_ms']['p95']:9.2f} -> "
+              f"{current['latency_ms']['p95']:9.2f} ms ({change:+.0%})")
+        if change > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    prepare_environment(args, workdir)
+
+    from app import main as app_main, providers, history_store
+    if args.fixtures:
+        provider = providers.ReplayProvider(args.fixtures, latency_ms=args.latency_ms,
+                                            failure_rate=args.failure_rate, fallback=True)
+    else:
+        provider = make_synthetic_provider(providers, history_store, args)
+    providers.use(provider)
+
+    server, thread, base_url = start_server(app_main.app)
+    print(f"🚀 Benchmark server {base_url} (db: {workdir}, upstream: {provider.mode})")
+    try:
+        users = create_users(base_url, args.users)
+        scenarios = build_scenarios(users)
+        if args.only:
+            selected = {name.strip() for name in args.only.split(",")}
+            scenarios = [scenario for scenario in scenarios if scenario[0] in selected]
+
+        results = {}
+        for scenario in scenarios:
+            before = upstream_call_counts(provider)
+            runs, elapsed = run_scenario(base_url, scenario, args)
+            results[scenario[0]] = summarize(runs, elapsed, diff_counts(upstream_call_counts(provider), before))
+            latency = results[scenario[0]]["latency_ms"]
+            print(f"  {scenario[0]:24s} {results[scenario[0]]['throughput_rps']:8.1f} req/s  "
+                  f"p50 {latency['p50']:8.2f}  p95 {latency['p95']:8.2f}  p99 {latency['p99']:8.2f} ms  "
+                  f"errors {results[scenario[0]]['errors']}  upstream {sum(results[scenario[0]]['upstream_calls'].values())}")
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"concurrency": args.concurrency, "requests": args.requests, "warmup": args.warmup,
+                   "users": args.users, "latency_ms": args.latency_ms, "failure_rate": args.failure_rate,
+                   "upstream": provider.mode, "fixtures": args.fixtures, "rate_limit": args.rate_limit},
+        "scenarios": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📝 Results saved: {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        if regressions:
+            print(f"🚨 p95 regression over {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
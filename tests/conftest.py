@@ -0,0 +1,68 @@
+# tests/conftest.py
+# 테스트 공통 설정
+# - app 모듈은 import 시점에 환경변수를 읽으므로, 가장 먼저 임시 DB/파일 경로를 지정
+# - 기본 공급자는 replay (저장된 응답 없음) -> 실수로 네트워크를 부르면 업스트림 실패로 끝남
+# - 가짜 모델/함수를 주입하는 테스트는 live_upstream 픽스처로 실제 호출 계층을 잠깐 씀 (가짜 객체만 호출)
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="ai-secretary-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}",
+    "QUOTA_DB_PATH": os.path.join(_TMP_DIR, "quota.sqlite3"),
+    "HISTORY_STORE_DIR": os.path.join(_TMP_DIR, "history"),
+    "UPSTREAM_MODE": "replay",
+    "UPSTREAM_FIXTURES_DIR": os.path.join(_TMP_DIR, "fixtures"),
+    "PREWARM_ENABLED": "0",
+    "RATE_LIMIT_ENABLED": "0",
+    "GEMINI_API_KEY": "test",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from app import models, providers, resilience
+from app.database import engine, SessionLocal
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    """테스트마다 빈 테이블"""
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    """앞 테스트에서 일부러 낸 실패로 서킷 브레이커가 열려 있지 않도록"""
+    for provider in resilience.PROVIDERS.values():
+        provider.breaker.record_success()
+    yield
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def live_upstream():
+    """가짜 모델/함수를 주입하는 테스트용: 호출 계층을 live로 (주입한 가짜 객체만 불림)"""
+    previous = providers.use(providers.LiveProvider())
+    yield providers.current()
+    providers.use(previous)
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    client.post("/signup", json={"email": "tester@example.com", "password": "pw"})
+    token = client.post("/login", data={"username": "tester@example.com", "password": "pw"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,128 @@
+# 묶음 브리핑: 토큰 예산 묶기 + 응답을 종목별로 나누기 + 실패 시 대체 (가짜 모델)
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from app import ai_analyst, briefings, resilience
+
+PRICE = {"price": 100.0, "change_percent": 1.0}
+
+
+def _news(n, source_count=1, title="Headline"):
+    return [{"title": f"{title} {i}", "source": "Wire", "source_count": source_count, "link": f"https://e/{title}{i}"}
+            for i in range(n)]
+
+
+class FakeBatchModel:
+    """묶음 프롬프트는 JSON으로, 단건 프롬프트는 본문으로 답함. omit 티커는 묶음 응답에서 뺌"""
+    def __init__(self, omit=(), fail=False):
+        self.omit = set(omit)
+        self.fail = fail
+        self.batch_calls = []
+        self.single_calls = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        if self.fail:
+            raise RuntimeError("gemini down")
+        with self._lock:
+            if "[대상 티커]" in prompt:
+                tickers = [t.strip() for t in prompt.split("[대상 티커]")[1].split("\n")[0].split(",")]
+                self.batch_calls.append(tickers)
+                body = {t.lower(): f"{t} 묶음 브리핑" for t in tickers if t not in self.omit}
+                return SimpleNamespace(text="```json\n" + json.dumps(body, ensure_ascii=False) + "\n```")
+            ticker = re.search(r"'([^']+)' 종목", prompt).group(1)
+            self.single_calls.append(ticker)
+            return SimpleNamespace(text=f"{ticker} 단건 브리핑")
+
+
+def test_plan_batches_respects_ticker_cap_and_budget():
+    items = [(f"T{i}", PRICE, _news(5)) for i in range(7)]
+
+    batches = ai_analyst.plan_batches(items, token_budget=100000, max_tickers=3)
+    assert [[ticker for ticker, _, _ in batch] for batch in batches] == [["T0", "T1", "T2"], ["T3", "T4", "T5"], ["T6"]]
+    assert all(len(headlines) == 5 for batch in batches for _, _, headlines in batch)
+
+    base = ai_analyst.estimate_tokens(ai_analyst._BATCH_INSTRUCTIONS)
+    for batch in ai_analyst.plan_batches(items, token_budget=base + 120, max_tickers=10):
+        used = base + sum(ai_analyst.estimate_tokens(header) + sum(map(ai_analyst.estimate_tokens, headlines))
+                          for _, header, headlines in batch)
+        assert used <= base + 120 or len(batch) == 1
+
+
+def test_plan_batches_shares_headlines_round_robin():
+    items = [("A", PRICE, _news(10, title="A")), ("B", PRICE, _news(10, title="B"))]
+    base = ai_analyst.estimate_tokens(ai_analyst._BATCH_INSTRUCTIONS)
+    [batch] = ai_analyst.plan_batches(items, token_budget=base + 30, max_tickers=10)
+
+    counts = [len(headlines) for _, _, headlines in batch]
+    assert abs(counts[0] - counts[1]) <= 1 and 0 < sum(counts) < 20
+
+
+def test_headlines_prioritized_by_coverage_and_trimmed():
+    news = [{"title": "x" * 500, "source": "A"}, {"title": "widely covered", "source": "B", "source_count": 4}]
+    headlines = ai_analyst._prioritized_headlines(news)
+
+    assert headlines[0] == "  - widely covered, 4건 보도"
+    assert len(headlines[1]) == len("  - ") + ai_analyst.BRIEFING_HEADLINE_MAX_CHARS
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"AAPL": "a", "msft": " m "}', {"AAPL": "a", "MSFT": "m"}),
+    ('```json\n{"AAPL": "a"}\n```', {"AAPL": "a"}),
+    ('설명입니다 {"AAPL": "a", "MSFT": ""} 끝', {"AAPL": "a"}),
+    ('{"AAPL": 3, "MSFT": ["x"]}', {}),
+    ('["AAPL"]', {}),
+    ("not json", {}),
+    (None, {}),
+])
+def test_parse_batch_response_splits_per_ticker(text, expected):
+    assert ai_analyst.parse_batch_response(text, ["AAPL", "MSFT"]) == expected
+
+
+def test_batch_generation_splits_results_and_retries_omitted_ticker(live_upstream):
+    model = FakeBatchModel(omit={"T4"})
+    items = [(f"T{i}", PRICE, _news(2)) for i in range(5)]
+
+    results = ai_analyst.analyze_market_batch(items, model=model, token_budget=100000, max_tickers=3)
+
+    assert sorted(map(sorted, model.batch_calls)) == [["T0", "T1", "T2"], ["T3", "T4"]]
+    assert model.single_calls == ["T4"]
+    assert results == {"T0": "T0 묶음 브리핑", "T1": "T1 묶음 브리핑", "T2": "T2 묶음 브리핑",
+                       "T3": "T3 묶음 브리핑", "T4": "T4 단건 브리핑"}
+
+
+def test_batch_waits_for_free_gemini_slot(live_upstream):
+    gemini = resilience.get_provider("gemini")
+    with gemini._lock:
+        gemini.in_flight += gemini.max_concurrency
+
+    def release_later():
+        time.sleep(0.3)
+        for _ in range(gemini.max_concurrency):
+            gemini._release(None)
+    threading.Thread(target=release_later).start()
+
+    results = ai_analyst.analyze_market_batch([("A", PRICE, [])], model=FakeBatchModel())
+
+    assert results == {"A": "A 묶음 브리핑"}
+
+
+def test_failed_batch_falls_back_to_stored_briefing(live_upstream, db):
+    briefings.store_briefing(db, "A", "older-input", "A 이전 브리핑", [])
+    items = [("A", PRICE, _news(1)), ("B", PRICE, _news(1))]
+
+    results = briefings.get_briefings(db, items, model=FakeBatchModel(fail=True))
+
+    assert results == {"A": "A 이전 브리핑", "B": ai_analyst.AI_ERROR_MESSAGE}
+
+
+def test_stored_briefings_skip_generation(live_upstream, db):
+    model = FakeBatchModel()
+    items = [("A", PRICE, _news(1)), ("B", PRICE, _news(1))]
+    first = briefings.get_briefings(db, items, model=model)
+
+    assert briefings.get_briefings(db, items, model=model) == first
+    assert len(model.batch_calls) == 1
@@ -0,0 +1,86 @@
+# AI 브리핑 스트리밍 (SSE) - 가짜 모델로 확인
+import json
+from types import SimpleNamespace
+import pytest
+from app import ai_analyst, briefings, finance
+
+PRICE = {"price": 101.0, "change_percent": 1.2, "currency": "USD"}
+NEWS = [{"title": "Apple beats estimates", "source": "Reuters", "link": "https://example.com/a"}]
+
+
+class FakeModel:
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if not stream:
+            return SimpleNamespace(text="".join(self.chunks))
+        return self._stream()
+
+    def _stream(self):
+        for i, text in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("stream broken")
+            yield SimpleNamespace(text=text)
+
+
+def _events(body: str):
+    events = []
+    for raw in filter(None, body.split("\n\n")):
+        name, data = "message", {}
+        for line in raw.split("\n"):
+            if line.startswith("event: "):
+                name = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+        events.append((name, data))
+    return events
+
+
+@pytest.fixture
+def fake_market(monkeypatch):
+    monkeypatch.setattr(finance, "get_current_price", lambda ticker: PRICE)
+    monkeypatch.setattr(finance, "get_integrated_news", lambda ticker: NEWS)
+
+
+def test_stream_yields_chunks_and_stores_full_text(live_upstream, db):
+    model = FakeModel(["첫 ", "조각 ", "끝"])
+
+    assert list(briefings.stream_briefing("AAPL", PRICE, NEWS, model=model)) == ["첫 ", "조각 ", "끝"]
+
+    # 저장된 전체 본문은 다음 요청에서 한 번에 (모델 호출 없음)
+    assert list(briefings.stream_briefing("AAPL", PRICE, NEWS, model=model)) == ["첫 조각 끝"]
+    assert model.calls == 1
+
+
+def test_sse_endpoint_sends_chunks_then_done(live_upstream, fake_market, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ai_analyst, "_get_model", lambda: FakeModel(["A", "B"]))
+
+    response = client.get("/assets/briefing/AAPL/stream", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _events(response.text) == [("message", {"text": "A"}), ("message", {"text": "B"}),
+                                      ("done", {"ticker": "AAPL"})]
+
+
+def test_sse_endpoint_reports_error_after_partial_output(live_upstream, fake_market, client, auth_headers,
+                                                        monkeypatch):
+    monkeypatch.setattr(ai_analyst, "_get_model", lambda: FakeModel(["A", "B"], fail_after=1))
+
+    events = _events(client.get("/assets/briefing/AAPL/stream", headers=auth_headers).text)
+
+    assert events[0] == ("message", {"text": "A"})
+    assert events[-1] == ("error", {"message": ai_analyst.AI_ERROR_MESSAGE})
+
+
+def test_json_endpoint_still_available(live_upstream, fake_market, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ai_analyst, "_get_model", lambda: FakeModel(["전체 ", "본문"]))
+
+    response = client.get("/assets/briefing/AAPL", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"ticker": "AAPL", "briefing": "전체 본문"}
@@ -0,0 +1,115 @@
+# 경제 캘린더: 일괄 upsert 멱등성 + 캐시 무효화 (다른 프로세스의 적재 / 관심종목 변경)
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app import models, calendar_events
+from app.database import SQLALCHEMY_DATABASE_URL
+
+RANGE = "/calendar?start=2026-10-01&end=2026-10-31"
+
+
+def _event(day, title, ticker=None, importance=1):
+    event_type = "earnings" if ticker else "macro"
+    return calendar_events.make_event(date(2026, 10, day), event_type, title, ticker=ticker, country="US",
+                                      importance=importance)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    calendar_events.invalidate_all()
+    yield
+
+
+@pytest.fixture
+def other_worker(monkeypatch):
+    """다른 워커/CLI 프로세스 흉내: 별도 엔진으로 적재하고, 이 프로세스의 캐시는 비우지 않음"""
+    monkeypatch.setattr(calendar_events, "invalidate_all", lambda: None)
+    other_engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    yield sessionmaker(bind=other_engine)
+    other_engine.dispose()
+
+
+def test_upsert_is_idempotent(db):
+    events = [_event(5, "CPI"), _event(6, "AAPL 실적 발표", ticker="aapl")]
+    calendar_events.ingest(events)
+    calendar_events.ingest(events)
+
+    rows = db.execute(select(models.CalendarEvent)).scalars().all()
+    assert len(rows) == 2
+    assert {row.source_key for row in rows} == {"macro:US:2026-10-05:CPI", "earnings:AAPL:2026-10-06"}
+
+
+def test_upsert_updates_existing_row(db):
+    calendar_events.ingest([_event(6, "AAPL 실적 발표", ticker="AAPL", importance=1)])
+    calendar_events.ingest([_event(6, "AAPL 실적 발표 (확정)", ticker="AAPL", importance=3)])
+
+    rows = db.execute(select(models.CalendarEvent)).scalars().all()
+    assert [(row.title, row.importance) for row in rows] == [("AAPL 실적 발표 (확정)", 3)]
+
+
+def test_duplicate_keys_in_one_batch_keep_last(db):
+    calendar_events.ingest([_event(5, "CPI", importance=1), _event(5, "CPI", importance=3)])
+
+    assert db.execute(select(models.CalendarEvent.importance)).scalars().all() == [3]
+
+
+def test_each_ingest_bumps_generation(db):
+    for _ in range(3):
+        calendar_events.ingest([_event(5, "CPI")])
+
+    generation = db.execute(select(models.CalendarGeneration.generation)
+                            .where(models.CalendarGeneration.scope == calendar_events.INGEST_SCOPE)).scalar()
+    assert generation == 3
+
+
+def test_range_returns_macro_and_my_tickers_only(client, auth_headers):
+    client.post("/interests", json={"ticker": "aapl", "category": "stock"}, headers=auth_headers)
+    calendar_events.ingest([_event(5, "CPI"), _event(6, "AAPL 실적", ticker="AAPL"),
+                            _event(7, "MSFT 실적", ticker="MSFT"), _event(1, "FOMC", importance=3)])
+
+    events = client.get(RANGE, headers=auth_headers).json()
+
+    assert [(e["date"], e["title"]) for e in events] == [
+        ("2026-10-01", "FOMC"), ("2026-10-05", "CPI"), ("2026-10-06", "AAPL 실적")]
+
+
+def test_second_ingest_from_another_worker_invalidates_cache(client, auth_headers, other_worker):
+    calendar_events.ingest([_event(5, "CPI")], session_factory=other_worker)
+    assert [e["title"] for e in client.get(RANGE, headers=auth_headers).json()] == ["CPI"]
+
+    calendar_events.ingest([_event(5, "CPI"), _event(9, "PPI")], session_factory=other_worker)
+
+    assert [e["title"] for e in client.get(RANGE, headers=auth_headers).json()] == ["CPI", "PPI"]
+
+
+def test_cached_response_reused_until_something_changes(client, auth_headers):
+    calendar_events.ingest([_event(5, "CPI")])
+    client.get(RANGE, headers=auth_headers)
+    hits = calendar_events.get_cache_stats()["hits"]
+
+    client.get(RANGE, headers=auth_headers)
+
+    assert calendar_events.get_cache_stats()["hits"] == hits + 1
+
+
+def test_interest_and_portfolio_changes_invalidate_cache(client, auth_headers):
+    calendar_events.ingest([_event(6, "AAPL 실적", ticker="AAPL"), _event(7, "TSLA 실적", ticker="TSLA")])
+    assert client.get(RANGE, headers=auth_headers).json() == []
+
+    client.post("/interests", json={"ticker": "AAPL", "category": "stock"}, headers=auth_headers)
+    assert [e["ticker"] for e in client.get(RANGE, headers=auth_headers).json()] == ["AAPL"]
+
+    item = client.post("/portfolio", json={"ticker": "tsla", "avg_price": 200.0, "quantity": 1},
+                       headers=auth_headers).json()
+    assert [e["ticker"] for e in client.get(RANGE, headers=auth_headers).json()] == ["AAPL", "TSLA"]
+
+    client.delete("/interests/AAPL", headers=auth_headers)
+    client.delete(f"/portfolio/{item['id']}", headers=auth_headers)
+    assert client.get(RANGE, headers=auth_headers).json() == []
+
+
+def test_range_validation(client, auth_headers):
+    assert client.get("/calendar?start=2026-10-31&end=2026-10-01", headers=auth_headers).status_code == 400
+    assert client.get("/calendar?start=2026-01-01&end=2027-06-01", headers=auth_headers).status_code == 400
+
@@ -0,0 +1,74 @@
+# 차트 응답: compact 형식 복원 + ETag/Last-Modified 조건부 요청 (304)
+import numpy as np
+import pytest
+from app import chart_response, finance
+
+DATES = np.array(["2026-01-02", "2026-01-05", "2026-01-06", "2026-01-07"], dtype="datetime64[D]")
+CLOSES = np.array([100.25, 101.5, np.nan, 99.75])
+LAST_MODIFIED = 1767571200.0   # 2026-01-05 00:00:00 UTC
+
+
+@pytest.fixture
+def fake_history(monkeypatch):
+    series = {"closes": CLOSES.copy()}
+    monkeypatch.setattr(finance, "get_history_arrays", lambda ticker, period: (DATES, series["closes"]))
+    monkeypatch.setattr(finance, "get_history_last_modified", lambda ticker: LAST_MODIFIED)
+    chart_response._body_cache.clear()
+    return series
+
+
+def test_compact_payload_round_trips():
+    dates, closes = chart_response._clean(DATES, CLOSES)
+    payload = chart_response.compact_payload("AAPL", dates, closes)
+
+    restored_dates = np.datetime64(payload["start"]) + np.cumsum(payload["day_deltas"])
+    restored_closes = np.cumsum(payload["price_deltas"]) / payload["scale"]
+    assert restored_dates.tolist() == dates.tolist()
+    assert restored_closes.tolist() == closes.tolist()
+
+
+def test_etag_differs_by_format_and_data():
+    dates, closes = chart_response._clean(DATES, CLOSES)
+    full = chart_response.make_etag("AAPL", "3mo", dates, closes, format="full")
+
+    assert full != chart_response.make_etag("AAPL", "3mo", dates, closes, format="compact")
+    assert full != chart_response.make_etag("AAPL", "3mo", dates, closes + 1, format="full")
+    assert full == chart_response.make_etag("AAPL", "3mo", dates.copy(), closes.copy(), format="full")
+
+
+def test_matching_etag_returns_304(client, fake_history):
+    first = client.get("/home/chart/AAPL")
+    assert first.status_code == 200
+    assert first.headers["last-modified"] == "Mon, 05 Jan 2026 00:00:00 GMT"
+    assert [point["date"] for point in first.json()["history"]] == ["2026-01-02", "2026-01-05", "2026-01-07"]
+
+    again = client.get("/home/chart/AAPL", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_etag_is_per_format(client, fake_history):
+    full = client.get("/home/chart/AAPL")
+    compact = client.get("/home/chart/AAPL?format=compact", headers={"If-None-Match": full.headers["etag"]})
+
+    assert compact.status_code == 200
+    assert compact.json()["start"] == "2026-01-02"
+
+
+def test_changed_data_returns_new_body(client, fake_history):
+    etag = client.get("/home/chart/AAPL").headers["etag"]
+    fake_history["closes"] = CLOSES + 1
+
+    response = client.get("/home/chart/AAPL", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_if_modified_since_without_etag(client, fake_history):
+    response = client.get("/home/chart/AAPL", headers={"If-Modified-Since": "Mon, 05 Jan 2026 00:00:00 GMT"})
+    assert response.status_code == 304
+
+    response = client.get("/home/chart/AAPL", headers={"If-Modified-Since": "Sun, 04 Jan 2026 00:00:00 GMT"})
+    assert response.status_code == 200
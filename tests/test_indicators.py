@@ -0,0 +1,102 @@
+# 기술적 지표: 계산 결과를 단순 구현(pandas rolling/루프)과 비교 + 파라미터 파싱
+import numpy as np
+import pandas as pd
+import pytest
+from app import indicators
+
+CLOSES = 100 + np.cumsum(np.random.default_rng(7).normal(0, 1.5, 120))
+
+
+def _assert_same(actual, expected):
+    assert np.isnan(actual).tolist() == np.isnan(expected).tolist()
+    mask = ~np.isnan(expected)
+    np.testing.assert_allclose(actual[mask], expected[mask], rtol=1e-9)
+
+
+def test_sma_matches_rolling_mean():
+    _assert_same(indicators.sma(CLOSES, 20), pd.Series(CLOSES).rolling(20).mean().to_numpy())
+
+
+def test_sma_longer_than_series_is_all_nan():
+    assert np.isnan(indicators.sma(CLOSES[:5], 20)).all()
+
+
+def test_ema_matches_recursive_definition():
+    span = 10
+    alpha = 2 / (span + 1)
+    expected = np.empty(len(CLOSES))
+    expected[0] = CLOSES[0]
+    for i in range(1, len(CLOSES)):
+        expected[i] = alpha * CLOSES[i] + (1 - alpha) * expected[i - 1]
+    expected[:span - 1] = np.nan
+    _assert_same(indicators.ema(CLOSES, span), expected)
+
+
+def test_rsi_matches_wilder_loop():
+    window = 14
+    delta = np.diff(CLOSES)
+    avg_gain, avg_loss = max(delta[0], 0.0), max(-delta[0], 0.0)
+    expected = np.full(len(CLOSES), np.nan)
+    for i in range(1, len(delta)):
+        avg_gain += (max(delta[i], 0.0) - avg_gain) / window
+        avg_loss += (max(-delta[i], 0.0) - avg_loss) / window
+        if i + 1 >= window:
+            expected[i + 1] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    _assert_same(indicators.rsi(CLOSES, window), expected)
+
+
+def test_rsi_is_100_when_price_only_rises():
+    values = indicators.rsi(np.arange(1.0, 31.0), 14)
+    assert np.isnan(values[:14]).all()
+    assert (values[14:] == 100.0).all()
+
+
+def test_macd_histogram_is_line_minus_signal():
+    result = indicators.macd(CLOSES, 12, 26, 9)
+    _assert_same(result["macd"], indicators.ema(CLOSES, 12) - indicators.ema(CLOSES, 26))
+    _assert_same(result["histogram"], result["macd"] - result["signal"])
+    assert not np.isnan(result["signal"][-1])
+
+
+def test_bollinger_matches_rolling_std():
+    result = indicators.bollinger(CLOSES, 20, 2.0)
+    std = pd.Series(CLOSES).rolling(20).std().to_numpy()
+    _assert_same(result["upper"], pd.Series(CLOSES).rolling(20).mean().to_numpy() + 2 * std)
+    _assert_same(result["upper"] - result["middle"], result["middle"] - result["lower"])
+
+
+def test_volatility_is_annualized_log_return_std():
+    expected = np.full(len(CLOSES), np.nan)
+    expected[1:] = pd.Series(np.diff(np.log(CLOSES))).rolling(20).std().to_numpy() * np.sqrt(252) * 100
+    _assert_same(indicators.volatility(CLOSES, 20), expected)
+
+
+def test_parse_spec_defaults_and_dedup():
+    assert indicators.parse_spec("sma:20, SMA:20, rsi, bb:20:2.5") == [
+        ("sma", (20,)), ("rsi", (14,)), ("bb", (20, 2.5))]
+    assert indicators.parse_spec("") == []
+
+
+@pytest.mark.parametrize("spec", ["sma:inf", "sma:nan", "bb:20:inf", "sma:2.5", "sma:abc", "sma:0",
+                                  "macd:12:-26", "sma:20:5", "foo"])
+def test_parse_spec_rejects_bad_parameters(spec):
+    with pytest.raises(ValueError):
+        indicators.parse_spec(spec)
+
+
+@pytest.mark.parametrize("query", ["indicators=sma:inf", "indicators=sma:2.5", "indicators=foo", "period=10x"])
+def test_bad_chart_options_return_400(client, query):
+    # 데이터를 받기 전에 검증하므로 네트워크 없이 바로 400
+    response = client.get(f"/home/chart/KOSPI?{query}")
+    assert response.status_code == 400
+
+
+def test_compute_uses_spec_keys_and_nulls():
+    dates = np.arange("2026-01-01", "2026-01-31", dtype="datetime64[D]")
+    closes = np.linspace(100, 130, len(dates))
+    result = indicators.compute("TEST", "1mo", dates, closes, [("sma", (5,)), ("macd", (3, 6, 2))])
+
+    assert set(result) == {"sma_5", "macd_3_6_2"}
+    assert result["sma_5"][:4] == [None] * 4
+    assert result["sma_5"][4] == pytest.approx(closes[:5].mean())
+    assert set(result["macd_3_6_2"]) == {"macd", "signal", "histogram"}
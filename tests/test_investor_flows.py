@@ -0,0 +1,118 @@
+# 수급 추적기: 벡터화 연속 일수 = 단순 루프, 하루씩 이어붙인 결과 = 전체 재계산 결과
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select
+from app import models, investor_flows
+from app.database import engine
+
+
+def _naive_streaks(values):
+    streak = np.zeros(values.shape, dtype="int64")
+    amount = np.zeros(values.shape)
+    for col in range(values.shape[1]):
+        run, total = 0, 0.0
+        for row in range(values.shape[0]):
+            value = 0.0 if np.isnan(values[row, col]) else values[row, col]
+            sign = int(np.sign(value))
+            if sign != 0 and np.sign(run) == sign:
+                run, total = run + sign, total + value
+            else:
+                run, total = sign, value if sign else 0.0
+            streak[row, col], amount[row, col] = run, total
+    return streak, amount
+
+
+@pytest.fixture
+def matrix():
+    rng = np.random.default_rng(3)
+    values = rng.choice([-1.0, 1.0, 2.0, -3.0, 0.0], size=(40, 25)) * 1e8
+    values[rng.random(values.shape) < 0.05] = np.nan
+    return values
+
+
+def test_compute_streaks_matches_naive_loop(matrix):
+    streak, amount = investor_flows.compute_streaks(matrix)
+    expected_streak, expected_amount = _naive_streaks(matrix)
+
+    np.testing.assert_array_equal(streak, expected_streak)
+    np.testing.assert_allclose(amount, expected_amount)
+
+
+def test_extend_streaks_day_by_day_matches_full(matrix):
+    streak, amount = np.zeros(matrix.shape[1], dtype="int64"), np.zeros(matrix.shape[1])
+    for row in matrix:
+        streak, amount = investor_flows.extend_streaks(streak, amount, row)
+    full_streak, full_amount = investor_flows.compute_streaks(matrix)
+
+    np.testing.assert_array_equal(streak, full_streak[-1])
+    np.testing.assert_allclose(amount, full_amount[-1])
+
+
+def _stored_streaks(db):
+    rows = db.execute(select(models.InvestorFlowStreak)).scalars().all()
+    return {(row.investor, row.ticker): (row.as_of, row.streak, round(row.streak_amount, 2), row.net_buy)
+            for row in rows}
+
+
+def _recreate_tables():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+
+def test_incremental_ingest_matches_full_ingest(db):
+    source = investor_flows.CsvFlowSource()
+    days = sorted(source.fetch()["trade_date"].unique())
+
+    investor_flows.ingest(source)
+    full = _stored_streaks(db)
+    db.close()
+
+    _recreate_tables()
+    for day in days:
+        investor_flows.ingest(source, start=day, end=day)
+    incremental = _stored_streaks(db)
+
+    assert full and incremental == full
+    assert {as_of for as_of, *_ in full.values()} == {days[-1]}
+
+
+def test_reingesting_past_day_rebuilds_streaks(db):
+    source = investor_flows.CsvFlowSource()
+    days = sorted(source.fetch()["trade_date"].unique())
+    investor_flows.ingest(source)
+    expected = _stored_streaks(db)
+
+    investor_flows.ingest(source, start=days[3], end=days[3])
+
+    assert _stored_streaks(db) == expected
+
+
+class _FrameSource:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def fetch(self, start=None, end=None):
+        return self.frame
+
+
+def test_partial_batch_keeps_other_investors(db):
+    day = pd.Timestamp("2026-10-01").date()
+    both = pd.DataFrame({"trade_date": [day, day], "ticker": ["A.KS", "A.KS"],
+                         "investor": ["foreign", "institution"], "net_buy": [1.0, 2.0]})
+    investor_flows.ingest(_FrameSource(both))
+
+    only_foreign = pd.DataFrame({"trade_date": [day], "ticker": ["A.KS"], "investor": ["foreign"], "net_buy": [5.0]})
+    investor_flows.ingest(_FrameSource(only_foreign))
+
+    flows = {row.investor: row.net_buy for row in db.execute(select(models.InvestorFlow)).scalars()}
+    assert flows == {"foreign": 5.0, "institution": 2.0}
+
+
+def test_streaks_endpoint(client):
+    investor_flows.ingest(investor_flows.CsvFlowSource())
+
+    rows = client.get("/flows/streaks?investor=foreign&side=buy&min_days=2").json()
+
+    assert rows and all(row["days"] >= 2 for row in rows)
+    assert [row["days"] for row in rows] == sorted((row["days"] for row in rows), reverse=True)
@@ -0,0 +1,149 @@
+# 외부 호출 계층: record로 저장한 응답을 replay가 그대로 재생 + 지연/실패 주입 (네트워크 없음)
+import time
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from app import finance, providers
+from app.resilience import UpstreamUnavailable
+
+HISTORY_FRAME = pd.DataFrame(
+    {"Open": [1.0, 2.0, 3.0], "High": [1.5, 2.5, 3.5], "Low": [0.5, 1.5, 2.5], "Close": [1.2, 2.2, 3.2]},
+    index=pd.DatetimeIndex(["2026-10-01", "2026-10-02", "2026-10-05"]).tz_localize("America/New_York"))
+
+
+class FakeTicker:
+    """yfinance.Ticker 대신 (fast_info + history)"""
+    def __init__(self, symbol):
+        self.fast_info = SimpleNamespace(last_price=110.0, previous_close=100.0, currency="USD")
+
+    def history(self, period=None, start=None):
+        return HISTORY_FRAME
+
+
+class FakeModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        if stream:
+            return [SimpleNamespace(text="첫 조각 "), SimpleNamespace(text=""), SimpleNamespace(text="둘째 조각")]
+        return SimpleNamespace(text=f"답변: {prompt}")
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    """가짜 야후/모델로 record 모드 실행 -> 저장된 폴더 경로"""
+    monkeypatch.setattr(providers.yf, "Ticker", FakeTicker)
+    recorder = providers.RecordingProvider(str(tmp_path))
+    model = FakeModel()
+    recorder.quote("AAPL")
+    recorder.history("AAPL", period="1mo")
+    recorder.generate(model, "요약해줘")
+    list(recorder.generate_stream(model, "스트림"))
+    assert recorder.stats()["kinds"]["quote"] == {"calls": 1, "recorded": 1}
+    return str(tmp_path)
+
+
+def _replay(root, **kwargs):
+    options = dict(latency_ms="0", failure_rate="0", seed=1, fallback=False)
+    options.update(kwargs)
+    return providers.ReplayProvider(root, **options)
+
+
+def test_replay_returns_recorded_responses(recorded):
+    replay = _replay(recorded)
+
+    assert replay.quote("AAPL") == {"price": 110.0, "previous_close": 100.0, "currency": "USD"}
+    assert replay.generate(FakeModel(), "요약해줘") == "답변: 요약해줘"
+    assert list(replay.generate_stream(FakeModel(), "스트림")) == ["첫 조각 ", "둘째 조각"]
+
+
+def test_history_round_trips_as_arrays(recorded):
+    dates, columns = _replay(recorded).history("AAPL", period="1mo")
+
+    np.testing.assert_array_equal(dates, np.array(["2026-10-01", "2026-10-02", "2026-10-05"], dtype="datetime64[D]"))
+    np.testing.assert_array_equal(columns["close"], [1.2, 2.2, 3.2])
+    assert np.isnan(columns["volume"]).all()   # 원본에 없던 컬럼은 NaN
+
+
+def test_stream_replay_falls_back_to_plain_response(recorded):
+    assert list(_replay(recorded).generate_stream(FakeModel(), "요약해줘")) == ["답변: 요약해줘"]
+
+
+def test_missing_fixture_raises(recorded):
+    replay = _replay(recorded)
+
+    with pytest.raises(providers.FixtureMissing):
+        replay.quote("MSFT")
+    with pytest.raises(providers.FixtureMissing):
+        replay.history("AAPL", period="1y")
+    assert replay.stats()["kinds"]["quote"]["missing"] == 1
+
+
+def test_fallback_reuses_another_fixture_of_same_kind(recorded):
+    replay = _replay(recorded, fallback=True)
+
+    assert replay.quote("MSFT") == replay.quote("TSLA") == replay.quote("AAPL")
+    assert replay.stats()["kinds"]["quote"]["fallback"] == 2
+
+
+def test_injected_failures_only_hit_configured_upstream(recorded):
+    replay = _replay(recorded, failure_rate="yahoo=1")
+
+    with pytest.raises(providers.InjectedFailure):
+        replay.quote("AAPL")
+    assert replay.generate(FakeModel(), "요약해줘") == "답변: 요약해줘"
+    assert replay.stats()["kinds"]["quote"]["injected_failures"] == 1
+
+
+def test_injected_latency(recorded):
+    replay = _replay(recorded, latency_ms="yahoo=50-60,*=0")
+
+    started = time.perf_counter()
+    replay.quote("AAPL")
+    assert time.perf_counter() - started >= 0.05
+
+    started = time.perf_counter()
+    replay.generate(FakeModel(), "요약해줘")
+    assert time.perf_counter() - started < 0.05
+
+
+def test_same_seed_gives_same_failure_pattern(recorded):
+    def pattern(seed):
+        replay = _replay(recorded, failure_rate="0.5", seed=seed)
+        outcomes = []
+        for _ in range(20):
+            try:
+                replay.quote("AAPL")
+                outcomes.append(True)
+            except providers.InjectedFailure:
+                outcomes.append(False)
+        return outcomes
+
+    assert pattern(7) == pattern(7)
+    assert 0 < sum(pattern(7)) < 20
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("40", {"*": (40.0, 40.0)}),
+    ("20-80", {"*": (20.0, 80.0)}),
+    ("yahoo=20-60, gemini=800,*=10", {"yahoo": (20.0, 60.0), "gemini": (800.0, 800.0), "*": (10.0, 10.0)}),
+    ("", {}),
+])
+def test_parse_latency_spec(spec, expected):
+    assert providers._parse_per_upstream(spec, providers._parse_range) == expected
+
+
+def test_finance_runs_on_replayed_quotes(recorded):
+    previous = providers.use(_replay(recorded))
+    try:
+        assert finance.get_current_price("aapl") == {
+            "code": "AAPL", "price": 110.0, "change_percent": 10.0, "currency": "USD", "previous_close": 100.0}
+        # 저장된 응답이 없는 종목은 업스트림 장애와 똑같이 보임
+        with pytest.raises(UpstreamUnavailable):
+            finance.get_current_price("NOPE")
+    finally:
+        providers.use(previous)
+        finance._quote_cache.delete("AAPL")   # 다른 테스트에 캐시된 시세가 남지 않도록
@@ -0,0 +1,68 @@
+# 주도주 스크리너: 배열 한 번 계산 결과 + 로컬 유니버스/종가 CSV로 실행해서 저장/조회
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func
+from app import models, screener
+
+UNIVERSE = [
+    {"ticker": "A.KS", "name": "A", "market": "KR", "sector": "반도체"},
+    {"ticker": "B.KS", "name": "B", "market": "KR", "sector": "반도체"},
+    {"ticker": "C.KS", "name": "C", "market": "KR", "sector": "자동차"},
+    {"ticker": "D.KS", "name": "D", "market": "KR", "sector": "자동차"},
+    {"ticker": "X", "name": "X", "market": "US", "sector": "Tech"},
+]
+DATES = np.array(["2026-08-28", "2026-08-31", "2026-09-15", "2026-09-30"], dtype="datetime64[D]")
+CLOSES = np.array([
+    # A     B      C      D       X
+    [100.0, 100.0, 100.0, np.nan, 50.0],
+    [110.0, 200.0, 100.0, np.nan, 50.0],
+    [120.0, 210.0, 130.0, 10.0, 60.0],
+    [121.0, 220.0, 150.0, 12.0, 75.0],
+])
+
+
+def test_compute_leaders_ranks_by_lookback_return():
+    results = screener.compute_leaders(UNIVERSE, DATES, CLOSES, lookback="1mo", top_n=3)
+    kr = results["KR"]
+
+    # 9/30 - 1개월 = 8/30 -> 그 당일 또는 직전 거래일(8/28) 종가 대비, 기준가가 없는 D는 제외
+    assert kr["as_of"] == "2026-09-30"
+    assert kr["priced"] == 3 and kr["universe_size"] == 4
+    assert [(leader["ticker"], leader["return_rate"]) for leader in kr["leaders"]] == [
+        ("B.KS", 120.0), ("C.KS", 50.0), ("A.KS", 21.0)]
+    assert [(group["sector"], group["count"], group["tickers"]) for group in kr["sectors"]] == [
+        ("반도체", 2, ["B.KS", "A.KS"]), ("자동차", 1, ["C.KS"])]
+    assert results["US"]["leaders"][0]["return_rate"] == 50.0
+
+
+def test_compute_leaders_matches_per_ticker_pandas_on_fixture():
+    universe = screener.load_universe()
+    dates, closes = screener.FixtureCloseSource().fetch([item["ticker"] for item in universe])
+    results = screener.compute_leaders(universe, dates, closes, lookback="1mo", top_n=5)
+
+    frame = pd.read_csv(screener.SCREENER_FIXTURE_PATH, index_col="date", parse_dates=["date"]).sort_index().ffill()
+    base = frame[frame.index <= frame.index[-1] - pd.DateOffset(months=1)].iloc[-1]
+    returns = (frame.iloc[-1] / base - 1) * 100
+    for market in screener.MARKETS:
+        tickers = [item["ticker"] for item in universe if item["market"] == market and item["ticker"] in returns]
+        expected = returns[tickers].dropna().sort_values(ascending=False, kind="stable").head(5)
+        leaders = results[market]["leaders"]
+        assert [leader["ticker"] for leader in leaders] == list(expected.index)
+        assert [leader["return_rate"] for leader in leaders] == [round(v, 2) for v in expected]
+
+
+def test_run_screener_stores_one_snapshot_per_market(client, db):
+    for _ in range(2):
+        screener.run_screener(source=screener.FixtureCloseSource())
+
+    counts = dict(db.execute(select(models.ScreenerSnapshot.market, func.count())
+                             .group_by(models.ScreenerSnapshot.market)).all())
+    assert counts == {"KR": 1, "US": 1}
+
+    response = client.get("/screener/leaders?market=us")
+    assert response.status_code == 200
+    assert response.json()["market"] == "US" and response.json()["leaders"]
+
+
+def test_leaders_endpoint_404_before_first_run(client):
+    assert client.get("/screener/leaders?market=KR").status_code == 404
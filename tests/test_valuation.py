@@ -0,0 +1,70 @@
+# 포트폴리오 평가 / 기간별 가치 시계열
+import numpy as np
+import pytest
+from app import valuation
+
+DATES = np.array(["2026-01-02", "2026-01-05", "2026-01-06"], dtype="datetime64[D]")
+
+
+def _holding(ticker, quantity, avg_price, **extra):
+    return dict({"ticker": ticker, "quantity": quantity, "avg_price": avg_price}, **extra)
+
+
+def test_history_converts_foreign_holdings_with_daily_fx():
+    holdings = [_holding("AAPL", 10, 100.0), _holding("005930.KS", 2, 70000.0)]
+    histories = {"AAPL": (DATES, np.array([200.0, 210.0, 220.0])),
+                 "005930.KS": (DATES, np.array([70000.0, 71000.0, 72000.0]))}
+    fx = {"USD": (DATES, np.array([1400.0, 1410.0, 1420.0]))}
+
+    result = valuation.portfolio_history(holdings, {"AAPL": "USD", "005930.KS": "KRW"}, histories, fx, "KRW")
+
+    expected = np.array([200.0 * 1400, 210.0 * 1410, 220.0 * 1420]) * 10 + np.array([70000.0, 71000.0, 72000.0]) * 2
+    assert result["dates"] == ["2026-01-02", "2026-01-05", "2026-01-06"]
+    assert result["value"] == pytest.approx(expected.tolist())
+    assert result["missing_quotes"] == [] and result["missing_history"] == [] and result["missing_fx"] == []
+
+
+def test_history_leaves_out_holding_whose_quote_failed():
+    # 시세 조회 실패 -> 통화를 모름: 기준통화로 가정해서 달러 종가를 원화 합계에 더하면 안 됨
+    holdings = [_holding("AAPL", 10, 100.0), _holding("005930.KS", 1, 70000.0)]
+    histories = {"AAPL": (DATES, np.array([200.0, 210.0, 220.0])),
+                 "005930.KS": (DATES, np.array([70000.0, 71000.0, 72000.0]))}
+
+    result = valuation.portfolio_history(holdings, {"005930.KS": "KRW"}, histories, {}, "KRW")
+
+    assert result["missing_quotes"] == ["AAPL"]
+    assert result["value"] == [70000.0, 71000.0, 72000.0]
+
+
+def test_history_reports_missing_fx_instead_of_guessing():
+    holdings = [_holding("AAPL", 10, 100.0)]
+    histories = {"AAPL": (DATES, np.array([200.0, 210.0, 220.0]))}
+
+    result = valuation.portfolio_history(holdings, {"AAPL": "USD"}, histories, {"USD": None}, "KRW")
+
+    assert result["missing_fx"] == ["USD"]
+    assert result["value"] == []
+
+
+def test_history_starts_when_every_series_has_a_value():
+    holdings = [_holding("A", 1, 10.0), _holding("B", 1, 10.0)]
+    histories = {"A": (DATES, np.array([10.0, 11.0, 12.0])),
+                 "B": (DATES[1:], np.array([20.0, 21.0]))}
+
+    result = valuation.portfolio_history(holdings, {"A": "KRW", "B": "KRW"}, histories, {}, "KRW")
+
+    assert result["dates"] == ["2026-01-05", "2026-01-06"]
+    assert result["value"] == [31.0, 33.0]
+    assert result["return_rate"] == pytest.approx([0.0, (33.0 / 31.0 - 1) * 100])
+
+
+def test_value_portfolio_skips_missing_quotes():
+    holdings = [_holding("AAPL", 10, 100.0, id=1), _holding("MSFT", 5, 300.0, id=2)]
+    quotes = {"AAPL": {"price": 110.0, "previous_close": 100.0, "currency": "USD"}, "MSFT": None}
+
+    result = valuation.value_portfolio(holdings, quotes, {"USD": 1400.0, "KRW": 1.0}, "KRW")
+
+    assert result["missing_quotes"] == ["MSFT"]
+    assert [row["ticker"] for row in result["holdings"]] == ["AAPL"]
+    assert result["totals"]["valuation"] == pytest.approx(110.0 * 10 * 1400)
+    assert result["totals"]["day_change"] == pytest.approx(10.0 * 10 * 1400)